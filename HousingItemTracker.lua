@@ -19,6 +19,7 @@ L["MATERIALS"] = "Materials"
 L["PROFESSION"] = "Profession"
 L["ACHIEVEMENT"] = "Achievement"
 L["QUEST"] = "Quest"
+L["AND_MORE"] = "... and %d more"
 
 -- German
 if GetLocale() == "deDE" then
@@ -33,6 +34,7 @@ if GetLocale() == "deDE" then
     L["PROFESSION"] = "Beruf"
     L["ACHIEVEMENT"] = "Erfolg"
     L["QUEST"] = "Quest"
+    L["AND_MORE"] = "... und %d weitere"
 end
 
 -- French
@@ -48,6 +50,7 @@ if GetLocale() == "frFR" then
     L["PROFESSION"] = "Métier"
     L["ACHIEVEMENT"] = "Haut fait"
     L["QUEST"] = "Quête"
+    L["AND_MORE"] = "... et %d de plus"
 end
 
 -- Spanish
@@ -63,8 +66,12 @@ if GetLocale() == "esES" or GetLocale() == "esMX" then
     L["PROFESSION"] = "Profesión"
     L["ACHIEVEMENT"] = "Logro"
     L["QUEST"] = "Misión"
+    L["AND_MORE"] = "... y %d más"
 end
 
+-- Maximale Anzahl "Verwendet in"-Zeilen im Material-Tooltip
+local MAX_USED_IN_LINES = 10
+
 -- Frame für Vendor-Karten-Anzeige
 local VendorMapFrame = CreateFrame("Frame", "HousingVendorMapFrame", UIParent)
 VendorMapFrame:SetSize(256, 256)
@@ -225,23 +232,171 @@ if not HousingItemTrackerDB then
     }
 end
 
+-- Entpackt das kompakte DB-Format des Scrapers (String-/Vendor-Tabellen, Spalten-Arrays)
+-- in die normale Struktur HousingItemTrackerDB.items.decorItems und baut dabei die
+-- Lookup-Indizes auf, die die normale DB mitliefert (wie LuaIndexBuilder im Scraper)
+local function ExpandCompactDB(db)
+    local startTime = debugprofilestop and debugprofilestop()
+    local strings = db.strings
+    local stringFields = db.stringFields or {}
+    local vendorFields = db.vendorFields or {}
+    
+    -- false = kein Wert; 0 ist nur bei String-Referenzen "kein String", sonst ein echter Wert (quality = 0)
+    local function Value(field, value)
+        if value == nil or value == false then return nil end
+        if stringFields[field] then
+            if value == 0 then return nil end
+            return strings[value]
+        end
+        return value
+    end
+    
+    -- Gemeinsame Vendoren: Item-Vendoren speichern nur Preis/Währung und erben den Rest
+    local vendorMetas = {}
+    for vendorIndex, vendor in ipairs(db.vendors) do
+        if vendor.mapTexture then
+            vendor.mapTexture = db.mapPrefix .. vendor.mapTexture
+        end
+        vendorMetas[vendorIndex] = { __index = vendor }
+    end
+    
+    local decorItems = {}
+    local materials, materialUsage, vendorsByNpcId, itemsByCategory, achievements, quests = {}, {}, {}, {}, {}, {}
+    local vendorStride = #vendorFields + 1
+    -- Chunks und Zeilen kommen nach Decor-ID sortiert, die Indizes haben also dieselbe Reihenfolge
+    for _, chunk in ipairs(db.chunks) do
+        local columns = chunk.columns
+        for row, decorId in ipairs(columns.ids) do
+            local entry = {}
+            for field, column in pairs(columns) do
+                if field ~= "ids" then
+                    entry[field] = Value(field, column[row])
+                end
+            end
+            
+            local sources = chunk.sources[row]
+            if sources then
+                entry.sources = {}
+                for i, stringIndex in ipairs(sources) do
+                    entry.sources[i] = strings[stringIndex]
+                end
+            end
+            
+            local vendorRefs = chunk.vendors[row]
+            if vendorRefs then
+                entry.vendors = {}
+                for i = 1, #vendorRefs, vendorStride do
+                    local vendor = {}
+                    for offset, field in ipairs(vendorFields) do
+                        vendor[field] = Value(field, vendorRefs[i + offset])
+                    end
+                    table.insert(entry.vendors, setmetatable(vendor, vendorMetas[vendorRefs[i]]))
+                end
+            end
+            
+            local materialRefs = chunk.materials[row]
+            if materialRefs then
+                entry.materials = {}
+                for i = 1, #materialRefs, 3 do
+                    table.insert(entry.materials, {
+                        id = materialRefs[i],
+                        name = strings[materialRefs[i + 1]],
+                        quantity = materialRefs[i + 2],
+                    })
+                end
+            end
+            
+            decorItems[decorId] = entry
+            
+            for _, material in ipairs(entry.materials or {}) do
+                materials[material.id] = true
+                materialUsage[material.id] = materialUsage[material.id] or {}
+                table.insert(materialUsage[material.id], { decorId = decorId, quantity = material.quantity })
+            end
+            
+            for _, vendor in ipairs(entry.vendors or {}) do
+                local npcId = vendor.npcId
+                if npcId then
+                    local npcVendor = vendorsByNpcId[npcId]
+                    if not npcVendor then
+                        npcVendor = {
+                            name = vendor.name or "",
+                            location = vendor.location,
+                            mapTexture = vendor.mapTexture,
+                            coordX = vendor.coordX,
+                            coordY = vendor.coordY,
+                            items = {},
+                        }
+                        vendorsByNpcId[npcId] = npcVendor
+                    end
+                    if npcVendor.items[#npcVendor.items] ~= decorId then
+                        table.insert(npcVendor.items, decorId)
+                    end
+                end
+            end
+            
+            if entry.category then
+                itemsByCategory[entry.category] = itemsByCategory[entry.category] or {}
+                table.insert(itemsByCategory[entry.category], decorId)
+            end
+            if entry.achievementId and entry.achievement then
+                achievements[entry.achievementId] = entry.achievement
+            end
+            if entry.questId and entry.quest then
+                quests[entry.questId] = entry.quest
+            end
+        end
+    end
+    
+    db.items = {
+        decorItems = decorItems,
+        materials = materials,
+        materialUsage = materialUsage,
+        vendorsByNpcId = vendorsByNpcId,
+        itemsByCategory = itemsByCategory,
+        achievements = achievements,
+        quests = quests,
+    }
+    
+    -- Roh-Daten freigeben
+    db.chunks, db.strings, db.vendors = nil, nil, nil
+    db.expandTimeMs = startTime and (debugprofilestop() - startTime)
+end
+
+if HousingItemTrackerDB.format == "compact" and HousingItemTrackerDB.chunks then
+    ExpandCompactDB(HousingItemTrackerDB)
+end
+
 local DB = HousingItemTrackerDB.items
 
--- Prüft ob ein Item in irgendeinem Decor-Item als Material verwendet wird
-local function IsUsedInCrafting(itemId)
-    if not itemId or not DB.decorItems then return false end
-    
-    for decorId, decorInfo in pairs(DB.decorItems) do
+-- Baut den Reverse-Index Material-ID -> Decor-Items (für ältere DBs ohne materialUsage)
+local function BuildMaterialUsage()
+    local usage = {}
+    for decorId, decorInfo in pairs(DB.decorItems or {}) do
         if decorInfo.materials then
             for _, material in ipairs(decorInfo.materials) do
-                if material.id == itemId then
-                    return true
-                end
+                usage[material.id] = usage[material.id] or {}
+                table.insert(usage[material.id], { decorId = decorId, quantity = material.quantity })
             end
         end
     end
-    
-    return false
+    return usage
+end
+
+-- Der Scraper generiert den Index, sonst wird er einmalig beim Laden aufgebaut
+if not DB.materialUsage then
+    DB.materialUsage = BuildMaterialUsage()
+end
+
+-- Prüft ob ein Item in irgendeinem Decor-Item als Material verwendet wird
+local function IsUsedInCrafting(itemId)
+    if not itemId then return false end
+    return DB.materialUsage[itemId] ~= nil
+end
+
+-- Gibt alle Decor-Items zurück, in denen ein Material verwendet wird ({decorId, quantity})
+local function GetMaterialUsage(itemId)
+    return itemId and DB.materialUsage[itemId]
 end
 
 -- Kombinierte Prüfung: Ist es ein Housing-relevantes Item?
@@ -332,6 +487,17 @@ local function AddTooltipInfo(tooltip, itemId)
         if isUsedInCrafting then
             -- Zeige in welchen Decor-Items dieses Material verwendet wird
             tooltip:AddLine(L["USED_IN_CRAFTING"], 0.8, 0.8, 0.8)
+            
+            local usage = GetMaterialUsage(itemId)
+            for index, use in ipairs(usage) do
+                if index > MAX_USED_IN_LINES then
+                    tooltip:AddLine("  " .. string.format(L["AND_MORE"], #usage - MAX_USED_IN_LINES), 0.6, 0.6, 0.6)
+                    break
+                end
+                local usedIn = DB.decorItems[use.decorId]
+                local usedInName = usedIn and usedIn.name or ("Decor " .. use.decorId)
+                tooltip:AddLine("  " .. (use.quantity or 1) .. "x " .. usedInName, 0.7, 0.7, 0.7)
+            end
         end
         
         if decorInfo then
@@ -861,6 +1027,12 @@ SlashCmdList["HOUSINGITEMTRACKER"] = function(msg)
         print("|cFF00FF00Housing Item Tracker Debug:|r")
         print("ContainerFrameUtil_EnumerateContainerFrames: " .. tostring(ContainerFrameUtil_EnumerateContainerFrames ~= nil))
         print("DB.materials hat Einträge: " .. tostring(next(DB.materials) ~= nil))
+        print("DB-Format: " .. (HousingItemTrackerDB.format or "normal"))
+        if HousingItemTrackerDB.expandTimeMs then
+            print(string.format("Entpacken der kompakten DB: %.1f ms", HousingItemTrackerDB.expandTimeMs))
+        end
+        UpdateAddOnMemoryUsage()
+        print(string.format("Speicher: %.0f KB", GetAddOnMemoryUsage(addonName)))
         
         -- Teste ein bekanntes Item
         local testItemId = 2325 -- Erstes Item in der DB
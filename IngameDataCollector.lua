@@ -1,6 +1,7 @@
 -- Housing Item Tracker - Ingame Data Collector
 -- Sammelt Housing-Item-Informationen direkt aus dem Spiel
--- Exportiert als Lua-Tabelle die kopiert werden kann
+-- Exportiert als Lua-Tabelle die kopiert werden kann und legt die Daten zusätzlich in
+-- HousingItemTrackerCollectedData ab (SavedVariables), beides liest scraper_final.py --ingame
 
 local collector = CreateFrame("Frame")
 local collectedData = {}
@@ -49,31 +50,37 @@ local function CollectAllEntries()
     searcher:SetResultsUpdatedCallback(function()
         local results = searcher:GetResults()
         
-        print(f"Gefunden: {#results} Catalog Entries")
+        print(string.format("Gefunden: %d Catalog Entries", #results))
         
+        local count = 0
         for _, entryID in ipairs(results) do
             local data = CollectCatalogEntry(entryID)
             if data and data.id then
+                if not collectedData[data.id] then
+                    count = count + 1
+                end
                 collectedData[data.id] = data
             end
         end
         
-        print(f"Gesammelt: {#collectedData} Items")
+        -- collectedData ist nach ID indiziert, #collectedData wäre hier nicht die Anzahl
+        print(string.format("Gesammelt: %d Items", count))
+        HousingItemTrackerCollectedData = collectedData
         
         -- Zeige Exportierbare Daten
         print("\n=== KOPIERE DIESEN LUA-CODE ===\n")
         print("HousingItemTrackerCollectedData = {")
         
         for id, data in pairs(collectedData) do
-            print(f"    [{id}] = {{")
-            print(f"        name = \"{data.name}\",")
+            print(string.format("    [%d] = {", id))
+            print(string.format("        name = %q,", data.name or ""))
             if data.decorCost then
-                print(f"        decorCost = {data.decorCost},")
+                print(string.format("        decorCost = %d,", data.decorCost))
             end
             if data.quality then
-                print(f"        quality = {data.quality},")
+                print(string.format("        quality = %d,", data.quality))
             end
-            print(f"    }},")
+            print("    },")
         end
         
         print("}")
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Lokaler Mock von housing.wowdb.com für Lasttests des Scrapers
+Liefert synthetische Listing-Seiten, Detail-Seiten mit der mb-3 Struktur und
+Kartenbilder; Latenz, 5xx, 429 und hängende Antworten sind einstellbar.
+
+    python mock_wowdb_server.py --items 20000 --latency 80 --throttle-rate 0.02
+    python scraper_final.py --backend http --base-url http://127.0.0.1:8765
+
+    python mock_wowdb_server.py --benchmark --concurrency 1,4,16 --error-rate 0.01
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_ITEMS = 10000
+DEFAULT_SEED = 1
+LISTING_PAGE_SIZE = 30
+FIRST_ITEM_ID = 100
+VENDOR_POOL_SIZE = 200
+REQUEST_QUEUE_SIZE = 128
+MAP_IMAGE_SIZE = (1024, 768)
+STATS_PATH = "/__stats"
+
+DEFAULT_HANG_SECONDS = 5.0
+DEFAULT_RETRY_AFTER = 1
+DEFAULT_CONCURRENCY = "1,4,16"
+DEFAULT_BENCHMARK_ITEMS = 200
+DEFAULT_BENCHMARK_PAGES = 10
+DEFAULT_CLIENT_TIMEOUT = 2.0
+PERCENTILES = (50, 90, 99)
+
+DETAIL_PATH_PATTERN = re.compile(r'^/decor/(\d+)(?:-[\w-]*)?/?$')
+MAP_PATH_PATTERN = re.compile(r'^/maps/[\w-]+\.jpg$')
+
+CATEGORIES = (
+    ("Lighting", ("Large Lights", "Small Lights", "Wall Lights")),
+    ("Furnishings", ("Beds", "Chairs", "Tables", "Storage")),
+    ("Structural", ("Walls", "Doors", "Windows", "Pillars")),
+    ("Accents", ("Rugs", "Wall Hangings", "Ornamental")),
+    ("Nature", ("Plants", "Bushes", "Trees")),
+)
+ZONES = (
+    (2352, "Founder's Point"), (2351, "Razorwind Shores"), (84, "Stormwind City"),
+    (85, "Orgrimmar"), (2339, "Dornogal"), (2112, "Valdrakken"), (627, "Dalaran"),
+    (37, "Elwynn Forest"), (1, "Durotar"), (2248, "Isle of Dorn"),
+)
+CURRENCIES = (("Community Coupons", 3363), ("Resonance Crystals", 2815), ("Honor", 1792))
+PROFESSIONS = ("Alchemy", "Blacksmithing", "Cooking", "Enchanting", "Engineering",
+               "Inscription", "Jewelcrafting", "Leatherworking", "Tailoring")
+MATERIALS = ((245586, "Shadow Lumber"), (245587, "Ironwood Lumber"), (251767, "Olemba Lumber"),
+             (210930, "Bismuth"), (210936, "Ironclaw Ore"), (236951, "Mote of Light"))
+NAME_PARTS = (("Ornate", "Rustic", "Gilded", "Weathered", "Elven", "Dwarven", "Goblin", "Sturdy"),
+              ("Oak", "Iron", "Crystal", "Stone", "Silk", "Copper", "Ember", "Moss"),
+              ("Lantern", "Bench", "Table", "Rug", "Banner", "Shelf", "Planter", "Chandelier"))
+NPC_PARTS = (("Balen", "Morra", "Tarek", "Ysolde", "Grub", "Elira", "Kaldo", "Fenna"),
+             ("Starfinder", "Ironhand", "Quickfuse", "Duskwhisper", "Stonebrew", "Brightleaf"))
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html><head><title>{title} - WoWDB Housing</title>
+<script>window.dataLayer = window.dataLayer || [];</script>
+<link rel="stylesheet" href="/static/site.css"></head><body>
+<nav><a href="/decor/">Decor</a> <a href="/npcs/">NPCs</a></nav>
+<div class="container">
+{body}
+</div>
+<footer><p>Mock housing.wowdb.com</p></footer></body></html>'''
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+def map_file_name(zone):
+    map_id, zone_name = zone
+    return f"{map_id}_{slugify(zone_name).replace('-', '_')}.jpg"
+
+class MockCatalog:
+    """Deterministischer synthetischer Katalog: gleiche Größe + Seed ergeben die gleichen Seiten"""
+
+    def __init__(self, size=DEFAULT_ITEMS, seed=DEFAULT_SEED, page_size=LISTING_PAGE_SIZE):
+        self.size = size
+        self.seed = seed
+        self.page_size = page_size
+        rng = random.Random(f"{seed}:vendors")
+        self.vendors = []
+        for index in range(VENDOR_POOL_SIZE):
+            zone = rng.choice(ZONES)
+            self.vendors.append({
+                "npcId": 200000 + index,
+                "name": f"{rng.choice(NPC_PARTS[0])} {rng.choice(NPC_PARTS[1])}",
+                "zone": zone,
+                "x": round(rng.uniform(5, 95), 1),
+                "y": round(rng.uniform(5, 95), 1),
+            })
+        self._map_image = None
+        self._map_lock = threading.Lock()
+
+    @property
+    def pages(self):
+        return math.ceil(self.size / self.page_size)
+
+    def item_ids(self, page=None):
+        if page is None:
+            return range(FIRST_ITEM_ID, FIRST_ITEM_ID + self.size)
+        start = FIRST_ITEM_ID + (page - 1) * self.page_size
+        return range(max(start, FIRST_ITEM_ID), min(start + self.page_size, FIRST_ITEM_ID + self.size))
+
+    def has_item(self, item_id):
+        return FIRST_ITEM_ID <= item_id < FIRST_ITEM_ID + self.size
+
+    def item_name(self, item_id):
+        rng = random.Random(f"{self.seed}:name:{item_id}")
+        return " ".join(rng.choice(parts) for parts in NAME_PARTS) + f" {item_id}"
+
+    def item_url(self, item_id):
+        return f"/decor/{item_id}-{slugify(self.item_name(item_id))}"
+
+    def listing_html(self, page):
+        links = "\n".join(f'<div class="col"><a href="{self.item_url(item_id)}">{self.item_name(item_id)}</a></div>'
+                          for item_id in self.item_ids(page))
+        return PAGE_TEMPLATE.format(title=f"Decor - Seite {page}",
+                                    body=f'<h1>Decor</h1>\n<div class="row" id="grid-view">\n{links}\n</div>')
+
+    def detail_html(self, item_id):
+        """Detail-Seite im Aufbau von wowdb: ein mb-3 div pro Abschnitt"""
+        rng = random.Random(f"{self.seed}:item:{item_id}")
+        category, subcategories = rng.choice(CATEGORIES)
+        blocks = [
+            f'<div class="mb-3">Category: <a href="/decor/?category={slugify(category)}">{category}</a></div>',
+            f'<div class="mb-3">Subcategory: <a href="/decor/?subcategory={slugify(subcategories[0])}">'
+            f'{rng.choice(subcategories)}</a></div>',
+            f'<div class="mb-3">Budget Cost: {rng.randint(1, 25)}</div>',
+        ]
+
+        roll = rng.random()
+        if roll < 0.6:
+            vendors = rng.sample(self.vendors, 2 if rng.random() < 0.15 else 1)
+            blocks.append('<div class="mb-3">Vendor: ' + "".join(self.vendor_html(vendor, rng) for vendor in vendors)
+                          + '</div>')
+            if rng.random() < 0.2:
+                blocks.append(self.achievement_html(rng))
+        elif roll < 0.75:
+            blocks.append(self.achievement_html(rng))
+        elif roll < 0.85:
+            quest_id = rng.randint(80000, 90000)
+            blocks.append(f'<div class="mb-3">Quest: <a href="/quests/{quest_id}">Quest {quest_id}</a></div>')
+        elif roll < 0.95:
+            reagents = "".join(f'<li><a href="/items/{mat_id}">{mat_name}</a> {rng.randint(1, 20)}x</li>'
+                               for mat_id, mat_name in rng.sample(MATERIALS, rng.randint(1, 3)))
+            blocks.append(f'<div class="mb-3">Profession: {rng.choice(PROFESSIONS)}</div>')
+            blocks.append(f'<div class="mb-3">Reagents: <ul class="list-unstyled">{reagents}</ul></div>')
+        else:
+            blocks.append(f'<div class="mb-3">Drop: Dropped by <a href="/npcs/{rng.randint(1000, 9999)}">'
+                          f'Rare Elite</a></div>')
+
+        name = self.item_name(item_id)
+        return PAGE_TEMPLATE.format(title=name, body=f"<h1>{name}</h1>\n" + "\n".join(blocks))
+
+    def vendor_html(self, vendor, rng):
+        if rng.random() < 0.7:
+            price = rng.choice((50, 100, 250, 500, 1000, 2500))
+            currency = '<img alt="Gold" src="/static/gold.png">'
+        else:
+            currency_name, currency_id = rng.choice(CURRENCIES)
+            price = rng.randint(5, 500)
+            currency = f'<a href="/currencies/{currency_id}">{currency_name}</a>'
+        x, y = vendor["x"], vendor["y"]
+        return (f'<div><a href="/npcs/{vendor["npcId"]}">{vendor["name"]}</a> ({vendor["zone"][1]}) '
+                f'<strong>{price}</strong> {currency}\n'
+                f'<div class="map"><img src="/maps/{map_file_name(vendor["zone"])}">'
+                f'<div class="map-pin" data-x="{x}" data-y="{y}"></div></div> /way {x} {y}</div>')
+
+    def achievement_html(self, rng):
+        achievement_id = rng.randint(40000, 42000)
+        return (f'<div class="mb-3">Achievement: <a href="/achievements/{achievement_id}">'
+                f'Achievement {achievement_id}</a></div>')
+
+    def sitemap_xml(self, host):
+        urls = "\n".join(f"<url><loc>{host}{self.item_url(item_id)}</loc></url>" for item_id in self.item_ids())
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{urls}\n</urlset>')
+
+    def map_image(self):
+        """Ein JPEG für alle Karten (einmal erzeugt), None ohne Pillow"""
+        with self._map_lock:
+            if self._map_image is None:
+                try:
+                    from PIL import Image
+                except ImportError:
+                    return None
+                buffer = io.BytesIO()
+                Image.new('RGB', MAP_IMAGE_SIZE, (48, 64, 40)).save(buffer, 'JPEG')
+                self._map_image = buffer.getvalue()
+            return self._map_image
+
+class FaultInjector:
+    """Würfelt pro Request Latenz und Fehler aus; max_rps ist ein Token-Bucket, der mit 429 antwortet"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0,
+                 timeout_rate=0.0, hang_seconds=DEFAULT_HANG_SECONDS, max_rps=0.0,
+                 retry_after=DEFAULT_RETRY_AFTER, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.tokens = max_rps
+        self.refilled = time.monotonic()
+
+    def take_token(self):
+        if not self.max_rps:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.max_rps, self.tokens + (now - self.refilled) * self.max_rps)
+        self.refilled = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def decide(self):
+        """Gibt (Verzögerung in s, Fehler) zurück; Fehler ist None, 'hang', 429 oder 500"""
+        with self.lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            if not self.take_token():
+                return 0.0, 429
+            roll = self.rng.random()
+        if roll < self.timeout_rate:
+            return self.hang_seconds, "hang"
+        roll -= self.timeout_rate
+        if roll < self.throttle_rate:
+            return 0.0, 429
+        roll -= self.throttle_rate
+        if roll < self.error_rate:
+            return delay, 500
+        return delay, None
+
+class ServerStats:
+    """Zähler pro Antwort-Status, abrufbar unter /__stats"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def incr(self, key, amount=1):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters)
+
+def make_handler(catalog, faults, stats, sitemap=False):
+    """Request-Handler-Klasse, die an Katalog, Fehler-Injektion und Statistik gebunden ist"""
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Header und Body gehen getrennt raus; ohne das bremst Nagle jede Keep-Alive Antwort um ~40 ms
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+            stats.incr(f"status_{status}")
+            stats.incr("bytes", len(body))
+
+        def route(self, path, query):
+            """Gibt (Status, Body, Content-Type) zurück"""
+            if path == "/decor/" or path == "/decor":
+                try:
+                    page = int(query.get("page", ["1"])[0])
+                except ValueError:
+                    page = 1
+                stats.incr("listing")
+                return 200, catalog.listing_html(page), None
+            match = DETAIL_PATH_PATTERN.match(path)
+            if match:
+                item_id = int(match.group(1))
+                if not catalog.has_item(item_id):
+                    return 404, "Not Found", None
+                stats.incr("detail")
+                return 200, catalog.detail_html(item_id), None
+            if MAP_PATH_PATTERN.match(path):
+                image = catalog.map_image()
+                if image is None:
+                    return 404, "Pillow fehlt", None
+                stats.incr("map")
+                return 200, image, "image/jpeg"
+            if sitemap and path == "/sitemap.xml":
+                host = f"http://{self.headers.get('Host', f'{DEFAULT_HOST}:{DEFAULT_PORT}')}"
+                return 200, catalog.sitemap_xml(host), "application/xml"
+            return 404, "Not Found", None
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == STATS_PATH:
+                self.send_body(200, json.dumps(stats.snapshot()), "application/json")
+                return
+
+            stats.incr("requests")
+            delay, fault = faults.decide()
+            try:
+                if fault == "hang":
+                    # Antwortet erst nach Ablauf des Client-Timeouts (oder gar nicht mehr)
+                    stats.incr("hung")
+                    time.sleep(delay)
+                    self.close_connection = True
+                    return
+                if fault == 429:
+                    self.send_body(429, "Too Many Requests", headers={"Retry-After": str(faults.retry_after)})
+                    return
+                if delay:
+                    time.sleep(delay)
+                if fault == 500:
+                    self.send_body(500, "Internal Server Error")
+                    return
+                status, body, content_type = self.route(parts.path, parse_qs(parts.query))
+                self.send_body(status, body, content_type or "text/html; charset=utf-8")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client hat wegen Timeout schon aufgegeben
+                stats.incr("client_gone")
+                self.close_connection = True
+
+    return MockHandler
+
+def start_server(catalog, faults, host=DEFAULT_HOST, port=DEFAULT_PORT, sitemap=False):
+    """Startet den Mock in einem Hintergrund-Thread, gibt (server, stats, base_url) zurück"""
+    stats = ServerStats()
+    ThreadingHTTPServer.request_queue_size = REQUEST_QUEUE_SIZE
+    server = ThreadingHTTPServer((host, port), make_handler(catalog, faults, stats, sitemap=sitemap))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-wowdb", daemon=True).start()
+    return server, stats, f"http://{host}:{server.server_address[1]}"
+
+class TimedFetcher:
+    """Misst jeden einzelnen Seitenabruf (auch die später wiederholten) samt Ergebnis"""
+
+    def __init__(self, fetcher, samples, lock):
+        self.fetcher = fetcher
+        self.samples = samples
+        self.lock = lock
+        self.name = fetcher.name
+
+    def timed(self, kind, func, url):
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            result = func(url)
+            if result is None:
+                outcome = "empty"
+            return result
+        except Exception as e:
+            response = getattr(e, "response", None)
+            outcome = str(response.status_code) if response is not None else type(e).__name__
+            raise
+        finally:
+            with self.lock:
+                self.samples.append((kind, time.perf_counter() - start, outcome))
+
+    def fetch_listing_page(self, url):
+        return self.timed("listing", self.fetcher.fetch_listing_page, url)
+
+    def fetch_item_page(self, url):
+        return self.timed("detail", self.fetcher.fetch_item_page, url)
+
+    def close(self):
+        self.fetcher.close()
+
+def percentile(values, q):
+    """Perzentil nach Nearest-Rank, None bei leerer Liste"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100.0 * len(ordered)) - 1)]
+
+def summarize_samples(samples, kind, seconds, pages):
+    """Durchsatz, Latenz-Perzentile (nur erfolgreiche Abrufe) und Fehlerquoten einer Phase"""
+    attempts = [(latency, outcome) for sample_kind, latency, outcome in samples if sample_kind == kind]
+    ok = [latency for latency, outcome in attempts if outcome == "ok"]
+    outcomes = {}
+    for _, outcome in attempts:
+        if outcome != "ok":
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return {
+        "pages": pages,
+        "seconds": round(seconds, 3),
+        "pagesPerSecond": round(pages / seconds, 2) if seconds else None,
+        "attempts": len(attempts),
+        "latencyMs": {f"p{q}": round(percentile(ok, q) * 1000, 1) if ok else None for q in PERCENTILES},
+        "errorRate": round(1 - len(ok) / len(attempts), 4) if attempts else 0.0,
+        "errors": outcomes,
+    }
+
+def run_level(scraper, concurrency, args):
+    """Discovery + Detail-Scrape mit `concurrency` parallelen HTTP-Sessions"""
+    samples = []
+    lock = threading.Lock()
+    metrics = scraper.PipelineMetrics(progress_interval=0)
+    guard = scraper.FetchGuard(backoff=args.retry_backoff, metrics=metrics)
+    session = scraper.create_http_session(pool_size=concurrency)
+    rate_limiter = scraper.RateLimiter(args.rps)
+
+    def make_fetcher(worker_idx):
+        return scraper.RetryingFetcher(TimedFetcher(scraper.HttpFetcher(session), samples, lock), guard)
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            item_urls = scraper.collect_item_urls(make_fetcher(0), max_pages=args.pages, rate_limiter=rate_limiter,
+                                                  metrics=metrics, fetcher_factory=make_fetcher,
+                                                  workers=concurrency)
+            listing_seconds = time.perf_counter() - start
+
+            selected = dict(list(sorted(item_urls.items()))[:args.limit])
+            start = time.perf_counter()
+            items = scraper.scrape_items_parallel(selected, make_fetcher, workers=concurrency,
+                                                  rate_limiter=rate_limiter, metrics=metrics)
+            detail_seconds = time.perf_counter() - start
+    finally:
+        session.close()
+
+    return {
+        "concurrency": concurrency,
+        "discovered": len(item_urls),
+        "listing": summarize_samples(samples, "listing", listing_seconds, metrics.counters.get("listing_pages", 0)),
+        "detail": summarize_samples(samples, "detail", detail_seconds, len(items)),
+        "failedItems": len(selected) - len(items),
+        "retries": metrics.counters.get("retries", 0),
+        "breakerTrips": metrics.counters.get("breaker_trips", 0),
+    }
+
+def print_report(results, server_stats):
+    print(f"\n{'Worker':>6} {'Phase':<8} {'Seiten':>7} {'Seiten/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+          f"{'Fehler':>7} {'Retries':>8} {'Verloren':>9}")
+    for result in results:
+        for phase in ("listing", "detail"):
+            stats = result[phase]
+            latency = stats["latencyMs"]
+            lost = result["failedItems"] if phase == "detail" else ""
+            retries = result["retries"] if phase == "detail" else ""
+            print(f"{result['concurrency']:>6} {phase:<8} {stats['pages']:>7} {stats['pagesPerSecond'] or 0:>9.1f} "
+                  + " ".join(f"{latency[f'p{q}'] if latency[f'p{q}'] is not None else '-':>8}" for q in PERCENTILES)
+                  + f" {stats['errorRate']:>7.1%} {retries:>8} {lost:>9}")
+        errors = {}
+        for phase in ("listing", "detail"):
+            for outcome, count in result[phase]["errors"].items():
+                errors[outcome] = errors.get(outcome, 0) + count
+        if errors or result["breakerTrips"]:
+            print(f"{'':>6} Fehlerarten: {', '.join(f'{k}: {v}' for k, v in sorted(errors.items())) or '-'}"
+                  f", Circuit-Breaker: {result['breakerTrips']}x")
+    print(f"\nServer: {server_stats.get('requests', 0)} Requests, "
+          + ", ".join(f"{key[7:]}: {value}" for key, value in sorted(server_stats.items())
+                      if key.startswith("status_"))
+          + f", hängend: {server_stats.get('hung', 0)}")
+
+def run_benchmark(args, catalog, faults):
+    """Startet den Mock im selben Prozess und vergleicht die Concurrency-Stufen"""
+    # Erst hier importieren: der Server allein braucht keine Scraper-Abhängigkeiten
+    import scraper_final as scraper
+
+    server, stats, base_url = start_server(catalog, faults, host=args.host, port=args.port)
+    scraper.set_base_url(base_url)
+    scraper.HTTP_TIMEOUT = args.client_timeout
+    print(f"Mock-Server: {base_url} ({catalog.size} Items, {catalog.pages} Listing-Seiten)")
+    print(f"Benchmark: {args.pages} Listing-Seiten + {args.limit} Detail-Seiten pro Stufe, "
+          f"Client-Timeout {args.client_timeout} s, Limit: {args.rps or 'keins'} Requests/s")
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            print(f"  {concurrency} Worker...", flush=True)
+            results.append(run_level(scraper, concurrency, args))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print_report(results, stats.snapshot())
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"items": catalog.size, "faults": vars(args), "results": results}, f, indent=2)
+        print(f"Ergebnis gespeichert: {args.json}")
+    return results
+
+def parse_concurrency(value):
+    try:
+        levels = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Liste von Zahlen erwartet, z.B. 1,4,16 (nicht {value!r})")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("Concurrency-Stufen müssen >= 1 sein")
+    return levels
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lokaler Mock von housing.wowdb.com mit Lasttest")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help="Port (0 = beliebiger freier Port, Standard im Benchmark-Modus)")
+    parser.add_argument('--items', type=int, default=DEFAULT_ITEMS, help="Größe des synthetischen Katalogs")
+    parser.add_argument('--page-size', type=int, default=LISTING_PAGE_SIZE, help="Items pro Listing-Seite")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Seed für Katalog und Fehler-Würfel")
+    parser.add_argument('--sitemap', action='store_true', help="/sitemap.xml mit allen Decor-URLs ausliefern")
+
+    faults = parser.add_argument_group("Fehler-Injektion")
+    faults.add_argument('--latency', type=float, default=0.0, metavar='MS', help="Grund-Latenz pro Antwort")
+    faults.add_argument('--jitter', type=float, default=0.0, metavar='MS', help="Zufällige Abweichung +/-")
+    faults.add_argument('--error-rate', type=float, default=0.0, metavar='P', help="Anteil 500-Antworten")
+    faults.add_argument('--throttle-rate', type=float, default=0.0, metavar='P',
+                        help="Anteil 429-Antworten (mit Retry-After)")
+    faults.add_argument('--timeout-rate', type=float, default=0.0, metavar='P',
+                        help="Anteil Requests, die --hang Sekunden hängen und dann ohne Antwort schließen")
+    faults.add_argument('--hang', type=float, default=DEFAULT_HANG_SECONDS, metavar='S')
+    faults.add_argument('--max-rps', type=float, default=0.0,
+                        help="Server-seitiges Limit; darüber gibt es 429 (0 = kein Limit)")
+    faults.add_argument('--retry-after', type=int, default=DEFAULT_RETRY_AFTER, metavar='S',
+                        help="Retry-After Header der 429-Antworten")
+
+    bench = parser.add_argument_group("Benchmark")
+    bench.add_argument('--benchmark', action='store_true',
+                       help="Mock im Prozess starten und collect_item_urls + Detail-Scrape pro Stufe messen")
+    bench.add_argument('--concurrency', type=parse_concurrency, default=parse_concurrency(DEFAULT_CONCURRENCY),
+                       metavar='N,N,...', help=f"Concurrency-Stufen (Standard: {DEFAULT_CONCURRENCY})")
+    bench.add_argument('--pages', type=int, default=DEFAULT_BENCHMARK_PAGES,
+                       help="Listing-Seiten pro Stufe (Obergrenze für collect_item_urls)")
+    bench.add_argument('--limit', type=int, default=DEFAULT_BENCHMARK_ITEMS, help="Detail-Seiten pro Stufe")
+    bench.add_argument('--rps', type=float, default=0.0, help="Client-seitiges Limit wie im Scraper (0 = keins)")
+    bench.add_argument('--client-timeout', type=float, default=DEFAULT_CLIENT_TIMEOUT, metavar='S',
+                       help="HTTP-Timeout des Scrapers während des Benchmarks")
+    bench.add_argument('--retry-backoff', type=float, default=0.2, metavar='S',
+                       help="Basis des exponentiellen Backoffs (Scraper-Standard: 1.0)")
+    bench.add_argument('--json', metavar='PATH', help="Ergebnisse zusätzlich als JSON speichern")
+
+    args = parser.parse_args(argv)
+    if args.benchmark and args.port == DEFAULT_PORT:
+        args.port = 0
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    catalog = MockCatalog(args.items, seed=args.seed, page_size=args.page_size)
+    faults = FaultInjector(latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, timeout_rate=args.timeout_rate,
+                           hang_seconds=args.hang, max_rps=args.max_rps, retry_after=args.retry_after,
+                           seed=args.seed)
+    if args.benchmark:
+        run_benchmark(args, catalog, faults)
+        return 0
+
+    server, stats, base_url = start_server(catalog, faults, host=args.host, port=args.port, sitemap=args.sitemap)
+    print(f"Mock-Server läuft auf {base_url} ({catalog.size} Items, {catalog.pages} Listing-Seiten)")
+    print(f"Scraper: python scraper_final.py --backend http --base-url {base_url}")
+    print(f"Statistik: {base_url}{STATS_PATH} - Beenden mit Strg+C")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\nBeendet. {json.dumps(stats.snapshot())}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
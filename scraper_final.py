@@ -4,29 +4,230 @@ WoWDB Housing Decor Scraper - Final Version
 Nutzt die mb-3 div-Struktur für präzise Extraktion
 """
 
+import argparse
+import collections
+import contextlib
+import copy
+import functools
+import gzip
+import hashlib
+import itertools
 import json
 import time
 import re
+import sqlite3
 import os
-import requests
+import queue
+import random
+import sys
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-from PIL import Image
+from urllib.parse import urljoin
 import io
 
+# requests, selenium, webdriver_manager, bs4, Pillow und psutil werden erst in den Funktionen
+# importiert, die sie brauchen: generate/diff/stats laufen so ohne diese Pakete und starten sofort
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# lxml ist optional (deutlich schnellerer Parser für BeautifulSoup) und wird erst beim Parsen geladen
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+# psutil ist optional (Speichermessung der Browser-Sessions)
+HAVE_PSUTIL = importlib.util.find_spec("psutil") is not None
+
 BASE_URL = "https://housing.wowdb.com"
 DECOR_LIST_URL = f"{BASE_URL}/decor/#grid-view"
 TEXTURES_DIR = Path("textures/vendor_maps")
+MAP_TEXTURE_PREFIX = "Interface\\AddOns\\HousingItemTracker\\textures\\vendor_maps\\"
+TOC_FILE = Path("HousingItemTracker.toc")
+MAP_DOWNLOAD_WORKERS = 8
+TEXTURE_ALIASES_FILE = TEXTURES_DIR.parent / "vendor_map_aliases.json"
+DEFAULT_WORKERS = 1
+DEFAULT_REQUESTS_PER_SECOND = 2.5
+DEFAULT_BACKEND = "selenium"
+FETCH_BACKENDS = ("selenium", "http", "auto")
+HTTP_TIMEOUT = 15
+
+# Discovery: Sitemaps/Daten-Endpunkte zuerst, sonst Listing-Seiten bis zur ersten leeren Seite
+DISCOVERY_MODES = ("auto", "sitemap", "listing")
+SITEMAP_URLS = ("/sitemap.xml", "/sitemap_index.xml")
+MAX_SITEMAP_DOCUMENTS = 20
+MAX_LISTING_PAGES = 500
+EMPTY_PAGES_TO_STOP = 2
+DRIVER_CACHE_FILE = Path(".chromedriver_path.json")
+BROWSER_RECYCLE_PAGES = 250
+BROWSER_MAX_RSS_MB = 1500
+BROWSER_RSS_CHECK_EVERY = 10
+BROWSER_BLOCK_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+}
+BLOCKED_URL_PATTERNS = (
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m3u8",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*adservice.google.*", "*amazon-adsystem.com*", "*adnxs.com*", "*pubmatic.com*", "*rubiconproject.com*",
+    "*criteo.*", "*quantserve.com*", "*scorecardresearch.com*", "*cookielaw.org*", "*fundingchoicesmessages*",
+)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# Listing-Links zu Decor-Detailseiten und Erkennung serverseitig gerenderter Detailseiten
+DECOR_LINK_PATTERN = re.compile(r'href="([^"]*/decor/\d+[^"]*)"')
+MB3_DIV_PATTERN = re.compile(r'<div[^>]*class="[^"]*\bmb-3\b')
+DECOR_URL_PATTERN = re.compile(r'(?:https?://[^\s"\'<>]+)?/decor/\d+[^\s"\'<>]*')
+SITEMAP_LOC_PATTERN = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+SITEMAP_FILE_PATTERN = re.compile(r'\.xml(\.gz)?$')
+
+PAGE_CACHE_DIR = Path(".page_cache")
+CORPUS_MANIFEST_FILE = "manifest.json"
+CHECKPOINT_FILE = Path("housing_checkpoint.jsonl")
+STORE_FILE = Path("housing_items.sqlite")
+# Items werden nur aus dem Store gelöscht, wenn der gefundene Katalog mindestens so groß ist (Anteil am Store)
+RETAIN_MIN_FRACTION = 0.9
+OUTPUT_JSON_FILE = Path("housing_items_final.json")
+LUA_DB_FILE = Path("HousingItemTrackerDB.lua")
+SHARD_OUTPUT_FILE = OUTPUT_JSON_FILE
+ID_LIST_FILE = Path("housing_item_ids.json")
+CHECKPOINT_FSYNC_EVERY = 25
+SCRIPT_TAG_PATTERN = re.compile(r'<script\b.*?</script>', re.S | re.I)
+
+# Detailseiten: nur die Tags, die parse_item_html tatsächlich auswertet, landen im Baum
+ITEM_PAGE_TAGS = ("h1", "div", "ul", "a")
+NON_CONTENT_PATTERN = re.compile(r'<(script|style|noscript|svg)\b.*?</\1>', re.S | re.I)
+NPC_LINK_PATTERN = re.compile(r'/npcs/(\d+)')
+CURRENCY_LINK_PATTERN = re.compile(r'/currencies/(\d+)')
+GOLD_ALT_PATTERN = re.compile(r'gold', re.I)
+MAP_SRC_PATTERN = re.compile(r'map|location', re.I)
+LOCATION_PATTERN = re.compile(r'\(([^)]+)\)')
+NUMBER_PATTERN = re.compile(r'(\d+)')
+WAYPOINT_PATTERN = re.compile(r'/way\s+([\d.]+)\s+([\d.]+)')
+ACHIEVEMENT_LINK_PATTERN = re.compile(r'/achievements/')
+QUEST_LINK_PATTERN = re.compile(r'/quests/')
+ITEM_LINK_PATTERN = re.compile(r'/items/(\d+)')
+QUANTITY_PATTERN = re.compile(r'(\d+)\s*x|x\s*(\d+)|\((\d+)\)', re.I)
+REAGENT_LIST_CLASS_PATTERN = re.compile(r'list-unstyled|mb-0')
+PROFESSIONS = ('Alchemy', 'Blacksmithing', 'Cooking', 'Enchanting', 'Engineering',
+               'Inscription', 'Jewelcrafting', 'Leatherworking', 'Tailoring')
+
+LUA_INDENT = "    "
+LUA_WRITE_BUFFER = 1 << 20
+LUA_IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+LUA_KEYWORDS = frozenset((
+    "and", "break", "do", "else", "elseif", "end", "false", "for", "function", "if", "in",
+    "local", "nil", "not", "or", "repeat", "return", "then", "true", "until", "while",
+))
+COMPACT_VENDOR_FIELDS = ("price", "currency", "currencyId")
+LUA_DB_VERSION = 2
+LUA_TOKEN_PATTERN = re.compile(
+    r'\s*(?:--[^\n]*\s*)*(?:("(?:[^"\\\n]|\\.)*")|(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*)|(\S))')
+LUA_UNESCAPE_PATTERN = re.compile(r'\\(.)')
+LUA_ESCAPES = {"n": "\n", "r": "\r", "t": "\t"}
+CHANGELOG_FILE = Path("housing_changelog.json")
+DELTA_FILE = Path("housing_delta.json")
+COMMANDS = ("discover", "scrape", "textures", "generate", "diff", "stats")
+
+# Seed-Felder, die nur zusammen mit ihrer Quelle übernommen werden (merge_seed_item)
+SEED_SOURCE_FIELDS = {"achievement": "Achievement", "achievementId": "Achievement", "quest": "Quest",
+                      "questId": "Quest", "profession": "Crafting"}
+# Export von IngameDataCollector.lua: (Lua-Feld, Scraper-Feld) der im Spiel maßgeblichen Werte
+INGAME_EXPORT_VARIABLE = "HousingItemTrackerCollectedData"
+INGAME_EXPORT_PATTERN = re.compile(rf'^\s*{INGAME_EXPORT_VARIABLE}\s*=', re.M)
+INGAME_FIELDS = (("decorCost", "budget_cost"), ("quality", "quality"))
+INGAME_WEB_FIELDS = ("budget_cost",)
+LUA_DB_HEADER = """-- Housing Item Database
+-- Auto-generated by scraper_final.py
+
+"""
+
+# Feste Sleeps pro Seite aus der alten Version (Referenz für die Wartezeit-Statistik):
+# Listing 1 + 0.5 s plus 0.5 s zwischen den Seiten, Detail 2 + 1 s plus 0.4 s zwischen den Items
+FIXED_WAIT_BUDGET = {"listing": 2.0, "detail": 3.4}
+
+# Retries pro URL (begrenzter exponentieller Backoff) und Circuit-Breaker über alle Worker
+RETRY_ATTEMPTS = 3
+LISTING_RETRY_ATTEMPTS = 2
+RETRY_BACKOFF = 1.0
+RETRY_MAX_BACKOFF = 30.0
+PERMANENT_HTTP_ERRORS = (404, 410)
+BREAKER_WINDOW = 20
+BREAKER_ERROR_RATE = 0.5
+BREAKER_COOLDOWN = 15.0
+BREAKER_MAX_COOLDOWN = 240.0
+
+# asyncio-Pipeline: Größe der Queues zwischen den Stufen (Backpressure)
+PIPELINE_MODES = ("threads", "async")
+PIPELINE_QUEUE_SIZE = 32
+
+# Abstand der Fortschrittszeile (Items/s, ETA) in Sekunden
+PROGRESS_INTERVAL = 10.0
+PROFILE_TOP_FUNCTIONS = 25
 
-def setup_driver(headless=True):
-    """Setup Chrome WebDriver"""
+# Readiness-Zustand der Seite: Dokument, DOM-Größe, geladene Ressourcen, relevante Blöcke
+READINESS_SCRIPT = """
+return {
+    ready: document.readyState,
+    nodes: document.getElementsByTagName('*').length,
+    resources: performance.getEntriesByType('resource').length,
+    mb3: document.querySelectorAll('div.mb-3').length,
+    decorLinks: document.querySelectorAll("a[href*='/decor/']").length
+};
+"""
+
+_driver_path_lock = threading.Lock()
+
+def resolve_chromedriver(driver_path=None, cache_file=DRIVER_CACHE_FILE, refresh=False):
+    """Pfad zum chromedriver, ohne bei jedem Start das Netzwerk zu fragen
+    
+    Reihenfolge: expliziter Pfad bzw. CHROMEDRIVER, dann der beim letzten Mal
+    aufgelöste Pfad (falls die Datei noch existiert), erst dann einmalig
+    ChromeDriverManager. None überlässt die Suche dem Selenium Manager.
+    refresh=True verwirft den gemerkten Pfad (z.B. nach einem Chrome-Update).
+    """
+    explicit = driver_path or os.environ.get("CHROMEDRIVER")
+    if explicit:
+        return explicit
+    
+    cache_file = Path(cache_file)
+    with _driver_path_lock:
+        if refresh:
+            cache_file.unlink(missing_ok=True)
+        try:
+            cached = json.loads(cache_file.read_text(encoding='utf-8')).get("path")
+        except (OSError, ValueError):
+            cached = None
+        if cached and Path(cached).exists():
+            return cached
+        
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            print(f"WARN: chromedriver konnte nicht aufgelöst werden ({e}) - versuche Selenium Manager")
+            return None
+        cache_file.write_text(json.dumps({"path": path, "resolvedAt": time.time()}), encoding='utf-8')
+        return path
+
+def setup_driver(headless=True, block_resources=True, driver_path=None):
+    """Setup Chrome WebDriver
+    
+    Mit block_resources werden Bilder per Chrome-Prefs und Fonts, Medien sowie
+    Werbe-/Tracking-Skripte per CDP (Network.setBlockedURLs) gar nicht erst geladen.
+    Karten-Bilder brauchen wir nur als URL, sie lädt die MapPipeline selbst.
+    Passt der gemerkte chromedriver nach einem Chrome-Update nicht mehr
+    (SessionNotCreated), wird er einmal neu aufgelöst.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    
     print("Initialisiere Chrome WebDriver...")
     options = Options()
     if headless:
@@ -34,88 +235,344 @@ def setup_driver(headless=True):
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--window-size=1920,1080')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+    options.add_argument(f'user-agent={USER_AGENT}')
+    if block_resources:
+        options.add_experimental_option("prefs", BROWSER_BLOCK_PREFS)
+        # Die Seiten warten ohnehin explizit auf H1/mb-3-Blöcke, nicht auf das load-Event
+        options.page_load_strategy = "eager"
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    executable_path = resolve_chromedriver(driver_path)
+    try:
+        driver = webdriver.Chrome(service=Service(executable_path) if executable_path else Service(),
+                                  options=options)
+    except SessionNotCreatedException as e:
+        if not executable_path or driver_path or os.environ.get("CHROMEDRIVER"):
+            raise
+        print(f"WARN: chromedriver passt nicht zu Chrome ({e.msg}) - löse den Treiber neu auf")
+        executable_path = resolve_chromedriver(refresh=True)
+        driver = webdriver.Chrome(service=Service(executable_path) if executable_path else Service(),
+                                  options=options)
+    if block_resources:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BLOCKED_URL_PATTERNS)})
     return driver
 
-def escape_lua_string(text):
-    """Escaped einen String für Lua"""
-    if not text:
-        return ""
-    return str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
-
-def download_and_convert_map(map_url, vendor_name, location):
-    """Lädt Karten-Bild herunter und konvertiert zu TGA"""
-    if not map_url:
+def browser_rss_mb(driver):
+    """Speicher (RSS) von chromedriver und allen Chrome-Prozessen in MB, None wenn nicht messbar"""
+    if not HAVE_PSUTIL:
         return None
+    import psutil
     
     try:
-        # Erstelle Textures-Ordner falls nicht vorhanden
-        TEXTURES_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Extrahiere Dateinamen aus der URL (z.B. "2351_razorwind_shores.jpg")
-        # Das stellt sicher, dass verschiedene Karten für die gleiche Zone unterschiedliche Namen haben
-        url_filename = map_url.split('/')[-1]  # Holt den letzten Teil der URL
-        base_filename = url_filename.rsplit('.', 1)[0]  # Entfernt .jpg/.png
-        
-        # Säubere den Dateinamen
-        safe_filename = re.sub(r'[^\w\s-]', '_', base_filename).lower()
-        filename = f"map_{safe_filename}"
-        
-        # Prüfe ob schon existiert
-        tga_path = TEXTURES_DIR / f"{filename}.tga"
-        if tga_path.exists():
-            # Gib relativen Pfad zurück
-            return f"Interface\\AddOns\\HousingItemTracker\\textures\\vendor_maps\\{filename}"
-        
-        # Download Bild
-        response = requests.get(map_url, timeout=10)
-        response.raise_for_status()
-        
-        # Konvertiere zu TGA
-        img = Image.open(io.BytesIO(response.content))
-        
-        # Resize falls zu groß (max 512x512 für WoW Performance)
-        max_size = 512
-        if img.width > max_size or img.height > max_size:
-            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-        
-        # Konvertiere zu RGBA falls nötig
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        # Speichere als TGA
-        img.save(tga_path, format='TGA')
-        
-        print(f"    Karte gespeichert: {filename}.tga")
-        
-        # Gib WoW-Pfad zurück (ohne .tga Extension, WoW fügt das automatisch hinzu)
-        return f"Interface\\AddOns\\HousingItemTracker\\textures\\vendor_maps\\{filename}"
-        
-    except Exception as e:
-        print(f"    Fehler beim Herunterladen der Karte: {e}")
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(process.memory_info().rss for process in processes) / (1024 * 1024)
+    except (psutil.Error, AttributeError):
         return None
 
-def extract_item_id(url):
-    """Extrahiert Item-ID aus URL"""
-    match = re.search(r'/decor/(\d+)', url)
-    return int(match.group(1)) if match else None
+class BrowserSession:
+    """Lebenszyklus einer Chrome-Session: Start bei Bedarf und Neustart alle N Seiten oder ab einer RSS-Grenze
+    
+    Chrome wächst über einen mehrstündigen Lauf stetig; ein Neustart kostet ein
+    paar Sekunden und gibt den Speicher zuverlässig frei.
+    """
 
-def collect_item_urls(driver, max_pages=96):
-    """Sammelt alle Item-URLs von allen Seiten"""
-    all_items = {}
-    seen_ids = set()
+    def __init__(self, headless=True, recycle_pages=BROWSER_RECYCLE_PAGES, max_rss_mb=BROWSER_MAX_RSS_MB,
+                 block_resources=True, driver_path=None, metrics=None):
+        self.headless = headless
+        self.recycle_pages = recycle_pages
+        self.max_rss_mb = max_rss_mb
+        self.block_resources = block_resources
+        self.driver_path = driver_path
+        self.metrics = metrics or PipelineMetrics()
+        self._driver = None
+        self.pages = 0
+        self.restarts = 0
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            with self.metrics.timer("browser_start"):
+                self._driver = setup_driver(headless=self.headless, block_resources=self.block_resources,
+                                            driver_path=self.driver_path)
+            self.pages = 0
+        return self._driver
+
+    def page_loaded(self):
+        """Nach jeder Seite aufrufen: zählt mit, misst periodisch den Speicher und startet ggf. neu"""
+        if self._driver is None:
+            return
+        self.pages += 1
+        reason = None
+        if self.recycle_pages and self.pages >= self.recycle_pages:
+            reason = f"{self.pages} Seiten"
+        elif self.pages % BROWSER_RSS_CHECK_EVERY == 0:
+            rss = browser_rss_mb(self._driver)
+            if rss is not None:
+                self.metrics.maximum("browser_rss_peak_mb", round(rss))
+                if self.max_rss_mb and rss > self.max_rss_mb:
+                    reason = f"{rss:.0f} MB RSS"
+        if reason:
+            print(f"    Browser-Neustart nach {reason}")
+            self.close()
+            self.restarts += 1
+            self.metrics.incr("browser_restarts")
+
+    def close(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
+
+def set_base_url(url):
+    """Setzt die Basis-URL für alle Requests (z.B. auf den lokalen Mock-Server)"""
+    global BASE_URL, DECOR_LIST_URL
+    BASE_URL = url.rstrip('/')
+    DECOR_LIST_URL = f"{BASE_URL}/decor/#grid-view"
+
+def create_http_session(pool_size=DEFAULT_WORKERS):
+    """Erstellt eine requests.Session mit Keep-Alive Connection-Pool"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=max(pool_size, 10))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+def has_server_rendered_details(html):
+    """Prüft ob das HTML einer Detail-Seite schon ohne JavaScript die mb-3 Blöcke enthält"""
+    return bool(html) and "<h1" in html and MB3_DIV_PATTERN.search(html) is not None
+
+class AdaptiveTimeout:
+    """Timeout, der sich am gleitenden Mittel der tatsächlich beobachteten Wartezeiten orientiert"""
+
+    def __init__(self, initial, minimum=1.0, maximum=15.0, factor=3.0, alpha=0.2):
+        self.average = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.alpha = alpha
+
+    @property
+    def seconds(self):
+        return min(self.maximum, max(self.minimum, self.average * self.factor))
+
+    def observe(self, waited):
+        self.average = (1 - self.alpha) * self.average + self.alpha * waited
+
+class WaitStats:
+    """Protokolliert pro Seite die tatsächliche Wartezeit gegenüber dem alten festen Sleep-Budget"""
+
+    def __init__(self):
+        self.records = []
+        self.lock = threading.Lock()
+
+    def record(self, kind, url, waited, timed_out=False):
+        with self.lock:
+            self.records.append({
+                "kind": kind,
+                "url": url,
+                "waited": round(waited, 3),
+                "budget": FIXED_WAIT_BUDGET[kind],
+                "timedOut": timed_out,
+            })
+
+    def summary(self):
+        """Summiert Wartezeit und eingesparte Zeit pro Seitentyp"""
+        summary = {}
+        with self.lock:
+            for record in self.records:
+                stats = summary.setdefault(record["kind"], {"pages": 0, "waited": 0.0, "budget": 0.0, "timeouts": 0})
+                stats["pages"] += 1
+                stats["waited"] += record["waited"]
+                stats["budget"] += record["budget"]
+                stats["timeouts"] += record["timedOut"]
+        for stats in summary.values():
+            stats["saved"] = stats["budget"] - stats["waited"]
+        return summary
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("Wartezeiten (Readiness-Checks vs. alte feste Sleeps):")
+        for kind, stats in summary.items():
+            print(f"  {kind:8s} {stats['pages']:5d} Seiten: {stats['waited']:8.1f} s gewartet "
+                  f"statt {stats['budget']:8.1f} s -> {stats['saved']:8.1f} s gespart "
+                  f"({stats['timeouts']} Timeouts)")
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": self.summary(), "pages": self.records}, f, indent=2, ensure_ascii=False)
+
+def format_duration(seconds):
+    """Formatiert Sekunden als h:mm:ss"""
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+class PipelineMetrics:
+    """Zeiten und Zähler pro Pipeline-Stufe, periodische Fortschrittszeile und Metrik-Datei
+    
+    Stufen-Zeiten von parallelen Workern (fetch_detail, parse_detail, ...) werden
+    aufsummiert und können daher größer sein als die Laufzeit der Gesamt-Stufe.
+    """
+
+    def __init__(self, progress_interval=PROGRESS_INTERVAL):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.started = time.monotonic()
+        self.progress_interval = progress_interval
+        self.progress_started = None
+        self.last_progress = 0.0
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """Misst die Dauer eines with-Blocks für die angegebene Stufe"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            stats = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0})
+            stats["seconds"] += seconds
+            stats["calls"] += 1
+
+    def incr(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def maximum(self, counter, value):
+        """Merkt sich den größten gemeldeten Wert (z.B. Speicher-Spitze)"""
+        with self.lock:
+            self.counters[counter] = max(self.counters.get(counter, value), value)
+
+    def start_progress(self):
+        self.progress_started = self.last_progress = time.monotonic()
+
+    def progress(self, done, total, label="Items"):
+        """Gibt höchstens alle progress_interval Sekunden eine Zeile mit Durchsatz und ETA aus"""
+        now = time.monotonic()
+        with self.lock:
+            if self.progress_started is None:
+                self.progress_started = now
+            if done < total and now - self.last_progress < self.progress_interval:
+                return
+            self.last_progress = now
+        elapsed = now - self.progress_started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = format_duration((total - done) / rate) if rate else "?"
+        print(f">>> {done}/{total} {label} ({100 * done / total if total else 100:.0f}%), "
+              f"{rate:.2f} {label}/s, vergangen {format_duration(elapsed)}, ETA {eta}")
+
+    def summary(self):
+        with self.lock:
+            stages = {name: {"seconds": round(stats["seconds"], 3), "calls": stats["calls"],
+                             "avgMs": round(1000 * stats["seconds"] / stats["calls"], 2) if stats["calls"] else 0.0}
+                      for name, stats in self.stages.items()}
+            counters = dict(self.counters)
+        return {"elapsed": round(time.monotonic() - self.started, 3), "stages": stages, "counters": counters}
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"Laufzeit: {format_duration(summary['elapsed'])}")
+        for name, stats in summary["stages"].items():
+            print(f"  {name:16s} {stats['seconds']:9.1f} s  {stats['calls']:6d}x  {stats['avgMs']:9.1f} ms/Aufruf")
+        for name, value in sorted(summary["counters"].items()):
+            print(f"  {name:16s} {value}")
+
+    def save(self, path, extra=None):
+        """Schreibt die Metriken (plus optionale Zusatzdaten) als JSON"""
+        data = self.summary()
+        data.update(extra or {})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def wait_until_ready(driver, timeout, require=None, quiet_period=0.3, poll_interval=0.1):
+    """Wartet bis das Dokument geladen, der DOM stabil und das Netzwerk ruhig ist
     
-    print(f"Sammle Items von {max_pages} Seiten...")
+    Stabil heißt: readyState ist 'complete' und weder die Anzahl der DOM-Knoten
+    noch die Anzahl geladener Ressourcen ändert sich für quiet_period Sekunden.
+    require(state) kann zusätzliche Bedingungen prüfen (z.B. mb-3 Blöcke vorhanden).
+    Gibt True zurück wenn die Seite bereit ist, False bei Timeout.
+    """
+    start = time.monotonic()
+    last_snapshot = None
+    stable_since = None
     
-    for page_num in range(1, max_pages + 1):
-        page_url = f"{BASE_URL}/decor/?page={page_num}#grid-view"
-        print(f"\n[Seite {page_num}/{max_pages}] {page_url}")
+    while True:
+        state = driver.execute_script(READINESS_SCRIPT) or {}
+        now = time.monotonic()
+        snapshot = (state.get("nodes"), state.get("resources"), state.get("mb3"), state.get("decorLinks"))
+        
+        if state.get("ready") == "complete" and (require is None or require(state)):
+            if snapshot != last_snapshot or stable_since is None:
+                stable_since = now
+            elif now - stable_since >= quiet_period:
+                return True
+        else:
+            stable_since = None
+        
+        last_snapshot = snapshot
+        if now - start >= timeout:
+            return False
+        time.sleep(poll_interval)
+
+class SeleniumFetcher:
+    """Lädt Seiten über eine Chrome-Session (für Seiten, die JavaScript brauchen)"""
+    name = "selenium"
+
+    def __init__(self, driver=None, headless=True, wait_stats=None, browser_options=None):
+        self._driver = driver
+        self.headless = headless
+        self.owns_driver = driver is None
+        # Eigene Sessions laufen über den BrowserSession-Lebenszyklus (Blocking, Recycling)
+        self.browser = BrowserSession(headless=headless, **(browser_options or {})) if self.owns_driver else None
+        self.wait_stats = wait_stats
+        self.timeouts = {kind: AdaptiveTimeout(budget) for kind, budget in FIXED_WAIT_BUDGET.items()}
+
+    @property
+    def driver(self):
+        if self._driver is not None:
+            return self._driver
+        return self.browser.driver
+
+    def _page_done(self):
+        if self.browser:
+            self.browser.page_loaded()
+
+    def _wait_ready(self, kind, url, require):
+        """Scrollt nach unten (lazy-load) und wartet auf Readiness statt fester Sleeps"""
+        driver = self.driver
+        timeout = self.timeouts[kind]
+        start = time.monotonic()
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        ready = wait_until_ready(driver, timeout.seconds, require=require)
+        waited = time.monotonic() - start
+        timeout.observe(waited)
+        if self.wait_stats is not None:
+            self.wait_stats.record(kind, url, waited, timed_out=not ready)
+
+    def fetch_listing_page(self, url):
+        """Lädt eine Listing-Seite, gibt None zurück falls keine Items erscheinen
+        
+        Ist die Seite fertig geladen und enthält trotzdem keine Items, ist sie leer
+        (hinter dem Katalogende) und es wird EmptyPage geworfen.
+        """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
         
+        driver = self.driver
         try:
-            driver.get(page_url)
+            driver.get(url)
             
             # Warte auf Items
             try:
@@ -123,176 +580,1448 @@ def collect_item_urls(driver, max_pages=96):
                     EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/decor/')]"))
                 )
             except:
-                print(f"  Timeout - keine Items gefunden")
-                continue
-            
-            time.sleep(1)  # Kurze Pause für JavaScript
+                if driver.execute_script("return document.readyState") == "complete":
+                    raise EmptyPage(url)
+                return None
             
-            # Scrolle einmal nach unten um lazy-load Items zu laden
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.5)
-            
-            # Sammle Item-Links von dieser Seite
-            links = driver.find_elements(By.XPATH, "//a[contains(@href, '/decor/')]")
+            # Warte bis keine neuen (lazy-load) Item-Links mehr dazukommen
+            self._wait_ready("listing", url, require=lambda state: state.get("decorLinks", 0) > 0)
+            return driver.page_source
+        finally:
+            self._page_done()
+
+    def fetch_item_page(self, url):
+        """Lädt eine Detail-Seite, gibt None zurück falls kein H1 erscheint"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        driver = self.driver
+        try:
+            driver.get(url)
             
-            page_items = 0
-            for link in links:
-                try:
-                    href = link.get_attribute('href')
-                    item_id = extract_item_id(href)
-                    
-                    if item_id and item_id not in seen_ids:
-                        seen_ids.add(item_id)
-                        all_items[item_id] = href
-                        page_items += 1
-                except:
-                    continue
+            # Warte auf H1
+            try:
+                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+            except:
+                return None
             
-            print(f"  {page_items} neue Items gefunden (Gesamt: {len(all_items)})")
+            # Warte bis die Vendor/Source mb-3 Blöcke gerendert sind
+            self._wait_ready("detail", url, require=lambda state: state.get("mb3", 0) > 0)
+            return driver.page_source
+        finally:
+            self._page_done()
+
+    def close(self):
+        if self.browser:
+            self.browser.close()
+
+def content_fingerprint(html):
+    """Hash über den Seiteninhalt ab dem H1, ohne Scripts (Werbung/Tracking ändert sich bei jedem Laden)"""
+    html = html or ""
+    h1_pos = html.find("<h1")
+    content = SCRIPT_TAG_PATTERN.sub("", html[h1_pos:] if h1_pos >= 0 else html)
+    return hashlib.sha256(" ".join(content.split()).encode('utf-8')).hexdigest()
+
+class PageCache:
+    """On-Disk Cache pro URL: Roh-HTML, ETag/Last-Modified, Content-Hash und geparstes Item
+    
+    Jede URL liegt in einer eigenen gzip-JSON-Datei, damit parallele Worker
+    sich nicht gegenseitig blockieren und nie die ganze Datei neu geschrieben wird.
+    """
+
+    def __init__(self, directory=PAGE_CACHE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_url(url):
+        return url.split('#', 1)[0]
+
+    def _path(self, url):
+        key = hashlib.sha1(self.normalize_url(url).encode('utf-8')).hexdigest()
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def get(self, url):
+        """Gibt den Cache-Eintrag für eine URL zurück (oder None)"""
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, url, entry):
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def store_page(self, url, html, etag=None, last_modified=None):
+        """Speichert das HTML einer Seite, schreibt nur wenn sich etwas geändert hat"""
+        entry = self.get(url) or {"url": self.normalize_url(url)}
+        content_hash = content_fingerprint(html)
+        validators_changed = (etag and etag != entry.get("etag")) or \
+            (last_modified and last_modified != entry.get("lastModified"))
+        
+        if entry.get("contentHash") != content_hash or validators_changed:
+            entry["html"] = html
+            entry["contentHash"] = content_hash
+            if etag:
+                entry["etag"] = etag
+            if last_modified:
+                entry["lastModified"] = last_modified
+            entry["fetchedAt"] = time.time()
+            self._write(url, entry)
+        return entry
+
+    def store_parsed(self, url, parsed, entry=None):
+        """Speichert das geparste Item zusammen mit dem Hash des zugrunde liegenden HTML"""
+        entry = entry or self.get(url) or {"url": self.normalize_url(url)}
+        entry["parsed"] = parsed
+        entry["parsedHash"] = entry.get("contentHash")
+        self._write(url, entry)
+
+    def cached_item(self, url):
+        """Gibt das zuletzt geparste Item einer URL zurück (oder None)"""
+        entry = self.get(url)
+        return entry.get("parsed") if entry else None
+
+    def entries(self):
+        """Iteriert über alle lesbaren Cache-Einträge"""
+        for path in sorted(self.directory.glob("*/*.json.gz")):
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    yield json.load(f)
+            except (OSError, ValueError):
+                continue
+
+    def count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+class HttpFetcher:
+    """Lädt Seiten ohne Browser über gepoolte Keep-Alive Verbindungen"""
+    name = "http"
+
+    def __init__(self, session=None, cache=None):
+        self.owns_session = session is None
+        self.session = session or create_http_session()
+        self.cache = cache
+        self.not_modified = 0
+
+    def fetch(self, url):
+        """GET mit Conditional-Request (If-None-Match/If-Modified-Since) falls die Seite im Cache liegt"""
+        url = url.split('#', 1)[0]
+        entry = self.cache.get(url) if self.cache else None
+        headers = {}
+        if entry and entry.get("html"):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                headers["If-Modified-Since"] = entry["lastModified"]
+        
+        response = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+        if response.status_code == 304 and entry:
+            self.not_modified += 1
+            return entry["html"]
+        response.raise_for_status()
+        
+        if self.cache:
+            self.cache.store_page(url, response.text,
+                                  etag=response.headers.get("ETag"),
+                                  last_modified=response.headers.get("Last-Modified"))
+        return response.text
+
+    def fetch_listing_page(self, url):
+        return self.fetch(url)
+
+    def fetch_item_page(self, url):
+        return self.fetch(url)
+
+    def close(self):
+        if self.owns_session:
+            self.session.close()
+
+class AutoFetcher:
+    """Versucht zuerst HTTP und nutzt Selenium nur für Seiten, die JavaScript brauchen"""
+    name = "auto"
+
+    def __init__(self, http_fetcher, selenium_fetcher):
+        self.http = http_fetcher
+        self.selenium = selenium_fetcher
+        self.fallbacks = 0
+
+    def fetch_listing_page(self, url):
+        html = self.http.fetch_listing_page(url)
+        if parse_listing_html(html):
+            return html
+        self.fallbacks += 1
+        return self.selenium.fetch_listing_page(url)
+
+    def fetch_item_page(self, url):
+        html = self.http.fetch_item_page(url)
+        if has_server_rendered_details(html):
+            return html
+        self.fallbacks += 1
+        return self.selenium.fetch_item_page(url)
+
+    def close(self):
+        self.http.close()
+        self.selenium.close()
+
+def create_fetcher(backend, driver=None, session=None, headless=True, wait_stats=None, cache=None,
+                   browser_options=None):
+    """Erstellt das Fetch-Backend (selenium, http oder auto)
+    
+    browser_options geht an BrowserSession (recycle_pages, max_rss_mb, block_resources, ...).
+    """
+    if backend == "http":
+        return HttpFetcher(session, cache=cache)
+    if backend == "auto":
+        return AutoFetcher(HttpFetcher(session, cache=cache),
+                           SeleniumFetcher(driver, headless=headless, wait_stats=wait_stats,
+                                           browser_options=browser_options))
+    if backend == "selenium":
+        return SeleniumFetcher(driver, headless=headless, wait_stats=wait_stats, browser_options=browser_options)
+    raise ValueError(f"Unbekanntes Fetch-Backend: {backend}")
+
+class CircuitBreaker:
+    """Bremst den ganzen Crawler, wenn die Fehlerquote der letzten Requests zu hoch wird
+    
+    Liegt die Fehlerquote im Fenster der letzten BREAKER_WINDOW Versuche über der
+    Schwelle, pausieren alle Worker für cooldown Sekunden; jede weitere Auslösung
+    ohne zwischenzeitliche Erholung verdoppelt die Pause (bis max_cooldown).
+    """
+
+    def __init__(self, window=BREAKER_WINDOW, error_rate=BREAKER_ERROR_RATE,
+                 cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN, metrics=None):
+        self.window = window
+        self.error_rate = error_rate
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.metrics = metrics or PipelineMetrics()
+        self.outcomes = collections.deque(maxlen=window)
+        self.open_until = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Blockiert, solange der Breaker offen ist"""
+        delay = self.open_until - time.monotonic()
+        if delay > 0:
+            with self.metrics.timer("breaker_wait"):
+                time.sleep(delay)
+
+    def record(self, ok):
+        with self.lock:
+            self.outcomes.append(ok)
+            if len(self.outcomes) < self.window // 2:
+                return
+            errors = self.outcomes.count(False)
+            if errors / len(self.outcomes) <= self.error_rate:
+                if errors == 0 and len(self.outcomes) == self.window:
+                    self.cooldown = self.base_cooldown
+                return
+            self.open_until = time.monotonic() + self.cooldown
+            self.trips += 1
+            print(f"  Circuit-Breaker: {errors}/{len(self.outcomes)} Fehler, pausiere alle Worker "
+                  f"für {self.cooldown:.1f} s")
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self.outcomes.clear()
+        self.metrics.incr("breaker_trips")
+
+def retry_after_seconds(error):
+    """Wartezeit aus einem Retry-After Header (429/503), sonst None"""
+    response = getattr(error, "response", None)
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+def is_permanent_error(error):
+    """404/410 werden nicht wiederholt, die Seite existiert schlicht nicht"""
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in PERMANENT_HTTP_ERRORS
+
+class EmptyPage(Exception):
+    """Die Seite wurde vollständig geladen, enthält aber nichts (z.B. Listing-Seite hinter dem Katalogende)"""
+
+class FetchGuard:
+    """Gemeinsame Fetch-Schicht: Retry-Budget pro URL mit begrenztem exponentiellem Backoff plus Circuit-Breaker
+    
+    call() gibt das Ergebnis zurück, None wenn die Seite auch nach allen Versuchen
+    nicht geladen werden konnte, oder wirft den letzten Fehler weiter. EmptyPage und
+    404/410 sind Antworten der Seite, keine Störung: sie werden sofort weitergereicht
+    und zählen für den Circuit-Breaker als Erfolg.
+    """
+
+    def __init__(self, attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF, max_backoff=RETRY_MAX_BACKOFF,
+                 breaker=None, metrics=None):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics or PipelineMetrics()
+        self.breaker = breaker or CircuitBreaker(metrics=self.metrics)
+
+    def call(self, func, url, attempts=None):
+        attempts = attempts or self.attempts
+        error = None
+        for attempt in range(1, attempts + 1):
+            self.breaker.wait()
+            error = None
+            try:
+                result = func(url)
+            except EmptyPage:
+                self.breaker.record(True)
+                raise
+            except Exception as e:
+                if is_permanent_error(e):
+                    self.breaker.record(True)
+                    raise
+                error = e
+                result = None
             
-            # Kleine Pause zwischen Seiten
-            time.sleep(0.5)
+            if result is not None:
+                self.breaker.record(True)
+                return result
+            self.breaker.record(False)
+            if attempt == attempts:
+                break
             
-        except Exception as e:
-            print(f"  Fehler auf Seite {page_num}: {e}")
-            continue
+            delay = retry_after_seconds(error) or \
+                min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            self.metrics.incr("retries")
+            print(f"  Retry {attempt}/{attempts - 1} in {delay:.1f} s: {url} ({error or 'keine Antwort'})")
+            with self.metrics.timer("backoff_wait"):
+                time.sleep(delay)
+        
+        if error:
+            raise error
+        return None
+
+class RetryingFetcher:
+    """Leitet alle Seitenabrufe eines Fetch-Backends durch den gemeinsamen FetchGuard"""
+
+    def __init__(self, fetcher, guard):
+        self.fetcher = fetcher
+        self.guard = guard
+        self.name = fetcher.name
+
+    def fetch_listing_page(self, url):
+        return self.guard.call(self.fetcher.fetch_listing_page, url, attempts=LISTING_RETRY_ATTEMPTS)
+
+    def fetch_item_page(self, url):
+        return self.guard.call(self.fetcher.fetch_item_page, url)
+
+    def close(self):
+        self.fetcher.close()
+
+class RecordingFetcher:
+    """Speichert jede geladene Listing- und Detail-Seite zusätzlich in einem Korpus-Verzeichnis"""
+
+    def __init__(self, fetcher, corpus):
+        self.fetcher = fetcher
+        self.corpus = corpus
+        self.name = f"{fetcher.name}+record"
+
+    def _record(self, url, html):
+        if html:
+            self.corpus.store_page(url, html)
+        return html
+
+    def fetch_listing_page(self, url):
+        return self._record(url, self.fetcher.fetch_listing_page(url))
+
+    def fetch_item_page(self, url):
+        return self._record(url, self.fetcher.fetch_item_page(url))
+
+    def close(self):
+        self.fetcher.close()
+
+class CorpusFetcher:
+    """Offline-Backend: liefert Seiten ausschließlich aus einem aufgezeichneten Korpus"""
+    name = "replay"
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.missing = set()
+
+    def fetch(self, url):
+        entry = self.corpus.get(url)
+        return entry.get("html") if entry else None
+
+    def fetch_listing_page(self, url):
+        return self.fetch(url)
+
+    def fetch_item_page(self, url):
+        html = self.fetch(url)
+        if html is None:
+            self.missing.add(PageCache.normalize_url(url))
+        return html
+
+    def close(self):
+        pass
+
+def save_corpus_manifest(corpus_dir, item_urls, source, listing_pages=0):
+    """Hält fest, wie ein Korpus entstanden ist: Basis-URL, Discovery-Quelle und die gefundenen Items
     
-    print(f"\n{'='*70}")
-    print(f"GESAMT: {len(all_items)} eindeutige Items von {max_pages} Seiten")
-    print(f"{'='*70}\n")
-    return all_items
+    Sitemap, ID-Liste und In-Game-Export laufen nicht über den Fetcher und landen
+    daher nicht im Korpus; replay_corpus nimmt die Items dann aus dem Manifest.
+    """
+    path = Path(corpus_dir) / CORPUS_MANIFEST_FILE
+    manifest = {
+        "baseUrl": BASE_URL,
+        "source": source,
+        "listingPages": listing_pages,
+        "items": {str(item_id): url for item_id, url in sorted(item_urls.items())},
+    }
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_path, path)
 
-def parse_vendor_div(div_text, div_soup):
-    """Parst ein Vendor-DIV und extrahiert alle Vendor-Informationen"""
-    vendors = []
+def load_corpus_manifest(corpus_dir):
+    """Manifest eines Korpus (None bei Korpora ohne Manifest)"""
+    path = Path(corpus_dir) / CORPUS_MANIFEST_FILE
+    if not path.exists():
+        return None
+    manifest = json.loads(path.read_text(encoding='utf-8'))
+    manifest["items"] = {int(item_id): url for item_id, url in manifest.get("items", {}).items()}
+    return manifest
+
+def escape_lua_string(text):
+    """Escaped einen String für Lua"""
+    if not text:
+        return ""
+    return str(text).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\r", "\\r")
+
+def map_texture_name(map_url):
+    """Dateiname der TGA-Textur (ohne Endung) für eine Karten-URL
     
-    if not div_soup:
-        return vendors
+    Der Name wird aus der URL abgeleitet (z.B. "2351_razorwind_shores.jpg"), das
+    stellt sicher, dass verschiedene Karten für die gleiche Zone unterschiedliche Namen haben.
+    """
+    url_filename = map_url.split('/')[-1]  # Holt den letzten Teil der URL
+    base_filename = url_filename.rsplit('.', 1)[0]  # Entfernt .jpg/.png
     
-    # Finde alle NPC-Links (Vendor-Namen)
-    npc_links = div_soup.find_all('a', href=re.compile(r'/npcs/\d+'))
+    # Säubere den Dateinamen
+    safe_filename = re.sub(r'[^\w\s-]', '_', base_filename).lower()
+    return f"map_{safe_filename}"
+
+_texture_aliases = None
+
+def load_texture_aliases(path=TEXTURE_ALIASES_FILE):
+    """Lädt die Alias-Tabelle doppelter Karten (Textur-Name -> kanonischer Name)"""
+    global _texture_aliases
+    if _texture_aliases is None:
+        path = Path(path)
+        _texture_aliases = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+    return _texture_aliases
+
+def map_texture_path(map_url):
+    """WoW-Texturpfad für eine Karten-URL (ohne .tga Extension, WoW fügt das automatisch hinzu)"""
+    name = map_texture_name(map_url)
+    return f"{MAP_TEXTURE_PREFIX}{load_texture_aliases().get(name, name)}"
+
+def optimize_texture_image(img, rle=False):
+    """Wählt das kleinste passende TGA-Format: 24 Bit ohne Alpha-Kanal, optional RLE-komprimiert"""
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA')
+    if img.mode == 'RGBA' and img.getchannel('A').getextrema() == (255, 255):
+        # Komplett deckend (z.B. JPEG-Quelle) - der Alpha-Kanal wäre nur Ballast
+        img = img.convert('RGB')
+    save_options = {"compression": "tga_rle"} if rle else {}
+    return img, save_options
+
+def save_tga(img, tga_path, rle=False):
+    """Speichert eine Textur im optimalen Format über eine Temp-Datei, gibt die Dateigröße zurück"""
+    img, save_options = optimize_texture_image(img, rle=rle)
+    tmp_path = f"{tga_path}.{os.getpid()}.tmp"
+    img.save(tmp_path, format='TGA', **save_options)
+    os.replace(tmp_path, tga_path)
+    return os.path.getsize(tga_path)
+
+def convert_map_image(content, tga_path, rle=False):
+    """Konvertiert ein heruntergeladenes Karten-Bild zu TGA (läuft im Prozess-Pool)"""
+    from PIL import Image
     
-    for npc_link in npc_links:
-        vendor_name = npc_link.get_text(strip=True)
-        if not vendor_name:
+    img = Image.open(io.BytesIO(content))
+    
+    # Resize falls zu groß (max 512x512 für WoW Performance)
+    max_size = 512
+    if img.width > max_size or img.height > max_size:
+        img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    
+    # Speichere erst in eine Temp-Datei, damit nie eine halbe Textur liegen bleibt
+    save_tga(img, tga_path, rle=rle)
+    return tga_path
+
+def texture_pixel_hash(img):
+    """Content-Hash über Größe und RGBA-Pixel (gleich für identische Bilder in verschiedenen TGA-Varianten)"""
+    digest = hashlib.sha256(f"{img.width}x{img.height}".encode('ascii'))
+    digest.update(img.convert('RGBA').tobytes())
+    return digest.hexdigest()
+
+def rewrite_texture_references(aliases, db_paths):
+    """Ersetzt Referenzen auf entfernte Duplikate in den Lua-DB-Dateien durch den kanonischen Namen
+
+    Wie save_lua_database über Temp-Datei und os.replace, damit ein Abbruch keine
+    halb geschriebene Datenbank hinterlässt.
+    """
+    if not aliases:
+        return
+    pattern = re.compile(r'(?<=[\\"])(' + "|".join(re.escape(name) for name in aliases) + r')(?=")')
+    for db_path in db_paths:
+        db_path = Path(db_path)
+        if not db_path.exists():
             continue
+        content = db_path.read_text(encoding='utf-8')
+        new_content = pattern.sub(lambda match: aliases[match.group(1)], content)
+        if new_content != content:
+            tmp_path = db_path.with_name(f".{db_path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+                    f.write(new_content)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, db_path)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            print(f"  Referenzen aktualisiert: {db_path}")
+
+def optimize_textures(textures_dir=TEXTURES_DIR, rle=False, dry_run=False,
+                      aliases_path=TEXTURE_ALIASES_FILE, db_paths=None):
+    """Optimiert alle Vendor-Karten: kleinstes TGA-Format und Entfernen inhaltsgleicher Duplikate
+    
+    Duplikate werden über den Pixel-Hash erkannt; behalten wird der (sortiert)
+    erste Name, die anderen landen in der Alias-Tabelle und ihre Referenzen in
+    der Lua-DB werden umgeschrieben. Gibt einen Report mit den gesparten Bytes zurück.
+    """
+    from PIL import Image
+    
+    textures_dir = Path(textures_dir)
+    canonical_by_hash = {}
+    aliases = {}
+    report = {"files": 0, "bytesBefore": 0, "bytesAfter": 0, "reencoded": 0, "duplicates": 0}
+    
+    for tga_path in sorted(textures_dir.glob("*.tga")):
+        size_before = tga_path.stat().st_size
+        report["files"] += 1
+        report["bytesBefore"] += size_before
         
-        # Finde das übergeordnete Element (oft ein div oder span)
-        # Der Preis und die Location sind Geschwister-Elemente
-        vendor_container = npc_link.find_parent('div', class_='mb-3') or npc_link.find_parent()
+        with Image.open(tga_path) as img:
+            img.load()
+        name = tga_path.stem
+        pixel_hash = texture_pixel_hash(img)
         
-        location = None
-        price = None
-        currency = None
-        map_image = None
-        waypoint = None
-        coord_x = None
-        coord_y = None
+        if pixel_hash in canonical_by_hash:
+            aliases[name] = canonical_by_hash[pixel_hash]
+            report["duplicates"] += 1
+            print(f"  Duplikat: {name} -> {aliases[name]}")
+            if not dry_run:
+                tga_path.unlink()
+            continue
+        canonical_by_hash[pixel_hash] = name
         
-        if vendor_container:
-            # LOCATION - suche nach Text in Klammern (...)
-            container_text = vendor_container.get_text()
-            location_match = re.search(r'\(([^)]+)\)', container_text)
-            if location_match:
-                location = location_match.group(1).strip()
+        optimized, save_options = optimize_texture_image(img, rle=rle)
+        buffer = io.BytesIO()
+        optimized.save(buffer, format='TGA', **save_options)
+        size_after = buffer.tell()
+        
+        if size_after < size_before:
+            report["reencoded"] += 1
+            if not dry_run:
+                tmp_path = tga_path.with_name(f"{tga_path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(buffer.getvalue())
+                os.replace(tmp_path, tga_path)
+        else:
+            size_after = size_before
+        report["bytesAfter"] += size_after
+    
+    report["bytesSaved"] = report["bytesBefore"] - report["bytesAfter"]
+    
+    global _texture_aliases
+    if aliases and not dry_run:
+        all_aliases = dict(load_texture_aliases(aliases_path))
+        all_aliases.update(aliases)
+        # Ketten auflösen (a -> b, b -> c wird a -> c)
+        for name, target in all_aliases.items():
+            while target in all_aliases and all_aliases[target] != target:
+                target = all_aliases[target]
+            all_aliases[name] = target
+        Path(aliases_path).write_text(json.dumps(all_aliases, indent=2, sort_keys=True) + "\n", encoding='utf-8')
+        _texture_aliases = all_aliases
+        rewrite_texture_references(all_aliases, db_paths if db_paths is not None else
+                                   sorted(Path(".").glob("HousingItemTrackerDB*.lua")))
+    
+    print(f"\n{'='*70}")
+    print(f"TEXTUREN{' (Testlauf)' if dry_run else ''}: {report['files']} Dateien, "
+          f"{report['reencoded']} neu kodiert, {report['duplicates']} Duplikate entfernt")
+    print(f"  {report['bytesBefore'] / 1048576:.1f} MB -> {report['bytesAfter'] / 1048576:.1f} MB "
+          f"({report['bytesSaved'] / 1048576:.1f} MB gespart)")
+    print(f"{'='*70}\n")
+    return report
+
+class MapPipeline:
+    """Eigene Stufe für Vendor-Karten: Download über eine gepoolte Session, Konvertierung im Prozess-Pool
+    
+    Jede Karten-URL wird pro Lauf genau einmal angefordert (auch wenn die
+    Datei noch nicht auf der Platte liegt), alle weiteren Anfragen bekommen
+    das gleiche Future.
+    """
+
+    def __init__(self, session=None, download_workers=MAP_DOWNLOAD_WORKERS,
+                 convert_workers=None, textures_dir=TEXTURES_DIR, rle=False, metrics=None, guard=None):
+        from concurrent.futures import ProcessPoolExecutor
+        
+        self.owns_session = session is None
+        self.metrics = metrics or PipelineMetrics()
+        self.guard = guard or FetchGuard(metrics=self.metrics)
+        self.download_workers = download_workers
+        self.session = session or create_http_session(pool_size=download_workers)
+        self.textures_dir = Path(textures_dir)
+        self.rle = rle
+        self.download_pool = ThreadPoolExecutor(max_workers=download_workers)
+        # convert_workers=0 konvertiert direkt im Download-Thread (z.B. in kleinen Containern)
+        self.convert_pool = ProcessPoolExecutor(max_workers=convert_workers) if convert_workers != 0 else None
+        self.requested = {}
+        self.lock = threading.Lock()
+        self.downloaded = 0
+        self.reused = 0
+
+    def submit(self, map_url):
+        """Fordert eine Karte an, gibt ein Future mit dem WoW-Texturpfad (oder None) zurück"""
+        with self.lock:
+            future = self.requested.get(map_url)
+            if future is None:
+                future = self.requested[map_url] = self.download_pool.submit(self._fetch, map_url)
+        return future
+
+    def _fetch(self, map_url):
+        try:
+            self.textures_dir.mkdir(parents=True, exist_ok=True)
+            name = map_texture_name(map_url)
+            tga_path = self.textures_dir / f"{load_texture_aliases().get(name, name)}.tga"
+            if tga_path.exists():
+                with self.lock:
+                    self.reused += 1
+                return map_texture_path(map_url)
             
-            # PREIS - suche nach <strong> Tag mit Zahl
-            strong_tag = vendor_container.find('strong')
-            if strong_tag:
-                price_text = strong_tag.get_text(strip=True)
-                price_match = re.search(r'(\d+)', price_text)
-                if price_match:
-                    price = int(price_match.group(1))
+            with self.metrics.timer("map_download"):
+                content = self.guard.call(self._download, map_url)
+            self.metrics.incr("map_bytes", len(content))
             
-            # CURRENCY - suche nach Currency-Link oder Gold-Image
-            # Option 1: Currency-Link (z.B. Community Coupons, Honor)
-            currency_link = vendor_container.find('a', href=re.compile(r'/currencies/\d+'))
-            if currency_link:
-                currency = currency_link.get_text(strip=True)
-            else:
-                # Option 2: Gold-Image
-                gold_img = vendor_container.find('img', alt=re.compile(r'gold', re.I))
-                if gold_img:
-                    currency = "Gold"
+            with self.metrics.timer("map_convert"):
+                if self.convert_pool:
+                    self.convert_pool.submit(convert_map_image, content, str(tga_path), self.rle).result()
+                else:
+                    convert_map_image(content, str(tga_path), self.rle)
+            
+            with self.lock:
+                self.downloaded += 1
+            print(f"    Karte gespeichert: {tga_path.name}")
+            return map_texture_path(map_url)
+        except Exception as e:
+            print(f"    Fehler beim Herunterladen der Karte {map_url}: {e}")
+            return None
+
+    def _download(self, map_url):
+        response = self.session.get(map_url, timeout=10)
+        response.raise_for_status()
+        return response.content
+
+    def process_items(self, items_data):
+        """Lädt alle Karten der gescrapten Vendoren und setzt mapTexture (None bei Fehlern)"""
+        vendors = [vendor for item in items_data.values() for vendor in item.get("vendors", [])
+                   if vendor.get("mapUrl")]
+        unique_urls = sorted({vendor["mapUrl"] for vendor in vendors})
+        print(f"Lade {len(unique_urls)} eindeutige Karten für {len(vendors)} Vendor-Einträge...")
+        
+        futures = {map_url: self.submit(map_url) for map_url in unique_urls}
+        textures = {map_url: future.result() for map_url, future in futures.items()}
+        for vendor in vendors:
+            vendor["mapTexture"] = textures[vendor["mapUrl"]]
+        
+        failed = sum(1 for texture in textures.values() if texture is None)
+        print(f"Karten: {self.downloaded} neu, {self.reused} vorhanden, {failed} fehlgeschlagen")
+        return textures
+
+    def close(self):
+        self.download_pool.shutdown(wait=True)
+        if self.convert_pool:
+            self.convert_pool.shutdown(wait=True)
+        if self.owns_session:
+            self.session.close()
+
+def download_and_convert_map(map_url, vendor_name=None, location=None):
+    """Lädt eine einzelne Karte herunter und konvertiert sie zu TGA (ohne Pools)"""
+    if not map_url:
+        return None
+    
+    pipeline = MapPipeline(session=create_http_session(pool_size=1), download_workers=1, convert_workers=0)
+    try:
+        return pipeline.submit(map_url).result()
+    finally:
+        pipeline.close()
+
+def extract_item_id(url):
+    """Extrahiert Item-ID aus URL"""
+    match = re.search(r'/decor/(\d+)', url)
+    return int(match.group(1)) if match else None
+
+def parse_listing_html(html, base_url=None):
+    """Extrahiert alle Decor-Links (ID -> absolute URL) aus dem HTML einer Listing-Seite"""
+    items = {}
+    base_url = base_url or BASE_URL
+    for match in DECOR_LINK_PATTERN.finditer(html or ""):
+        href = urljoin(base_url + "/", match.group(1))
+        item_id = extract_item_id(href)
+        if item_id and item_id not in items:
+            items[item_id] = href
+    return items
+
+class CheckpointLog:
+    """Append-only Checkpoint-Log (JSON Lines): ein Record pro Listing-Seite bzw. gescraptem Item
+    
+    Records werden sofort angehängt und in Batches per fsync auf die Platte
+    gebracht. replay() liest das Log wieder ein, damit ein abgebrochener Lauf
+    mit --resume dort weitermachen kann, wo er aufgehört hat.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE, fsync_every=CHECKPOINT_FSYNC_EVERY):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.file = None
+
+    def open(self, resume=False):
+        """Öffnet das Log zum Anhängen (ohne resume wird ein altes Log verworfen)"""
+        self.file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self.file.tell() > 0:
+            # Unvollständige letzte Zeile abschließen, damit neue Records lesbar bleiben
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+        return self
+
+    def replay(self):
+        """Liest alle Records: (Listing-Seiten {page: {id: url}}, Items {id: data})"""
+        pages = {}
+        items = {}
+        if not self.path.exists():
+            return pages, items
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Letzte Zeile eines abgebrochenen Laufs kann unvollständig sein
+                    continue
+                if record.get("type") == "listing":
+                    pages[record["page"]] = {int(item_id): url for item_id, url in record["items"].items()}
+                elif record.get("type") == "item":
+                    items[record["id"]] = record["data"]
+        return pages, items
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.pending += 1
+            if self.pending >= self.fsync_every:
+                self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def write_listing_page(self, page_num, page_items):
+        self._append({"type": "listing", "page": page_num, "items": page_items})
+
+    def write_item(self, item_id, item_data):
+        self._append({"type": "item", "id": item_id, "data": item_data})
+
+    def close(self):
+        if self.file is None:
+            return
+        with self.lock:
+            self._sync()
+            self.file.close()
+            self.file = None
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    subcategory TEXT,
+    budget_cost INTEGER,
+    achievement TEXT,
+    quest TEXT,
+    profession TEXT,
+    extra TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    item_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (item_id, position)
+);
+CREATE TABLE IF NOT EXISTS vendors (
+    id INTEGER PRIMARY KEY,
+    npc_id INTEGER,
+    name TEXT NOT NULL,
+    location TEXT
+);
+CREATE TABLE IF NOT EXISTS item_vendors (
+    item_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    vendor_id INTEGER NOT NULL REFERENCES vendors(id),
+    price INTEGER,
+    currency TEXT,
+    map_texture TEXT,
+    map_url TEXT,
+    waypoint TEXT,
+    coord_x REAL,
+    coord_y REAL,
+    extra TEXT,
+    PRIMARY KEY (item_id, position)
+);
+CREATE TABLE IF NOT EXISTS materials (
+    item_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    material_id INTEGER NOT NULL,
+    name TEXT,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (item_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_vendors_npc ON vendors (npc_id);
+CREATE INDEX IF NOT EXISTS idx_vendors_name ON vendors (name, location);
+CREATE INDEX IF NOT EXISTS idx_item_vendors_vendor ON item_vendors (vendor_id);
+CREATE INDEX IF NOT EXISTS idx_item_vendors_map ON item_vendors (map_url);
+CREATE INDEX IF NOT EXISTS idx_materials_material ON materials (material_id);
+CREATE INDEX IF NOT EXISTS idx_sources_source ON sources (source);
+"""
+
+# Spalten der Item-/Vendor-Dicts, die der Store normalisiert; alles andere landet im extra-JSON
+STORE_ITEM_FIELDS = ("name", "category", "subcategory", "budget_cost", "achievement", "quest", "profession")
+STORE_VENDOR_FIELDS = (("mapTexture", "map_texture"), ("mapUrl", "map_url"), ("waypoint", "waypoint"),
+                       ("coordX", "coord_x"), ("coordY", "coord_y"))
+STORE_ITEM_KEYS = frozenset(("id", "sources", "vendors", "materials") + STORE_ITEM_FIELDS)
+STORE_VENDOR_KEYS = frozenset(("name", "location", "price", "currency", "npcId")
+                              + tuple(key for key, _ in STORE_VENDOR_FIELDS))
+
+class ItemStore:
+    """Normalisierte Zwischenablage der gescrapten Items in SQLite
+    
+    Tabellen items, sources, vendors, item_vendors und materials mit Indizes
+    auf Item-, NPC- und Material-ID. Items werden während des Laufs einzeln
+    geschrieben; iter_items() liest sie sortiert und streamend wieder als
+    Item-Dicts, sodass Lua-DB und JSON ohne erneutes Scrapen und ohne den
+    ganzen Datenbestand im Speicher neu erzeugt werden können.
+    """
+
+    def __init__(self, path=STORE_FILE):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(STORE_SCHEMA)
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def _vendor_id(self, vendor):
+        """Sucht bzw. legt den Vendor an (NPC-ID + Name + Location)
+        
+        Ein NPC kann je nach Item an mehreren Orten stehen; jede Kombination ist
+        ein eigener Eintrag, damit kein Item die Location eines anderen überschreibt.
+        """
+        npc_id = vendor.get("npcId")
+        name, location = vendor.get("name") or "", vendor.get("location")
+        row = self.db.execute("SELECT id FROM vendors WHERE npc_id IS ? AND name = ? AND location IS ?",
+                              (npc_id, name, location)).fetchone()
+        if row:
+            return row[0]
+        return self.db.execute("INSERT INTO vendors (npc_id, name, location) VALUES (?, ?, ?)",
+                               (npc_id, name, location)).lastrowid
+
+    def _write_item(self, item):
+        item_id = int(item["id"])
+        for table in ("sources", "item_vendors", "materials"):
+            self.db.execute(f"DELETE FROM {table} WHERE item_id = ?", (item_id,))
+        extra = {key: value for key, value in item.items() if key not in STORE_ITEM_KEYS}
+        self.db.execute(
+            f"INSERT OR REPLACE INTO items (id, {', '.join(STORE_ITEM_FIELDS)}, extra, updated_at) "
+            f"VALUES ({', '.join('?' * (len(STORE_ITEM_FIELDS) + 3))})",
+            (item_id,) + tuple(item.get(field) for field in STORE_ITEM_FIELDS)
+            + (json.dumps(extra, ensure_ascii=False) if extra else None, time.time()))
+        self.db.executemany("INSERT INTO sources (item_id, position, source) VALUES (?, ?, ?)",
+                            [(item_id, position, source) for position, source in enumerate(item.get("sources", []))])
+        for position, vendor in enumerate(item.get("vendors", [])):
+            extra = {key: value for key, value in vendor.items() if key not in STORE_VENDOR_KEYS}
+            columns = ("item_id", "position", "vendor_id", "price", "currency") + \
+                tuple(column for _, column in STORE_VENDOR_FIELDS) + ("extra",)
+            self.db.execute(
+                f"INSERT INTO item_vendors ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                (item_id, position, self._vendor_id(vendor), vendor.get("price"), vendor.get("currency"))
+                + tuple(vendor.get(key) for key, _ in STORE_VENDOR_FIELDS)
+                + (json.dumps(extra, ensure_ascii=False) if extra else None,))
+        self.db.executemany(
+            "INSERT INTO materials (item_id, position, material_id, name, quantity) VALUES (?, ?, ?, ?, ?)",
+            [(item_id, position, material["id"], material.get("name"), material.get("quantity", 1))
+             for position, material in enumerate(item.get("materials", []))])
+
+    def save_item(self, item):
+        """Schreibt (bzw. ersetzt) ein Item in einer eigenen Transaktion"""
+        with self.lock, self.db:
+            self._write_item(item)
+
+    def save_items(self, items):
+        """Schreibt mehrere Items in einer Transaktion"""
+        with self.lock, self.db:
+            for item in items:
+                self._write_item(item)
+
+    def update_map_textures(self, textures):
+        """Setzt die Texturpfade nach der Karten-Stufe ({map_url: texture oder None})"""
+        with self.lock, self.db:
+            self.db.executemany("UPDATE item_vendors SET map_texture = ? WHERE map_url = ?",
+                                [(texture, map_url) for map_url, texture in textures.items()])
+
+    def retain(self, item_ids):
+        """Entfernt Items, die im aktuellen Katalog nicht mehr vorkommen; gibt deren Anzahl zurück"""
+        with self.lock, self.db:
+            self.db.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (id INTEGER PRIMARY KEY)")
+            self.db.execute("DELETE FROM keep_ids")
+            self.db.executemany("INSERT OR IGNORE INTO keep_ids (id) VALUES (?)", [(int(i),) for i in item_ids])
+            removed = [row[0] for row in self.db.execute("SELECT id FROM items WHERE id NOT IN (SELECT id FROM keep_ids)")]
+            for table, column in (("items", "id"), ("sources", "item_id"), ("item_vendors", "item_id"),
+                                  ("materials", "item_id")):
+                self.db.execute(f"DELETE FROM {table} WHERE {column} NOT IN (SELECT id FROM keep_ids)")
+            self.db.execute("DELETE FROM vendors WHERE id NOT IN (SELECT vendor_id FROM item_vendors)")
+        return len(removed)
+
+    def iter_items(self):
+        """Liefert (id, Item-Dict) sortiert nach ID, streamend über parallele sortierte Cursor"""
+        with self.lock:
+            db = sqlite3.connect(str(self.path))
+        try:
+            items = db.execute(f"SELECT id, {', '.join(STORE_ITEM_FIELDS)}, extra FROM items ORDER BY id")
+            sources = GroupedRows(db.execute("SELECT item_id, source FROM sources ORDER BY item_id, position"))
+            vendors = GroupedRows(db.execute(
+                "SELECT iv.item_id, v.name, v.location, iv.price, iv.currency, "
+                f"{', '.join('iv.' + column for _, column in STORE_VENDOR_FIELDS)}, v.npc_id, iv.extra "
+                "FROM item_vendors iv JOIN vendors v ON v.id = iv.vendor_id ORDER BY iv.item_id, iv.position"))
+            materials = GroupedRows(db.execute(
+                "SELECT item_id, material_id, name, quantity FROM materials ORDER BY item_id, position"))
+            
+            for row in items:
+                item_id = row[0]
+                fields = dict(zip(STORE_ITEM_FIELDS, row[1:-1]))
+                item = {
+                    "id": item_id,
+                    "name": fields["name"],
+                    "category": fields["category"],
+                    "subcategory": fields["subcategory"],
+                    "budget_cost": fields["budget_cost"],
+                    "sources": [source for (source,) in sources.take(item_id)],
+                    "vendors": [self._vendor_dict(vendor_row) for vendor_row in vendors.take(item_id)],
+                    "materials": [{"id": mat_id, "name": name, "quantity": quantity}
+                                  for mat_id, name, quantity in materials.take(item_id)],
+                    "achievement": fields["achievement"],
+                    "quest": fields["quest"],
+                    "profession": fields["profession"],
+                }
+                if row[-1]:
+                    item.update(json.loads(row[-1]))
+                yield item_id, item
+        finally:
+            db.close()
+
+    @staticmethod
+    def _vendor_dict(row):
+        name, location, price, currency = row[:4]
+        vendor = {"name": name, "location": location, "price": price, "currency": currency}
+        vendor.update(zip((key for key, _ in STORE_VENDOR_FIELDS), row[4:4 + len(STORE_VENDOR_FIELDS)]))
+        npc_id, extra = row[-2:]
+        if npc_id is not None:
+            vendor["npcId"] = npc_id
+        if extra:
+            vendor.update(json.loads(extra))
+        return vendor
+
+    def items(self):
+        """Alle Items als Dict {id: Item} (für kleine Datenmengen und Vergleiche)"""
+        return dict(self.iter_items())
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+class GroupedRows:
+    """Liest einen nach item_id sortierten Cursor gruppenweise mit (Merge-Join ohne N+1-Abfragen)"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.pending = next(cursor, None)
+
+    def take(self, item_id):
+        rows = []
+        while self.pending is not None and self.pending[0] <= item_id:
+            if self.pending[0] == item_id:
+                rows.append(self.pending[1:])
+            self.pending = next(self.cursor, None)
+        return rows
+
+def fetch_listing_links(fetcher, page_num, rate_limiter=None, metrics=None):
+    """Lädt eine Listing-Seite, gibt {id: url} zurück ({} für leere Seiten, None wenn die Seite nicht geladen werden konnte)"""
+    metrics = metrics or PipelineMetrics()
+    page_url = f"{BASE_URL}/decor/?page={page_num}#grid-view"
+    
+    if rate_limiter:
+        with metrics.timer("rate_limit_wait"):
+            rate_limiter.wait()
+    
+    try:
+        with metrics.timer("fetch_listing"):
+            html = fetcher.fetch_listing_page(page_url)
+    except Exception as e:
+        if isinstance(e, EmptyPage) or is_permanent_error(e):
+            # Hinter dem Katalogende: leere Seite, kein Fehler und kein erneuter Versuch
+            metrics.incr("listing_empty")
+            return {}
+        print(f"  Fehler auf Seite {page_num}: {e}")
+        metrics.incr("listing_failed")
+        return None
+    if html is None:
+        print(f"  [Seite {page_num}] Timeout - keine Items gefunden")
+        metrics.incr("listing_failed")
+        return None
+    
+    metrics.incr("listing_pages")
+    metrics.incr("listing_bytes", len(html.encode('utf-8')))
+    with metrics.timer("parse_listing"):
+        return parse_listing_html(html)
+
+def collect_item_urls(fetcher, max_pages=MAX_LISTING_PAGES, rate_limiter=None, checkpoint=None,
+                      done_pages=None, metrics=None, fetcher_factory=None, workers=1, on_items=None):
+    """Sammelt alle Item-URLs über die paginierten Listing-Seiten
+    
+    Die Seiten werden in Wellen von `workers` Seiten parallel geladen (je Thread ein
+    eigenes Fetch-Backend aus fetcher_factory). Die Paginierung endet von selbst, sobald
+    EMPTY_PAGES_TO_STOP Seiten in Folge keine neuen Items liefern; fehlgeschlagene Seiten
+    zählen dabei nicht mit. max_pages ist nur eine Obergrenze. done_pages ({page: {id: url}}) enthält bereits im Checkpoint-Log
+    erfasste Seiten, die nicht erneut geladen werden. on_items({id: url}) bekommt
+    nach jeder Seite die neu gefundenen Items (z.B. für die asyncio-Pipeline).
+    """
+    all_items = {}
+    done_pages = done_pages or {}
+    metrics = metrics or PipelineMetrics()
+    workers = max(1, workers) if fetcher_factory else 1
+    on_items = on_items or (lambda items: None)
+    
+    fetchers = queue.Queue()
+    fetchers.put(fetcher)
+    extra_fetchers = [fetcher_factory(idx) for idx in range(1, workers)]
+    for extra_fetcher in extra_fetchers:
+        fetchers.put(extra_fetcher)
+    
+    def load(page_num):
+        page_fetcher = fetchers.get()
+        try:
+            return page_num, fetch_listing_links(page_fetcher, page_num, rate_limiter, metrics)
+        finally:
+            fetchers.put(page_fetcher)
+    
+    print(f"Sammle Items (bis zu {max_pages} Seiten, {workers} parallel)...")
+    
+    empty_streak = 0
+    last_page = 0
+    failed_pages = []
+    still_failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="listing") as pool:
+            while last_page < max_pages and empty_streak < EMPTY_PAGES_TO_STOP:
+                wave = range(last_page + 1, min(last_page + workers, max_pages) + 1)
+                loaded = dict(pool.map(load, [page_num for page_num in wave if page_num not in done_pages]))
+                
+                for page_num in wave:
+                    if page_num in done_pages:
+                        page_links = done_pages[page_num]
+                    else:
+                        page_links = loaded[page_num]
+                        if checkpoint and page_links is not None:
+                            checkpoint.write_listing_page(page_num, page_links)
+                    
+                    last_page = page_num
+                    if page_links is None:
+                        # Nicht geladen heißt nicht leer: zählt nicht zum Ende des Katalogs
+                        failed_pages.append(page_num)
+                        print(f"[Seite {page_num}] fehlgeschlagen, wird am Ende erneut versucht")
+                        continue
+                    
+                    new_items = {item_id: href for item_id, href in page_links.items() if item_id not in all_items}
+                    all_items.update(new_items)
+                    on_items(new_items)
+                    page_items = len(new_items)
+                    empty_streak = 0 if page_items else empty_streak + 1
+                    print(f"[Seite {page_num}] {page_items} neue Items gefunden (Gesamt: {len(all_items)})")
+                    if empty_streak >= EMPTY_PAGES_TO_STOP:
+                        break
+            
+            # Letzter Versuch für alle fehlgeschlagenen Seiten (auch die zwischen den leeren am Ende)
+            if failed_pages:
+                print(f"\nLetzter Versuch für {len(failed_pages)} fehlgeschlagene Listing-Seiten...")
+            for page_num, page_links in pool.map(load, failed_pages):
+                if page_links is None:
+                    still_failed.append(page_num)
+                    continue
+                if checkpoint:
+                    checkpoint.write_listing_page(page_num, page_links)
+                new_items = {item_id: href for item_id, href in page_links.items() if item_id not in all_items}
+                all_items.update(new_items)
+                on_items(new_items)
+    finally:
+        for extra_fetcher in extra_fetchers:
+            extra_fetcher.close()
+    
+    if still_failed:
+        metrics.incr("listing_failed_final", len(still_failed))
+        print(f"\nWARNUNG: {len(still_failed)} Listing-Seiten konnten nicht geladen werden, ihre Items fehlen: "
+              + ", ".join(str(page_num) for page_num in still_failed))
+    if done_pages:
+        print(f"\n{len(done_pages)} Seiten aus dem Checkpoint übernommen")
+    if empty_streak < EMPTY_PAGES_TO_STOP:
+        print(f"\nWARNUNG: Obergrenze von {max_pages} Seiten erreicht, der Katalog ist evtl. größer (--max-pages)")
+    print(f"\n{'='*70}")
+    print(f"GESAMT: {len(all_items)} eindeutige Items von {last_page - empty_streak} Seiten")
+    print(f"{'='*70}\n")
+    return all_items
+
+def discover_from_sitemaps(session, urls, metrics=None, max_documents=MAX_SITEMAP_DOCUMENTS):
+    """Liest Decor-URLs aus Sitemaps (auch Sitemap-Indizes und .xml.gz) oder JSON-Endpunkten
+    
+    Gibt {id: url} zurück, leer wenn keiner der Endpunkte Decor-Links enthält.
+    """
+    import requests
+    
+    metrics = metrics or PipelineMetrics()
+    items = {}
+    pending = list(urls)
+    seen = set()
+    
+    while pending and len(seen) < max_documents:
+        url = urljoin(BASE_URL + "/", pending.pop(0))
+        if url in seen:
+            continue
+        seen.add(url)
+        try:
+            with metrics.timer("fetch_discovery"):
+                response = session.get(url, timeout=HTTP_TIMEOUT)
+            if response.status_code != 200:
+                continue
+            content = response.content
+            if content[:2] == b"\x1f\x8b":
+                content = gzip.decompress(content)
+        except (requests.RequestException, OSError) as e:
+            print(f"  Discovery-Endpunkt {url} nicht erreichbar: {e}")
+            continue
+        
+        metrics.incr("discovery_documents")
+        # JSON-Antworten escapen Slashes gern als \/
+        text = content.decode('utf-8', errors='replace').replace('\\/', '/')
+        found = 0
+        for match in DECOR_URL_PATTERN.finditer(text):
+            href = urljoin(BASE_URL + "/", match.group(0))
+            item_id = extract_item_id(href)
+            if item_id and item_id not in items:
+                items[item_id] = href
+                found += 1
+        nested = [loc for loc in SITEMAP_LOC_PATTERN.findall(text) if SITEMAP_FILE_PATTERN.search(loc)]
+        # Decor-Sitemaps zuerst, falls der Index auch NPCs, Quests usw. aufführt
+        pending.extend(sorted(nested, key=lambda loc: "decor" not in loc))
+        print(f"  {url}: {found} Decor-Links, {len(nested)} verschachtelte Sitemaps")
+    
+    return items
+
+def discover_item_urls(fetcher, session, mode="auto", endpoints=None, checkpoint=None,
+                       done_pages=None, metrics=None, **listing_options):
+    """Discovery-Stufe: Sitemap/JSON-Endpunkt (wenige Requests) oder paginierte Listing-Seiten
+    
+    mode 'auto' nutzt die Endpunkte und fällt auf die Listing-Seiten zurück, wenn
+    dort keine Decor-Links gefunden werden. Das Endpunkt-Ergebnis wird als
+    Listing-Seite 0 im Checkpoint-Log gespeichert.
+    """
+    done_pages = done_pages or {}
+    if mode != "listing":
+        if 0 in done_pages:
+            print(f"Discovery: {len(done_pages[0])} Items aus dem Checkpoint übernommen")
+            if listing_options.get("on_items"):
+                listing_options["on_items"](dict(done_pages[0]))
+            return dict(done_pages[0])
+        
+        print("Discovery über Sitemap/Daten-Endpunkt...")
+        items = discover_from_sitemaps(session, list(endpoints or ()) + list(SITEMAP_URLS), metrics=metrics)
+        if items:
+            if checkpoint:
+                checkpoint.write_listing_page(0, items)
+            if listing_options.get("on_items"):
+                listing_options["on_items"](dict(sorted(items.items())))
+            print(f"\n{'='*70}")
+            print(f"GESAMT: {len(items)} eindeutige Items aus Sitemap/Daten-Endpunkt")
+            print(f"{'='*70}\n")
+            return dict(sorted(items.items()))
+        if mode == "sitemap":
+            print("Keine Decor-Links in Sitemap/Daten-Endpunkt gefunden!")
+            return {}
+        print("Keine Decor-Links gefunden, nutze die Listing-Seiten")
+    
+    return collect_item_urls(fetcher, checkpoint=checkpoint, done_pages=done_pages, metrics=metrics,
+                             **listing_options)
+
+def shard_of(item_id, count):
+    """Stabiler Shard-Index (0-basiert) einer Item-ID, unabhängig von Python-Hash-Seed und Reihenfolge"""
+    digest = hashlib.sha1(str(int(item_id)).encode('ascii')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+def select_shard(item_urls, index, count):
+    """Nur die Items des Shards index/count (index 1-basiert wie auf der Kommandozeile)"""
+    return {item_id: url for item_id, url in item_urls.items() if shard_of(item_id, count) == index - 1}
+
+def parse_shard(value):
+    """argparse-Typ für --shard i/N"""
+    match = re.fullmatch(r'(\d+)/(\d+)', value.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"Shard muss i/N mit 1 <= i <= N sein, nicht {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+def shard_path(path, shard):
+    """Pfad mit Shard-Suffix: housing_items.sqlite -> housing_items_shard2of4.sqlite"""
+    path = Path(path)
+    index, count = shard
+    return path.with_name(f"{path.stem}_shard{index}of{count}{path.suffix}")
+
+def load_id_list(path):
+    """Liest eine gespeicherte ID-Liste: JSON ({id: url} oder [id, ...]) oder eine ID/URL pro Zeile"""
+    text = Path(path).read_text(encoding='utf-8')
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith('#')]
+    
+    if isinstance(data, dict):
+        return {int(item_id): url for item_id, url in sorted(data.items(), key=lambda entry: int(entry[0]))}
+    item_urls = {}
+    for entry in data:
+        entry = str(entry)
+        item_id = int(entry) if entry.isdigit() else extract_item_id(entry)
+        if item_id is not None:
+            item_urls[item_id] = entry if not entry.isdigit() else f"{BASE_URL}/decor/{item_id}"
+    return dict(sorted(item_urls.items()))
+
+def save_id_list(item_urls, path):
+    """Speichert die gefundenen Items als {id: url} (Eingabe für --id-list auf anderen Maschinen)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({str(item_id): item_urls[item_id] for item_id in sorted(item_urls)}, f, indent=2)
+
+class VendorCache:
+    """Vendor-Entitäten eines Laufs: (NPC-ID, Ort, Waypoint) -> aufgelöste Karte und Koordinaten
+    
+    Derselbe Vendor verkauft oft hunderte Items. Karte, Map-Pin und Texturpfad
+    werden deshalb nur beim ersten Auftreten aus dem HTML gelesen, pro Seite
+    bleiben nur Preis und Währung. Ort und Waypoint gehören zum Schlüssel, weil
+    einzelne NPCs je nach Item an verschiedenen Stellen stehen (z.B. Garnison).
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries.setdefault(key, entry)
+
+def parse_vendor_location(vendor_container):
+    """Liest Karte und Map-Pin eines Vendors (der teure Teil, wird pro Vendor-Entität gecacht)"""
+    map_image = None
+    map_url = None
+    coord_x = None
+    coord_y = None
+    
+    # MAP IMAGE - suche nach Karten-Bildern (oft in einem img oder als background-image)
+    # Vendor Location Maps haben oft "map" im Dateinamen
+    map_imgs = vendor_container.find_all('img', src=MAP_SRC_PATTERN)
+    if map_imgs:
+        map_img = map_imgs[0]
+        map_image_url = map_img.get('src')
+        
+        # Extrahiere Koordinaten aus map-pin div
+        map_pin = vendor_container.find('div', class_='map-pin')
+        if map_pin:
+            coord_x_str = map_pin.get('data-x')
+            coord_y_str = map_pin.get('data-y')
+            
+            if coord_x_str and coord_y_str:
+                try:
+                    coord_x = float(coord_x_str)
+                    coord_y = float(coord_y_str)
+                except:
+                    pass
+        
+        # Konvertiere zu absoluter URL
+        if map_image_url:
+            map_url = urljoin(BASE_URL + "/", map_image_url)
+            # Download/Konvertierung passiert gesammelt in der MapPipeline
+            map_image = map_texture_path(map_url)
+    
+    return {"mapTexture": map_image, "mapUrl": map_url, "coordX": coord_x, "coordY": coord_y}
+
+def parse_vendor_div(div_text, div_soup, vendor_cache=None):
+    """Parst ein Vendor-DIV und extrahiert alle Vendor-Informationen
+    
+    Karte und Koordinaten kommen aus dem VendorCache, sobald der Vendor (NPC-ID)
+    einmal aufgelöst wurde; Preis und Währung werden immer von der Seite gelesen.
+    """
+    vendors = []
+    seen = set()
+    vendor_cache = vendor_cache if vendor_cache is not None else VendorCache()
+    
+    if not div_soup:
+        return vendors
+    
+    # Finde alle NPC-Links (Vendor-Namen)
+    npc_links = div_soup.find_all('a', href=NPC_LINK_PATTERN)
+    
+    for npc_link in npc_links:
+        vendor_name = npc_link.get_text(strip=True)
+        if not vendor_name:
+            continue
+        npc_id = int(NPC_LINK_PATTERN.search(npc_link['href']).group(1))
+        
+        # Finde das übergeordnete Element (oft ein div oder span)
+        # Der Preis und die Location sind Geschwister-Elemente
+        vendor_container = npc_link.find_parent('div', class_='mb-3') or npc_link.find_parent()
+        
+        location = None
+        price = None
+        currency = None
+        currency_id = None
+        waypoint = None
+        shared = {"mapTexture": None, "mapUrl": None, "coordX": None, "coordY": None}
+        
+        if vendor_container:
+            # LOCATION - suche nach Text in Klammern (...)
+            container_text = vendor_container.get_text()
+            location_match = LOCATION_PATTERN.search(container_text)
+            if location_match:
+                location = location_match.group(1).strip()
+            
+            # PREIS - suche nach <strong> Tag mit Zahl
+            strong_tag = vendor_container.find('strong')
+            if strong_tag:
+                price_text = strong_tag.get_text(strip=True)
+                price_match = NUMBER_PATTERN.search(price_text)
+                if price_match:
+                    price = int(price_match.group(1))
+            
+            # CURRENCY - suche nach Currency-Link oder Gold-Image
+            # Option 1: Currency-Link (z.B. Community Coupons, Honor)
+            currency_link = vendor_container.find('a', href=CURRENCY_LINK_PATTERN)
+            if currency_link:
+                currency = currency_link.get_text(strip=True)
+                currency_id = int(CURRENCY_LINK_PATTERN.search(currency_link['href']).group(1))
+            else:
+                # Option 2: Gold-Image
+                gold_img = vendor_container.find('img', alt=GOLD_ALT_PATTERN)
+                if gold_img:
+                    currency = "Gold"
                     # Bei Gold ist der Preis oft direkt vor dem Image
                     if not price:
                         # Suche nach Zahlen vor dem Image
                         img_parent = gold_img.find_parent()
                         if img_parent:
                             img_text = img_parent.get_text()
-                            price_match = re.search(r'(\d+)', img_text)
+                            price_match = NUMBER_PATTERN.search(img_text)
                             if price_match:
                                 price = int(price_match.group(1))
             
-            # MAP IMAGE - suche nach Karten-Bildern (oft in einem img oder als background-image)
-            # Vendor Location Maps haben oft "map" im Dateinamen
-            map_imgs = vendor_container.find_all('img', src=re.compile(r'map|location', re.I))
-            if map_imgs:
-                map_img = map_imgs[0]
-                map_image_url = map_img.get('src')
-                
-                # Extrahiere Koordinaten aus map-pin div
-                map_pin = vendor_container.find('div', class_='map-pin')
-                if map_pin:
-                    coord_x_str = map_pin.get('data-x')
-                    coord_y_str = map_pin.get('data-y')
-                    
-                    if coord_x_str and coord_y_str:
-                        try:
-                            coord_x = float(coord_x_str)
-                            coord_y = float(coord_y_str)
-                        except:
-                            pass
-                
-                # Konvertiere zu absoluter URL
-                if map_image_url and not map_image_url.startswith('http'):
-                    if not map_image_url.startswith('//'):
-                        map_image_url = f"https://housing.wowdb.com{map_image_url}" if map_image_url.startswith('/') else f"https://housing.wowdb.com/{map_image_url}"
-                    else:
-                        map_image_url = f"https:{map_image_url}"
-                
-                # Download und konvertiere zu TGA
-                map_image = download_and_convert_map(map_image_url, vendor_name, location)
-            else:
-                map_image = None
-            
             # WAYPOINT - suche nach Koordinaten (Format: /way 12.3 45.6)
-            waypoint_match = re.search(r'/way\s+([\d.]+)\s+([\d.]+)', vendor_container.get_text())
+            waypoint_match = WAYPOINT_PATTERN.search(container_text)
             if waypoint_match:
                 waypoint = f"/way {waypoint_match.group(1)} {waypoint_match.group(2)}"
+            
+            # KARTE/KOORDINATEN - einmal pro Vendor-Entität
+            cache_key = (npc_id, location, waypoint)
+            shared = vendor_cache.get(cache_key)
+            if shared is None:
+                shared = parse_vendor_location(vendor_container)
                 # Falls wir noch keine Koordinaten haben, nutze die aus dem Waypoint
-                if not coord_x and not coord_y:
+                if waypoint_match and not shared["coordX"] and not shared["coordY"]:
                     try:
-                        coord_x = float(waypoint_match.group(1))
-                        coord_y = float(waypoint_match.group(2))
+                        shared["coordX"] = float(waypoint_match.group(1))
+                        shared["coordY"] = float(waypoint_match.group(2))
                     except:
                         pass
+                vendor_cache.put(cache_key, shared)
         
         vendor_info = {
+            "npcId": npc_id,
             "name": vendor_name,
             "location": location,
             "price": price,
             "currency": currency,
-            "mapTexture": map_image,  # WoW Texture Pfad (ohne .tga)
+            "currencyId": currency_id,
+            "mapTexture": shared["mapTexture"],  # WoW Texture Pfad (ohne .tga)
+            "mapUrl": shared["mapUrl"],
             "waypoint": waypoint,
-            "coordX": coord_x,
-            "coordY": coord_y
+            "coordX": shared["coordX"],
+            "coordY": shared["coordY"]
         }
         
-        # Verhindere Duplikate (gleicher Name + Location)
-        is_duplicate = any(
-            v["name"] == vendor_info["name"] and v["location"] == vendor_info["location"]
-            for v in vendors
-        )
-        
-        if not is_duplicate:
+        # Verhindere Duplikate (gleicher NPC bzw. gleicher Name + Location)
+        key = (npc_id, location)
+        if key not in seen:
+            seen.add(key)
             vendors.append(vendor_info)
     
     return vendors
 
-def scrape_item_details(driver, item_id, item_url):
-    """Scraped Details eines einzelnen Items"""
-    item_data = {
+def empty_item_data(item_id):
+    """Leeres Item-Dict (auch für Seiten, die nicht geladen werden konnten)"""
+    return {
         "id": item_id,
         "name": "",
         "category": None,
@@ -305,24 +2034,32 @@ def scrape_item_details(driver, item_id, item_url):
         "quest": None,
         "profession": None
     }
+
+def element_texts(element):
+    """Text eines Elements in einem Durchlauf: (mit Leerzeichen getrennt und gestrippt, roh)"""
+    strings = list(element.strings)
+    return " ".join(s.strip() for s in strings if s.strip()), "".join(strings)
+
+def parse_item_html(html, item_id, parser=None, strained=True, vendor_cache=None):
+    """Parst das HTML einer Detail-Seite in ein Item-Dict
+    
+    Standardmäßig mit lxml (falls installiert), ohne Script/Style-Blöcke und nur mit
+    den Top-Level-Tags, die ausgewertet werden. strained=False/parser='html.parser'
+    entspricht dem alten Pfad (für den Parser-Benchmark). vendor_cache ist der
+    VendorCache des Laufs, ohne ihn werden die Vendoren nur innerhalb der Seite geteilt.
+    """
+    item_data = empty_item_data(item_id)
+    vendor_cache = vendor_cache if vendor_cache is not None else VendorCache()
+    
+    from bs4 import BeautifulSoup, SoupStrainer
     
     try:
-        driver.get(item_url)
-        
-        # Warte auf H1
-        try:
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
-        except:
-            return item_data
-        
-        time.sleep(2)
-        
-        # Scrolle nach unten um alle Sources zu laden
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
-        
         # Parse HTML
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        if strained:
+            soup = BeautifulSoup(NON_CONTENT_PATTERN.sub('', html), parser or HTML_PARSER,
+                                 parse_only=SoupStrainer(list(ITEM_PAGE_TAGS)))
+        else:
+            soup = BeautifulSoup(html, parser or HTML_PARSER)
         
         # NAME
         h1 = soup.find('h1')
@@ -331,9 +2068,11 @@ def scrape_item_details(driver, item_id, item_url):
         
         # Alle mb-3 Divs analysieren
         mb3_divs = soup.find_all('div', class_='mb-3')
+        raw_texts = []
         
         for div in mb3_divs:
-            div_text = div.get_text(separator=' ', strip=True)
+            div_text, raw_text = element_texts(div)
+            raw_texts.append(raw_text)
             
             if not div_text:
                 continue
@@ -344,7 +2083,7 @@ def scrape_item_details(driver, item_id, item_url):
                     item_data["sources"].append("Vendor")
                 
                 # Parse Vendors (übergebe auch das soup-Element für Alternative-Parsing)
-                vendors = parse_vendor_div(div_text, div)
+                vendors = parse_vendor_div(div_text, div, vendor_cache)
                 item_data["vendors"].extend(vendors)
             
             # ACHIEVEMENT
@@ -352,7 +2091,7 @@ def scrape_item_details(driver, item_id, item_url):
                 if "Achievement" not in item_data["sources"]:
                     item_data["sources"].append("Achievement")
                 # Extrahiere Achievement-Name
-                achievement_link = div.find('a', href=re.compile(r'/achievements/'))
+                achievement_link = div.find('a', href=ACHIEVEMENT_LINK_PATTERN)
                 if achievement_link:
                     item_data["achievement"] = achievement_link.get_text(strip=True)
             
@@ -360,15 +2099,15 @@ def scrape_item_details(driver, item_id, item_url):
             elif div_text.startswith('Quest:'):
                 if "Quest" not in item_data["sources"]:
                     item_data["sources"].append("Quest")
-                quest_link = div.find('a', href=re.compile(r'/quests/'))
+                quest_link = div.find('a', href=QUEST_LINK_PATTERN)
                 if quest_link:
                     item_data["quest"] = quest_link.get_text(strip=True)
             
             # CRAFTING/PROFESSION
-            elif 'Profession:' in div_text or any(prof in div_text for prof in ['Alchemy', 'Blacksmithing', 'Cooking', 'Enchanting', 'Engineering', 'Inscription', 'Jewelcrafting', 'Leatherworking', 'Tailoring']):
+            elif 'Profession:' in div_text or any(prof in div_text for prof in PROFESSIONS):
                 if "Crafting" not in item_data["sources"]:
                     item_data["sources"].append("Crafting")
-                for prof in ['Alchemy', 'Blacksmithing', 'Cooking', 'Enchanting', 'Engineering', 'Inscription', 'Jewelcrafting', 'Leatherworking', 'Tailoring']:
+                for prof in PROFESSIONS:
                     if prof in div_text:
                         item_data["profession"] = prof
                         break
@@ -402,31 +2141,31 @@ def scrape_item_details(driver, item_id, item_url):
             
             # BUDGET COST
             elif div_text.startswith('Budget Cost:'):
-                match = re.search(r'(\d+)', div_text)
+                match = NUMBER_PATTERN.search(div_text)
                 if match:
                     item_data["budget_cost"] = int(match.group(1))
         
         # MATERIALS/REAGENTS (für Crafting-Items)
         # Suche nach "Crafting Reagents" Div oder mb-2 ms-4 Liste
         reagents_div = None
-        for div in mb3_divs:
-            if 'Reagent' in div.get_text() or 'Material' in div.get_text():
+        for div, raw_text in zip(mb3_divs, raw_texts):
+            if 'Reagent' in raw_text or 'Material' in raw_text:
                 reagents_div = div
                 break
         
         # Alternative: Suche nach ul.list-unstyled mit Item-Links
         if not reagents_div:
-            reagents_list = soup.find('ul', class_=re.compile(r'list-unstyled|mb-0'))
+            reagents_list = soup.find('ul', class_=REAGENT_LIST_CLASS_PATTERN)
             if reagents_list:
                 reagents_div = reagents_list
         
         if reagents_div:
             # Finde alle Item-Links (Materials)
-            item_links = reagents_div.find_all('a', href=re.compile(r'/items/\d+'))
+            item_links = reagents_div.find_all('a', href=ITEM_LINK_PATTERN)
             
             for item_link in item_links:
                 mat_href = item_link.get('href', '')
-                mat_id_match = re.search(r'/items/(\d+)', mat_href)
+                mat_id_match = ITEM_LINK_PATTERN.search(mat_href)
                 
                 if mat_id_match:
                     mat_id = int(mat_id_match.group(1))
@@ -439,7 +2178,7 @@ def scrape_item_details(driver, item_id, item_url):
                     if mat_li:
                         li_text = mat_li.get_text()
                         # Suche nach verschiedenen Quantity-Formaten
-                        qty_match = re.search(r'(\d+)\s*x|x\s*(\d+)|\((\d+)\)', li_text, re.I)
+                        qty_match = QUANTITY_PATTERN.search(li_text)
                         if qty_match:
                             quantity = int(qty_match.group(1) or qty_match.group(2) or qty_match.group(3))
                     
@@ -453,9 +2192,9 @@ def scrape_item_details(driver, item_id, item_url):
         
         # Falls Crafting-Source aber keine Materials gefunden, suche breiter
         if "Crafting" in item_data["sources"] and not item_data["materials"]:
-            all_item_links = soup.find_all('a', href=re.compile(r'/items/\d+'))
+            all_item_links = soup.find_all('a', href=ITEM_LINK_PATTERN)
             for item_link in all_item_links[:10]:  # Limitiere auf erste 10
-                mat_id_match = re.search(r'/items/(\d+)', item_link.get('href', ''))
+                mat_id_match = ITEM_LINK_PATTERN.search(item_link.get('href', ''))
                 if mat_id_match:
                     mat_id = int(mat_id_match.group(1))
                     mat_name = item_link.get_text(strip=True)
@@ -481,158 +2220,2203 @@ def scrape_item_details(driver, item_id, item_url):
     
     return item_data
 
-def generate_lua_database(items_data):
-    """Generiert Lua-Datenbank"""
-    lua_content = """-- Housing Item Database
--- Auto-generated by scraper_final.py
+def scrape_item_details(fetcher, item_id, item_url, cache=None, metrics=None, vendor_cache=None):
+    """Scraped Details eines einzelnen Items über das gewählte Fetch-Backend
+    
+    Mit Cache wird nur neu geparst, wenn sich der Seiteninhalt seit dem
+    letzten Lauf geändert hat (304 oder gleicher Content-Hash -> altes Ergebnis).
+    Gibt None zurück, wenn die Seite nicht (vollständig) geladen werden konnte.
+    """
+    html = fetch_item_html(fetcher, item_url, metrics)
+    if not html:
+        return None
+    return process_item_html(html, item_id, item_url, cache=cache, metrics=metrics,
+                             parse=functools.partial(parse_item_html, vendor_cache=vendor_cache))
 
-HousingItemTrackerDB = {
-    version = 2,
-    items = {
-        decorItems = {
-"""
+def fetch_item_html(fetcher, item_url, metrics=None):
+    """Lädt eine Detail-Seite, None bei Fehlern"""
+    metrics = metrics or PipelineMetrics()
+    try:
+        with metrics.timer("fetch_detail"):
+            html = fetcher.fetch_item_page(item_url)
+    except Exception as e:
+        print(f"  Fehler beim Laden von {item_url}: {e}")
+        html = None
+    
+    if not html:
+        metrics.incr("detail_failed")
+        return None
+    metrics.incr("detail_pages")
+    metrics.incr("detail_bytes", len(html.encode('utf-8')))
+    return html
+
+def process_item_html(html, item_id, item_url, cache=None, metrics=None, parse=parse_item_html):
+    """Parst eine geladene Detail-Seite (bzw. nimmt das Ergebnis aus dem Cache)
+    
+    parse(html, item_id) kann z.B. an einen Prozess-Pool delegieren.
+    """
+    metrics = metrics or PipelineMetrics()
+    if cache is None:
+        with metrics.timer("parse_detail"):
+            item_data = parse(html, item_id)
+        return item_data if is_complete_item(item_data, item_url, metrics) else None
+    
+    entry = cache.store_page(item_url, html)
+    if entry.get("parsed") and entry.get("parsedHash") == entry["contentHash"]:
+        cache.count(hit=True)
+        metrics.incr("cache_hits")
+        print(f"[{item_id}] {entry['parsed'].get('name', '')} (unverändert, aus Cache)")
+        return entry["parsed"]
+    
+    cache.count(hit=False)
+    with metrics.timer("parse_detail"):
+        item_data = parse(html, item_id)
+    if not is_complete_item(item_data, item_url, metrics):
+        return None
+    cache.store_parsed(item_url, item_data, entry=entry)
+    return item_data
+
+def is_complete_item(item_data, item_url, metrics):
+    """Eine Seite ohne Item-Namen war nicht fertig geladen und zählt als Fehlschlag"""
+    if item_data.get("name"):
+        return True
+    print(f"  Unvollständige Seite (kein Name): {item_url}")
+    metrics.incr("detail_incomplete")
+    return False
+
+class RateLimiter:
+    """Globales Requests-pro-Sekunde-Limit, das sich alle Worker teilen"""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second and requests_per_second > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        """Blockiert bis der nächste Request-Slot frei ist"""
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def scrape_items_parallel(item_urls, fetcher_factory, workers=DEFAULT_WORKERS,
+                          rate_limiter=None, on_item=None, cache=None, metrics=None, retry_failed=True,
+                          vendor_cache=None):
+    """Scraped alle Items mit N parallelen Workern aus einer gemeinsamen Queue
+    
+    fetcher_factory(worker_idx) liefert das Fetch-Backend für jeden Worker
+    (z.B. eine eigene Chrome-Session oder eine geteilte HTTP-Session). Items, die
+    nicht geladen werden konnten, bekommen am Ende einen weiteren Durchlauf; was
+    dann noch fehlt, ist nicht im Ergebnis (statt als leeres Item in der DB zu landen).
+    Das Ergebnis ist unabhängig von der Abarbeitungsreihenfolge nach Item-ID sortiert.
+    Ohne vendor_cache bekommt der Aufruf einen eigenen VendorCache.
+    """
+    results = {}
+    lock = threading.Lock()
+    vendor_cache = vendor_cache if vendor_cache is not None else VendorCache()
+    total = len(item_urls)
+    rate_limiter = rate_limiter or RateLimiter(None)
+    metrics = metrics or PipelineMetrics()
+    metrics.start_progress()
+    
+    def run_pass(urls):
+        work_queue = queue.Queue()
+        for item_id, url in urls.items():
+            work_queue.put((item_id, url))
+        
+        def worker(worker_idx):
+            try:
+                fetcher = fetcher_factory(worker_idx)
+            except Exception as e:
+                print(f"  Worker {worker_idx}: Fehler beim Starten des Fetch-Backends: {e}")
+                return
+            
+            try:
+                while True:
+                    try:
+                        item_id, url = work_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    
+                    with metrics.timer("rate_limit_wait"):
+                        rate_limiter.wait()
+                    item_data = scrape_item_details(fetcher, item_id, url, cache=cache, metrics=metrics,
+                                                    vendor_cache=vendor_cache)
+                    if item_data is None:
+                        continue
+                    
+                    with lock:
+                        results[item_id] = item_data
+                        print(f"[{len(results)}/{total}] Worker {worker_idx}: Item {item_id} fertig")
+                        if on_item:
+                            on_item(item_id, item_data, results)
+                        metrics.progress(len(results), total)
+            finally:
+                fetcher.close()
+        
+        pass_workers = max(1, min(workers, len(urls))) if urls else 1
+        if pass_workers == 1:
+            worker(0)
+        else:
+            threads = [threading.Thread(target=worker, args=(idx,), name=f"scrape-worker-{idx}", daemon=True)
+                       for idx in range(pass_workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    
+    run_pass(item_urls)
+    
+    failed = {item_id: url for item_id, url in item_urls.items() if item_id not in results}
+    if failed and retry_failed:
+        print(f"\nLetzter Versuch für {len(failed)} fehlgeschlagene Items...")
+        metrics.incr("detail_retry_pass", len(failed))
+        run_pass(failed)
+        failed = {item_id: url for item_id, url in failed.items() if item_id not in results}
+    
+    if failed:
+        metrics.incr("detail_failed_final", len(failed))
+        print(f"\nWARNUNG: {len(failed)} Items konnten nicht geladen werden und fehlen in der Ausgabe: "
+              + ", ".join(str(item_id) for item_id in sorted(failed)[:20])
+              + (" ..." if len(failed) > 20 else ""))
+    
+    return {item_id: results[item_id] for item_id in sorted(results)}
+
+# VendorCache eines Parse-Prozesses, wird pro Pool von init_parse_worker neu angelegt
+_parse_worker_vendor_cache = None
+
+def init_parse_worker(base_url):
+    """Initializer der Parse-Prozesse: aktuelle Basis-URL und ein frischer VendorCache pro Lauf"""
+    global _parse_worker_vendor_cache
+    set_base_url(base_url)
+    _parse_worker_vendor_cache = VendorCache()
+
+def parse_item_quiet(html, item_id):
+    """parse_item_html für den Prozess-Pool der asyncio-Pipeline (ohne Konsolenausgabe pro Item)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_item_html(html, item_id, vendor_cache=_parse_worker_vendor_cache)
+
+class AsyncScrapePipeline:
+    """asyncio-Pipeline: Discovery -> Detail-Fetch -> Parse -> Karten -> Sink über begrenzte Queues
+    
+    Jede Stufe hat eigene Worker und eine begrenzte Eingangs-Queue. Ist eine Stufe
+    ausgelastet, blockiert die vorherige (Backpressure), der Speicher bleibt flach
+    und Netzwerk, CPU und Platte arbeiten gleichzeitig. Blockierende Fetches laufen
+    in einem Thread-Pool, Parsing und TGA-Konvertierung in Prozess-Pools.
+    """
+
+    def __init__(self, fetcher_factory, map_pipeline, workers=DEFAULT_WORKERS, parse_workers=None,
+                 rate_limiter=None, cache=None, metrics=None, on_item=None, known_item=None,
+                 queue_size=PIPELINE_QUEUE_SIZE):
+        self.fetcher_factory = fetcher_factory
+        self.map_pipeline = map_pipeline
+        self.workers = max(1, workers)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.map_workers = 2 * map_pipeline.download_workers
+        self.rate_limiter = rate_limiter or RateLimiter(None)
+        self.cache = cache
+        self.metrics = metrics or PipelineMetrics()
+        self.on_item = on_item
+        # known_item(id, url) liefert bereits bekannte Items (Cache/Checkpoint), die nur noch die Karten-Stufe durchlaufen
+        self.known_item = known_item or (lambda item_id, url: None)
+        self.queue_size = queue_size
+        self.fetchers = {}
+        self.urls = {}
+        self.discovered = 0
+        self.results = {}
+        self.failed = {}
+
+    def run(self, discover):
+        """discover(on_items) läuft in einem Thread und meldet gefundene Items seitenweise"""
+        import asyncio
+        return asyncio.run(self._run(discover))
+
+    async def _run(self, discover):
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor
+        
+        loop = asyncio.get_running_loop()
+        detail_queue = asyncio.Queue(self.queue_size)
+        parse_queue = asyncio.Queue(self.queue_size)
+        map_queue = asyncio.Queue(self.queue_size)
+        sink_queue = asyncio.Queue(self.queue_size)
+        fetch_threads = ThreadPoolExecutor(max_workers=self.workers + 1, thread_name_prefix="fetch")
+        parse_threads = ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix="parse")
+        # Parse-Prozesse (spawn/forkserver) importieren das Modul neu und brauchen die aktuelle Basis-URL
+        parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers, initializer=init_parse_worker,
+                                         initargs=(BASE_URL,))
+        self.metrics.start_progress()
+        
+        async def route(items):
+            self.discovered += len(items)
+            self.urls.update(items)
+            for item_id, url in items.items():
+                known = self.known_item(item_id, url)
+                if known:
+                    await map_queue.put((item_id, known))
+                else:
+                    await detail_queue.put((item_id, url))
+        
+        def on_items(items):
+            # Blockiert den Discovery-Thread, solange die Detail-Queue voll ist
+            asyncio.run_coroutine_threadsafe(route(items), loop).result()
+        
+        def fetch(worker_idx, url):
+            if worker_idx not in self.fetchers:
+                self.fetchers[worker_idx] = self.fetcher_factory(worker_idx + 1)
+            with self.metrics.timer("rate_limit_wait"):
+                self.rate_limiter.wait()
+            return fetch_item_html(self.fetchers[worker_idx], url, self.metrics)
+        
+        def parse_in_pool(html, item_id):
+            return parse_pool.submit(parse_item_quiet, html, item_id).result()
+        
+        async def fetch_stage(worker_idx, job):
+            item_id, url = job
+            html = await loop.run_in_executor(fetch_threads, fetch, worker_idx, url)
+            if html is None:
+                self.failed[item_id] = url
+                return None
+            return item_id, url, html
+        
+        async def parse_stage(worker_idx, job):
+            item_id, url, html = job
+            item_data = await loop.run_in_executor(parse_threads, process_item_html, html, item_id, url,
+                                                   self.cache, self.metrics, parse_in_pool)
+            if item_data is None:
+                self.failed[item_id] = url
+                return None
+            return item_id, item_data
+        
+        async def map_stage(worker_idx, job):
+            item_id, item_data = job
+            vendors = [vendor for vendor in item_data.get("vendors", []) if vendor.get("mapUrl")]
+            urls = sorted({vendor["mapUrl"] for vendor in vendors})
+            textures = await asyncio.gather(*(asyncio.wrap_future(self.map_pipeline.submit(url)) for url in urls))
+            textures = dict(zip(urls, textures))
+            for vendor in vendors:
+                vendor["mapTexture"] = textures[vendor["mapUrl"]]
+            return job
+        
+        async def sink_stage(worker_idx, job):
+            item_id, item_data = job
+            self.results[item_id] = item_data
+            print(f"[{len(self.results)}/{self.discovered}] Item {item_id} fertig: {item_data.get('name', '')}")
+            if self.on_item:
+                self.on_item(item_id, item_data, self.results)
+            self.metrics.progress(len(self.results), self.discovered)
+        
+        async def discovery_stage():
+            try:
+                await loop.run_in_executor(fetch_threads, discover, on_items)
+            finally:
+                for _ in range(self.workers):
+                    await detail_queue.put(None)
+        
+        try:
+            await asyncio.gather(
+                discovery_stage(),
+                self._stage("fetch_stage", fetch_stage, self.workers, detail_queue, parse_queue, self.parse_workers),
+                self._stage("parse_stage", parse_stage, self.parse_workers, parse_queue, map_queue, self.map_workers),
+                self._stage("map_stage", map_stage, self.map_workers, map_queue, sink_queue, 1),
+                self._stage("sink_stage", sink_stage, 1, sink_queue),
+            )
+        finally:
+            for fetcher in self.fetchers.values():
+                fetcher.close()
+            fetch_threads.shutdown(wait=True)
+            parse_threads.shutdown(wait=True)
+            parse_pool.shutdown(wait=True)
+        return {item_id: self.results[item_id] for item_id in sorted(self.results)}
+
+    async def _stage(self, name, handle, workers, in_queue, out_queue=None, out_workers=0):
+        """Startet `workers` Worker auf in_queue; nach dem Ende-Signal (None) bekommt die nächste Stufe ihres"""
+        import asyncio
+        
+        async def worker(worker_idx):
+            while True:
+                job = await in_queue.get()
+                if job is None:
+                    return
+                try:
+                    result = await handle(worker_idx, job)
+                except Exception as e:
+                    print(f"  Fehler in {name} bei Item {job[0]}: {e}")
+                    self.metrics.incr(f"{name}_errors")
+                    self.failed[job[0]] = self.urls[job[0]]
+                    continue
+                if result is not None and out_queue is not None:
+                    await out_queue.put(result)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(idx) for idx in range(workers)))
+        self.metrics.add_time(name, time.perf_counter() - start)
+        for _ in range(out_workers):
+            await out_queue.put(None)
+
+def benchmark_backends(item_urls, sample_size=20, headless=True):
+    """Vergleicht die Fetch-Backends auf den ersten N Detail-Seiten"""
+    sample = list(item_urls.items())[:sample_size]
+    if not sample:
+        print("Keine Items für den Benchmark!")
+        return {}
+    
+    results = {}
+    for backend in ("http", "selenium"):
+        fetcher = create_fetcher(backend, headless=headless)
+        fetch_times = []
+        parse_times = []
+        vendor_cache = VendorCache()
+        complete_pages = 0
+        try:
+            for item_id, url in sample:
+                start = time.perf_counter()
+                try:
+                    html = fetcher.fetch_item_page(url)
+                except Exception as e:
+                    print(f"  [{backend}] Fehler bei {url}: {e}")
+                    html = None
+                fetch_times.append(time.perf_counter() - start)
+                
+                if has_server_rendered_details(html):
+                    complete_pages += 1
+                start = time.perf_counter()
+                parse_item_html(html or "", item_id, vendor_cache=vendor_cache)
+                parse_times.append(time.perf_counter() - start)
+        except Exception as e:
+            print(f"  [{backend}] Backend nicht verfügbar: {e}")
+            continue
+        finally:
+            fetcher.close()
+        
+        results[backend] = {
+            "pages": len(fetch_times),
+            "avg_fetch_ms": 1000 * sum(fetch_times) / len(fetch_times),
+            "avg_parse_ms": 1000 * sum(parse_times) / len(parse_times),
+            "complete_pages": complete_pages,
+        }
     
-    # Sammle Materials
-    all_materials = set()
-    for item in items_data.values():
-        for mat in item.get("materials", []):
-            all_materials.add(mat["id"])
+    print(f"\n{'='*70}")
+    print(f"BACKEND-BENCHMARK ({len(sample)} Detail-Seiten)")
+    print(f"{'='*70}")
+    for backend, stats in results.items():
+        print(f"{backend:10s} Fetch: {stats['avg_fetch_ms']:8.1f} ms/Seite   "
+              f"Parse: {stats['avg_parse_ms']:6.1f} ms/Seite   "
+              f"mit mb-3 Blöcken: {stats['complete_pages']}/{stats['pages']}")
+    print(f"{'='*70}\n")
+    return results
+
+def benchmark_parser(cache_dir=PAGE_CACHE_DIR, limit=200, repeat=3):
+    """Misst das Parsen gespeicherter Detail-Seiten: alter Pfad (html.parser, ganzes Dokument) vs. neuer"""
+    pages = []
+    for entry in PageCache(cache_dir).entries():
+        item_id = extract_item_id(entry.get("url", ""))
+        if item_id and has_server_rendered_details(entry.get("html")):
+            pages.append((item_id, entry["html"]))
+        if len(pages) >= limit:
+            break
+    if not pages:
+        print(f"Keine gespeicherten Detail-Seiten in {cache_dir} gefunden!")
+        return {}
     
-    # Schreibe Items
-    for item_id in sorted(items_data.keys()):
-        item = items_data[item_id]
-        lua_content += f"            [{item_id}] = {{\n"
-        lua_content += f"                name = \"{escape_lua_string(item.get('name', 'Unknown'))}\",\n"
+    variants = {
+        "vorher": {"parser": "html.parser", "strained": False},
+        "nachher": {"parser": HTML_PARSER, "strained": True},
+    }
+    results = {}
+    parsed = {}
+    for name, options in variants.items():
+        best = None
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                vendor_cache = VendorCache()
+                items = [parse_item_html(html, item_id, vendor_cache=vendor_cache, **options)
+                         for item_id, html in pages]
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        parsed[name] = items
+        results[name] = 1000 * best / len(pages)
+    
+    mismatches = sum(1 for a, b in zip(parsed["vorher"], parsed["nachher"]) if a != b)
+    print(f"\n{'='*70}")
+    print(f"PARSER-BENCHMARK ({len(pages)} Detail-Seiten, bester von {repeat} Läufen)")
+    print(f"{'='*70}")
+    labels = {"vorher": "html.parser, ganzes Dokument", "nachher": f"{HTML_PARSER}, gefiltert"}
+    for name, label in labels.items():
+        print(f"{name:8s} ({label}):".ljust(42) + f"{results[name]:7.2f} ms/Seite")
+    print(f"Beschleunigung: {results['vorher'] / results['nachher']:.1f}x")
+    print(f"Abweichende Ergebnisse: {mismatches}")
+    print(f"{'='*70}\n")
+    results["mismatches"] = mismatches
+    return results
+
+def lua_key(key):
+    """Formatiert einen Tabellen-Schlüssel (name = ..., [123] = ..., ["a b"] = ...)"""
+    if isinstance(key, int):
+        return f"[{key}]"
+    if LUA_IDENTIFIER_PATTERN.match(key) and key not in LUA_KEYWORDS:
+        return key
+    return f'["{escape_lua_string(key)}"]'
+
+def lua_literal(value):
+    """Formatiert einen skalaren Python-Wert als Lua-Literal"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return f'"{escape_lua_string(value)}"'
+    raise TypeError(f"Kein Lua-Literal für {type(value).__name__}: {value!r}")
+
+def write_lua_value(write, value, depth=0):
+    """Schreibt einen Python-Wert als Lua-Ausdruck (dicts/lists als mehrzeilige Tabellen, None wird ausgelassen)"""
+    if isinstance(value, dict):
+        write("{\n")
+        pad = LUA_INDENT * (depth + 1)
+        for key, entry in value.items():
+            if entry is None:
+                continue
+            write(f"{pad}{lua_key(key)} = ")
+            write_lua_value(write, entry, depth + 1)
+            write(",\n")
+        write(f"{LUA_INDENT * depth}}}")
+    elif isinstance(value, (list, tuple)):
+        write("{\n")
+        pad = LUA_INDENT * (depth + 1)
+        for entry in value:
+            write(pad)
+            write_lua_value(write, entry, depth + 1)
+            write(",\n")
+        write(f"{LUA_INDENT * depth}}}")
+    else:
+        write(lua_literal(value))
+
+def lua_vendor_entry(vendor):
+    """Baut den Lua-Eintrag eines Vendors (Feldreihenfolge wie im Addon erwartet)"""
+    entry = {}
+    if vendor.get("npcId"):
+        entry["npcId"] = vendor["npcId"]
+    entry["name"] = vendor.get("name") or ""
+    if vendor.get("location"):
+        entry["location"] = vendor["location"]
+    if vendor.get("price"):
+        entry["price"] = vendor["price"]
+    if vendor.get("currencyId"):
+        entry["currencyId"] = vendor["currencyId"]
+    if vendor.get("currency"):
+        entry["currency"] = vendor["currency"]
+    if vendor.get("mapTexture"):
+        entry["mapTexture"] = vendor["mapTexture"]
+    entry["coordX"] = vendor.get("coordX")
+    entry["coordY"] = vendor.get("coordY")
+    if vendor.get("waypoint"):
+        entry["waypoint"] = vendor["waypoint"]
+    return entry
+
+def lua_item_entry(item):
+    """Baut den Lua-Eintrag eines Decor-Items aus dem gescrapten Item-Dict"""
+    entry = {"name": item.get("name", "Unknown") or ""}
+    if item.get("budget_cost") is not None:
+        entry["decorCost"] = item["budget_cost"]
+    if item.get("quality") is not None:
+        entry["quality"] = item["quality"]
+    if item.get("category"):
+        entry["category"] = item["category"]
+    if item.get("subcategory"):
+        entry["subcategory"] = item["subcategory"]
+    if item.get("sources"):
+        entry["sources"] = item["sources"]
+    if item.get("vendors"):
+        entry["vendors"] = [lua_vendor_entry(vendor) for vendor in item["vendors"]]
+    if item.get("profession"):
+        entry["profession"] = item["profession"]
+    if item.get("achievement"):
+        entry["achievement"] = item["achievement"]
+    if item.get("achievementId"):
+        entry["achievementId"] = item["achievementId"]
+    if item.get("quest"):
+        entry["quest"] = item["quest"]
+    if item.get("questId"):
+        entry["questId"] = item["questId"]
+    if item.get("materials"):
+        entry["materials"] = [
+            {"id": material["id"], "name": material.get("name") or "", "quantity": material.get("quantity", 1)}
+            for material in item["materials"]
+        ]
+    return entry
+
+class LuaIndexBuilder:
+    """Sammelt beim Schreiben der Items die Lookup-Indizes für das Addon
+    
+    - materialUsage:   Material-ID -> {decorId, quantity} (ersetzt den Full-Scan in IsUsedInCrafting)
+    - vendorsByNpcId:  NPC-ID -> Vendor mit allen Decor-IDs, die er verkauft
+    - itemsByCategory: Kategorie -> Decor-IDs
+    - achievements/quests: ID -> Name (Fallback für die Lokalisierung im Addon)
+    """
+
+    def __init__(self):
+        self.material_usage = {}
+        self.vendors_by_npc = {}
+        self.items_by_category = {}
+        self.achievements = {}
+        self.quests = {}
+
+    def add(self, item_id, item):
+        for material in item.get("materials", []):
+            self.material_usage.setdefault(material["id"], []).append(
+                {"decorId": item_id, "quantity": material.get("quantity", 1)}
+            )
+        
+        for vendor in item.get("vendors", []):
+            npc_id = vendor.get("npcId")
+            if not npc_id:
+                continue
+            if npc_id not in self.vendors_by_npc:
+                self.vendors_by_npc[npc_id] = {
+                    "name": vendor.get("name") or "",
+                    "location": vendor.get("location"),
+                    "mapTexture": vendor.get("mapTexture"),
+                    "coordX": vendor.get("coordX"),
+                    "coordY": vendor.get("coordY"),
+                    "items": [],
+                }
+            decor_ids = self.vendors_by_npc[npc_id]["items"]
+            if not decor_ids or decor_ids[-1] != item_id:
+                decor_ids.append(item_id)
         
-        if item.get("budget_cost"):
-            lua_content += f"                decorCost = {item['budget_cost']},\n"
         if item.get("category"):
-            lua_content += f"                category = \"{escape_lua_string(item['category'])}\",\n"
-        if item.get("subcategory"):
-            lua_content += f"                subcategory = \"{escape_lua_string(item['subcategory'])}\",\n"
-        
-        if item.get("sources"):
-            lua_content += f"                sources = {{\n"
-            for source in item["sources"]:
-                lua_content += f"                    \"{escape_lua_string(source)}\",\n"
-            lua_content += f"                }},\n"
-        
-        if item.get("vendors"):
-            lua_content += f"                vendors = {{\n"
-            for vendor in item["vendors"]:
-                lua_content += f"                    {{\n"
-                lua_content += f"                        name = \"{escape_lua_string(vendor['name'])}\",\n"
-                if vendor.get("location"):
-                    lua_content += f"                        location = \"{escape_lua_string(vendor['location'])}\",\n"
-                if vendor.get("price"):
-                    lua_content += f"                        price = {vendor['price']},\n"
-                if vendor.get("currency"):
-                    lua_content += f"                        currency = \"{escape_lua_string(vendor['currency'])}\",\n"
-                if vendor.get("mapTexture"):
-                    lua_content += f"                        mapTexture = \"{escape_lua_string(vendor['mapTexture'])}\",\n"
-                if vendor.get("coordX") is not None:
-                    lua_content += f"                        coordX = {vendor['coordX']},\n"
-                if vendor.get("coordY") is not None:
-                    lua_content += f"                        coordY = {vendor['coordY']},\n"
-                if vendor.get("waypoint"):
-                    lua_content += f"                        waypoint = \"{escape_lua_string(vendor['waypoint'])}\",\n"
-                lua_content += f"                    }},\n"
-            lua_content += f"                }},\n"
-        
-        if item.get("profession"):
-            lua_content += f"                profession = \"{escape_lua_string(item['profession'])}\",\n"
-        if item.get("achievement"):
-            lua_content += f"                achievement = \"{escape_lua_string(item['achievement'])}\",\n"
-        if item.get("quest"):
-            lua_content += f"                quest = \"{escape_lua_string(item['quest'])}\",\n"
-        
-        # Materials (für Crafting)
-        if item.get("materials"):
-            lua_content += f"                materials = {{\n"
-            for material in item["materials"]:
-                lua_content += f"                    {{\n"
-                lua_content += f"                        id = {material['id']},\n"
-                lua_content += f"                        name = \"{escape_lua_string(material['name'])}\",\n"
-                lua_content += f"                        quantity = {material.get('quantity', 1)},\n"
-                lua_content += f"                    }},\n"
-            lua_content += f"                }},\n"
-        
-        lua_content += f"            }},\n"
-    
-    lua_content += "        },\n        materials = {\n"
-    
-    for mat_id in sorted(all_materials):
-        lua_content += f"            [{mat_id}] = true,\n"
-    
-    lua_content += "        },\n    },\n}\n"
-    
-    return lua_content
-
-def main():
+            self.items_by_category.setdefault(item["category"], []).append(item_id)
+        if item.get("achievementId") and item.get("achievement"):
+            self.achievements[item["achievementId"]] = item["achievement"]
+        if item.get("questId") and item.get("quest"):
+            self.quests[item["questId"]] = item["quest"]
+
+    def write(self, write):
+        item_pad = LUA_INDENT * 3
+        
+        write("        materials = {\n")
+        for mat_id in sorted(self.material_usage):
+            write(f"{item_pad}[{mat_id}] = true,\n")
+        write("        },\n")
+        
+        for name, index in (("materialUsage", self.material_usage),
+                            ("vendorsByNpcId", self.vendors_by_npc),
+                            ("itemsByCategory", self.items_by_category)):
+            write(f"        {name} = {{\n")
+            for key in sorted(index):
+                write(f"{item_pad}{lua_key(key)} = ")
+                write_lua_value(write, index[key], 3)
+                write(",\n")
+            write("        },\n")
+        
+        for name, label, index in (("achievements", "Achievements", self.achievements),
+                                   ("quests", "Quests", self.quests)):
+            write(f"\n        -- {label} (ID -> Name für Localization)\n        {name} = {{\n")
+            for key in sorted(index):
+                write(f"{item_pad}[{key}] = {lua_literal(index[key])},\n")
+            write("        },\n")
+
+def iter_sorted_items(items_data):
+    """(id, Item) nach ID sortiert - aus einem Dict oder streamend aus dem ItemStore"""
+    if isinstance(items_data, ItemStore):
+        return items_data.iter_items()
+    return ((int(item_id), items_data[item_id]) for item_id in sorted(items_data, key=int))
+
+def write_lua_database(items_data, out, version=LUA_DB_VERSION):
+    """Schreibt die Lua-Datenbank streamend in ein file-artiges Objekt
+    
+    Jedes Item wird direkt nach dem Kodieren geschrieben, es wird nie die ganze
+    Datei im Speicher aufgebaut. Nur die (kleinen) Lookup-Indizes werden
+    nebenbei gesammelt und am Ende angehängt.
+    """
+    write = out.write
+    write(LUA_DB_HEADER)
+    write(f"HousingItemTrackerDB = {{\n    version = {version},\n    items = {{\n        decorItems = {{\n")
+    
+    indexes = LuaIndexBuilder()
+    item_pad = LUA_INDENT * 3
+    for item_id, item in iter_sorted_items(items_data):
+        indexes.add(item_id, item)
+        
+        write(f"{item_pad}[{item_id}] = ")
+        write_lua_value(write, lua_item_entry(item), 3)
+        write(",\n")
+    
+    write("        },\n")
+    indexes.write(write)
+    write("    },\n}\n")
+
+def generate_lua_database(items_data):
+    """Generiert Lua-Datenbank als String"""
+    out = io.StringIO()
+    write_lua_database(items_data, out)
+    return out.getvalue()
+
+def lua_inline(value):
+    """Kodiert einen Wert einzeilig ohne Leerzeichen (für die kompakten Spalten-Arrays)"""
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{lua_key(key)}={lua_inline(entry)}"
+                              for key, entry in value.items() if entry is not None) + "}"
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(lua_inline(entry) for entry in value) + "}"
+    return lua_literal(value)
+
+class LuaStringTable:
+    """Interned Strings: jeder String wird einmal gespeichert und per Index (ab 1) referenziert, 0 = nil"""
+
+    def __init__(self):
+        self.indexes = {}
+        self.strings = []
+
+    def ref(self, text):
+        if not text:
+            return 0
+        index = self.indexes.get(text)
+        if index is None:
+            self.strings.append(text)
+            index = self.indexes[text] = len(self.strings)
+        return index
+
+class CompactLuaEncoder:
+    """Kodiert Items in das kompakte DB-Format
+    
+    - gemeinsame String-Tabelle (Kategorien, Währungen, Material-Namen, ...)
+    - gemeinsame Vendor-Tabelle, Items referenzieren Vendoren per Index und
+      speichern nur Preis/Währung selbst; mapTexture ohne den langen Pfad-Präfix
+    - skalare Felder als Spalten-Arrays pro Chunk (nicht vorhanden: 0 bei String-Referenzen,
+      sonst false, damit 0 ein echter Wert bleibt, z.B. quality = 0)
+    
+    HousingItemTracker.lua entpackt das Format beim Laden wieder in DB.decorItems.
+    """
+
+    def __init__(self):
+        self.strings = LuaStringTable()
+        self.vendor_indexes = {}
+        self.vendors = []
+        self.string_fields = set()
+
+    def vendor_ref(self, vendor_entry):
+        shared = {key: value for key, value in vendor_entry.items() if key not in COMPACT_VENDOR_FIELDS}
+        if shared.get("mapTexture", "").startswith(MAP_TEXTURE_PREFIX):
+            shared["mapTexture"] = shared["mapTexture"][len(MAP_TEXTURE_PREFIX):]
+        key = tuple(sorted((name, value) for name, value in shared.items() if value is not None))
+        index = self.vendor_indexes.get(key)
+        if index is None:
+            self.vendors.append(shared)
+            index = self.vendor_indexes[key] = len(self.vendors)
+        return index
+
+    def scalar(self, field, value):
+        if isinstance(value, str):
+            self.string_fields.add(field)
+            return self.strings.ref(value)
+        return self.missing(field) if value is None else value
+
+    def missing(self, field):
+        """Platzhalter für fehlende Werte: 0 bei String-Referenzen, sonst false (0 ist ein echter Wert)"""
+        return 0 if field in self.string_fields else False
+
+    def encode_chunk(self, rows):
+        """Kodiert eine Liste von (item_id, lua_item_entry) als Chunk-Tabelle"""
+        columns = {"ids": []}
+        sources = {}
+        vendors = {}
+        materials = {}
+        
+        for row, (item_id, entry) in enumerate(rows, 1):
+            columns["ids"].append(item_id)
+            for field, value in entry.items():
+                if field == "sources":
+                    sources[row] = [self.strings.ref(source) for source in value]
+                elif field == "vendors":
+                    refs = []
+                    for vendor in value:
+                        refs.append(self.vendor_ref(vendor))
+                        refs.extend(self.scalar(name, vendor.get(name)) for name in COMPACT_VENDOR_FIELDS)
+                    vendors[row] = refs
+                elif field == "materials":
+                    materials[row] = [part for material in value for part in
+                                      (material["id"], self.strings.ref(material["name"]), material["quantity"])]
+                elif value is not None:
+                    value = self.scalar(field, value)
+                    columns.setdefault(field, [self.missing(field)] * (row - 1)).append(value)
+            for field, column in columns.items():
+                if len(column) < row:
+                    column.append(self.missing(field))
+        
+        return {"columns": columns, "sources": sources, "vendors": vendors, "materials": materials}
+
+def write_compact_chunk(write, chunk):
+    """Schreibt einen Chunk als HousingItemTrackerDB.chunks[#+1] = {...}"""
+    write("HousingItemTrackerDB.chunks[#HousingItemTrackerDB.chunks + 1] = {\n")
+    write("    columns = {\n")
+    for field, column in chunk["columns"].items():
+        write(f"        {lua_key(field)} = {lua_inline(column)},\n")
+    write("    },\n")
+    for name in ("sources", "vendors", "materials"):
+        write(f"    {name} = {{\n")
+        for row, values in chunk[name].items():
+            write(f"        [{row}] = {lua_inline(values)},\n")
+        write("    },\n")
+    write("}\n\n")
+
+def write_compact_lua_database(items_data, outs, version=LUA_DB_VERSION):
+    """Schreibt die DB im kompakten Format, verteilt auf die übergebenen file-artigen Objekte
+    
+    Die erste Datei legt HousingItemTrackerDB an, jede Datei hängt einen Teil
+    der Items als Chunk an, die letzte Datei schreibt String- und Vendor-Tabelle.
+    Die Lookup-Indizes (LuaIndexBuilder) stehen nicht in der Datei, ExpandCompactDB
+    im Addon baut sie beim Entpacken aus den Items auf.
+    """
+    encoder = CompactLuaEncoder()
+    items = iter_sorted_items(items_data)
+    chunk_size = max(1, -(-len(items_data) // len(outs)))
+    
+    for file_index, out in enumerate(outs):
+        write = out.write
+        write(LUA_DB_HEADER)
+        if file_index == 0:
+            write(f"HousingItemTrackerDB = {{\n    version = {version},\n    format = \"compact\",\n")
+            write(f"    mapPrefix = {lua_literal(MAP_TEXTURE_PREFIX)},\n    chunks = {{}},\n}}\n\n")
+        
+        rows = [(item_id, lua_item_entry(item)) for item_id, item in itertools.islice(items, chunk_size)]
+        if rows:
+            write_compact_chunk(write, encoder.encode_chunk(rows))
+    
+    write = outs[-1].write
+    write(f"HousingItemTrackerDB.vendorFields = {lua_inline(list(COMPACT_VENDOR_FIELDS))}\n")
+    write(f"HousingItemTrackerDB.stringFields = {lua_inline({field: True for field in sorted(encoder.string_fields)})}\n")
+    write("HousingItemTrackerDB.vendors = {\n")
+    for vendor in encoder.vendors:
+        write(f"    {lua_inline(vendor)},\n")
+    write("}\nHousingItemTrackerDB.strings = {\n")
+    for text in encoder.strings.strings:
+        write(f"    {lua_literal(text)},\n")
+    write("}\n")
+
+def lua_db_file_names(path, split):
+    """Dateinamen der (optional aufgeteilten) DB: X.lua, X_2.lua, X_3.lua, ..."""
+    path = Path(path)
+    return [path] + [path.with_name(f"{path.stem}_{index}{path.suffix}") for index in range(2, split + 1)]
+
+def update_toc_db_files(db_files, toc_path=TOC_FILE):
+    """Ersetzt die DB-Einträge in der .toc durch die aktuelle Dateiliste (an gleicher Stelle)"""
+    toc_path = Path(toc_path)
+    if not toc_path.exists():
+        return
+    db_names = [Path(db_file).name for db_file in db_files]
+    stem = Path(db_files[0]).stem
+    db_line_pattern = re.compile(rf'^{re.escape(stem)}(_\d+)?\.lua$')
+    
+    lines = toc_path.read_text(encoding='utf-8').splitlines()
+    new_lines = []
+    inserted = False
+    for line in lines:
+        if db_line_pattern.match(line.strip()):
+            if not inserted:
+                new_lines.extend(db_names)
+                inserted = True
+            continue
+        new_lines.append(line)
+    if not inserted:
+        new_lines.extend(db_names)
+    toc_path.write_text("\n".join(new_lines) + "\n", encoding='utf-8')
+
+def save_lua_database(items_data, path="HousingItemTrackerDB.lua", compact=False, split=1, toc_path=TOC_FILE,
+                      version=LUA_DB_VERSION):
+    """Schreibt die Lua-Datenbank gepuffert in Temp-Dateien und ersetzt die Ziele atomar
+    
+    So lädt das Addon nie eine halb geschriebene Datenbank. Mit compact=True
+    wird das kompakte Format geschrieben, optional auf split Dateien verteilt
+    (die .toc wird dann angepasst).
+    """
+    split = max(1, split) if compact else 1
+    paths = lua_db_file_names(path, split)
+    tmp_paths = [target.with_name(f".{target.name}.{os.getpid()}.tmp") for target in paths]
+    files = []
+    try:
+        for tmp_path in tmp_paths:
+            files.append(open(tmp_path, 'w', encoding='utf-8', newline='\n', buffering=LUA_WRITE_BUFFER))
+        if compact:
+            write_compact_lua_database(items_data, files, version)
+        else:
+            write_lua_database(items_data, files[0], version)
+        for f in files:
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        for tmp_path, target in zip(tmp_paths, paths):
+            os.replace(tmp_path, target)
+    finally:
+        for f in files:
+            f.close()
+        for tmp_path in tmp_paths:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    # Übrig gebliebene Teil-Dateien eines früheren, stärker aufgeteilten Laufs entfernen
+    base = Path(path)
+    for stale in base.parent.glob(f"{base.stem}_*{base.suffix}"):
+        if stale not in paths and re.fullmatch(rf'{re.escape(base.stem)}_\d+', stale.stem):
+            stale.unlink()
+    update_toc_db_files(paths, toc_path)
+    
+    sizes = {str(target): target.stat().st_size for target in paths}
+    print(f"Lua-DB geschrieben ({'kompakt' if compact else 'normal'}, Version {version}): "
+          + ", ".join(f"{name} ({size / 1024:.0f} KB)" for name, size in sizes.items()))
+    return paths
+
+class LuaTableReader:
+    """Liest die vom Scraper erzeugten Lua-Dateien zurück in Python-Werte
+    
+    Unterstützt genau die Syntax, die write_lua_database und write_compact_lua_database
+    erzeugen: Strings, Zahlen, true/false/nil, Tabellen mit [key] =, name = und
+    Positions-Einträgen sowie Zuweisungen an X, X.feld und X.feld[#X.feld + 1].
+    Tabellen nur mit Positions-Einträgen werden zu Listen, alle anderen zu Dicts.
+    """
+
+    def __init__(self, text):
+        self.tokens = LUA_TOKEN_PATTERN.findall(text)
+        self.pos = 0
+
+    def error(self, message):
+        return ValueError(f"Lua-Syntax (Token {self.pos}): {message}")
+
+    def expect(self, symbol):
+        if self.tokens[self.pos][3] != symbol:
+            raise self.error(f"'{symbol}' erwartet, gefunden {''.join(self.tokens[self.pos])!r}")
+        self.pos += 1
+
+    def value(self):
+        string, number, name, symbol = self.tokens[self.pos]
+        self.pos += 1
+        if string:
+            text = string[1:-1]
+            if "\\" in text:
+                text = LUA_UNESCAPE_PATTERN.sub(lambda match: LUA_ESCAPES.get(match.group(1), match.group(1)), text)
+            return text
+        if number:
+            return float(number) if "." in number or "e" in number or "E" in number else int(number)
+        if symbol == "{":
+            return self.table()
+        if name in ("true", "false", "nil"):
+            return {"true": True, "false": False, "nil": None}[name]
+        self.pos -= 1
+        raise self.error(f"Wert erwartet, gefunden {''.join(self.tokens[self.pos])!r}")
+
+    def table(self):
+        tokens = self.tokens
+        entries = {}
+        items = []
+        while True:
+            string, number, name, symbol = tokens[self.pos]
+            if symbol == "}":
+                self.pos += 1
+                break
+            if symbol == "[":
+                self.pos += 1
+                key = self.value()
+                self.expect("]")
+                self.expect("=")
+                value = self.value()
+                if value is not None:
+                    entries[key] = value
+            elif name and tokens[self.pos + 1][3] == "=":
+                self.pos += 2
+                value = self.value()
+                if value is not None:
+                    entries[name] = value
+            else:
+                items.append(self.value())
+            if tokens[self.pos][3] in (",", ";"):
+                self.pos += 1
+        
+        if not entries:
+            return items
+        entries.update(enumerate(items, 1))
+        return entries
+
+    def run(self, env=None):
+        """Führt die Zuweisungen der Datei aus und liefert die (globalen) Variablen"""
+        env = {} if env is None else env
+        tokens = self.tokens
+        while self.pos < len(tokens):
+            path = [tokens[self.pos][2]]
+            if not path[0]:
+                raise self.error("Zuweisung erwartet")
+            self.pos += 1
+            append = False
+            while True:
+                symbol = tokens[self.pos][3]
+                if symbol == ".":
+                    path.append(tokens[self.pos + 1][2])
+                    self.pos += 2
+                elif symbol == "[" and tokens[self.pos + 1][3] == "#":
+                    # X.feld[#X.feld + 1] = ... hängt an die Liste an
+                    while tokens[self.pos][3] != "]":
+                        self.pos += 1
+                    self.pos += 1
+                    append = True
+                else:
+                    break
+            self.expect("=")
+            value = self.value()
+            
+            target = env
+            for key in path[:-1]:
+                target = target[key]
+            if append:
+                target.setdefault(path[-1], []).append(value)
+            else:
+                target[path[-1]] = value
+        return env
+
+def expand_compact_db(db):
+    """Entpackt das kompakte DB-Format in {decorId: Lua-Eintrag} (wie ExpandCompactDB im Addon)"""
+    strings = db.get("strings") or []
+    string_fields = db.get("stringFields") or {}
+    vendor_fields = db.get("vendorFields") or []
+    prefix = db.get("mapPrefix") or ""
+    
+    def resolve(field, value):
+        if value is None or value is False:
+            return None
+        if field in string_fields:
+            return strings[value - 1] if value else None
+        return value
+    
+    shared_vendors = []
+    for vendor in db.get("vendors") or []:
+        vendor = dict(vendor)
+        if vendor.get("mapTexture"):
+            vendor["mapTexture"] = prefix + vendor["mapTexture"]
+        shared_vendors.append(vendor)
+    
+    decor_items = {}
+    stride = len(vendor_fields) + 1
+    for chunk in db.get("chunks") or []:
+        columns = chunk["columns"]
+        sources = chunk.get("sources") or {}
+        vendors = chunk.get("vendors") or {}
+        materials = chunk.get("materials") or {}
+        for row, decor_id in enumerate(columns["ids"], 1):
+            entry = {}
+            for field, column in columns.items():
+                if field != "ids":
+                    value = resolve(field, column[row - 1])
+                    if value is not None:
+                        entry[field] = value
+            if row in sources:
+                entry["sources"] = [strings[index - 1] for index in sources[row]]
+            if row in vendors:
+                refs = vendors[row]
+                entry["vendors"] = []
+                for start in range(0, len(refs), stride):
+                    vendor = dict(shared_vendors[refs[start] - 1])
+                    for offset, field in enumerate(vendor_fields, 1):
+                        value = resolve(field, refs[start + offset])
+                        if value is not None:
+                            vendor[field] = value
+                    entry["vendors"].append(vendor)
+            if row in materials:
+                refs = materials[row]
+                entry["materials"] = [{"id": refs[start], "name": strings[refs[start + 1] - 1],
+                                       "quantity": refs[start + 2]}
+                                      for start in range(0, len(refs), 3)]
+            decor_items[decor_id] = entry
+    return decor_items
+
+def lua_entry_to_item(item_id, entry):
+    """Wandelt einen Lua-Eintrag zurück in die Item-Dict-Form des Scrapers (decorCost -> budget_cost)"""
+    item = empty_item_data(item_id)
+    for key, value in entry.items():
+        if key == "decorCost":
+            item["budget_cost"] = value
+        elif key in ("vendors", "materials"):
+            item[key] = [dict(part) for part in value]
+        else:
+            item[key] = value
+    return item
+
+def load_lua_database(path="HousingItemTrackerDB.lua"):
+    """Liest eine Lua-DB (normal oder kompakt, inkl. aufgeteilter X_2.lua, ...) als ({id: Item}, Version)"""
+    path = Path(path)
+    paths = [path]
+    index = 2
+    while path.with_name(f"{path.stem}_{index}{path.suffix}").exists():
+        paths.append(path.with_name(f"{path.stem}_{index}{path.suffix}"))
+        index += 1
+    
+    env = {}
+    for part in paths:
+        LuaTableReader(part.read_text(encoding='utf-8')).run(env)
+    db = env.get("HousingItemTrackerDB")
+    if not isinstance(db, dict):
+        raise ValueError(f"{path}: keine HousingItemTrackerDB-Tabelle gefunden")
+    
+    if db.get("format") == "compact":
+        entries = expand_compact_db(db)
+    else:
+        entries = (db.get("items") or {}).get("decorItems") or {}
+    items = {int(item_id): lua_entry_to_item(int(item_id), entry) for item_id, entry in entries.items()}
+    return items, db.get("version")
+
+def load_release_items(path):
+    """Lädt einen Scrape-Stand aus housing_items_final.json oder einer Lua-DB als ({id: Item}, Version)"""
+    if Path(path).suffix.lower() == ".json":
+        with open(path, 'r', encoding='utf-8') as f:
+            return {int(item_id): item for item_id, item in json.load(f).items()}, None
+    return load_lua_database(path)
+
+def fill_missing(target, source):
+    """Übernimmt alle Felder aus source, die in target fehlen oder leer sind"""
+    for key, value in source.items():
+        if target.get(key) in (None, "", []):
+            target[key] = value
+    return target
+
+def merge_seed_item(item, seed_item):
+    """Ergänzt ein frisch gescraptes Item feldweise aus einem Seed-Stand (z.B. der eingecheckten Lua-DB)
+    
+    Aus dem Seed kommen nur Felder, die der Scraper nicht liefert (questId,
+    achievementId, ...) oder nicht parsen konnte (None). Geparste Listen gewinnen
+    auch leer - entfallene Vendoren, Materialien oder Quellen bleiben entfallen,
+    ebenso Quest/Achievement/Beruf ohne die zugehörige Quelle. Vendoren werden per
+    npcId bzw. Name + Ort zugeordnet und feldweise ergänzt. Ein Item ohne Namen
+    wurde gar nicht geparst und wird komplett aus dem Seed aufgefüllt.
+    Ändert item direkt und gibt es zurück.
+    """
+    if not item.get("name"):
+        return fill_missing(item, copy.deepcopy(seed_item))
+    
+    scraped_fields = empty_item_data(item.get("id"))
+    sources = item.get("sources") or []
+    for key, value in seed_item.items():
+        if key == "vendors":
+            for seed_vendor, vendor in match_vendors(value, item.get("vendors") or [])[0]:
+                fill_missing(vendor, seed_vendor)
+        elif isinstance(scraped_fields.get(key), list):
+            continue
+        elif key in SEED_SOURCE_FIELDS and SEED_SOURCE_FIELDS[key] not in sources:
+            continue
+        elif item.get(key) in (None, ""):
+            item[key] = copy.deepcopy(value)
+    return item
+
+def load_ingame_export(path):
+    """Liest den Export von IngameDataCollector.lua (kopierte Chat-Ausgabe oder SavedVariables-Datei)
+    
+    Liefert {id: {Feld: Wert}} mit den Feldern aus INGAME_FIELDS (bereits in
+    Scraper-Namen, decorCost -> budget_cost) und dem (lokalisierten) Namen.
+    """
+    text = Path(path).read_text(encoding='utf-8')
+    match = INGAME_EXPORT_PATTERN.search(text)
+    if not match:
+        raise ValueError(f"{path}: keine Tabelle {INGAME_EXPORT_VARIABLE} gefunden")
+    data = LuaTableReader(text[match.end():]).value()
+    
+    entries = {}
+    for key, entry in (data.items() if isinstance(data, dict) else enumerate(data, 1)):
+        if not isinstance(entry, dict):
+            continue
+        item_id = int(entry.get("id") or key)
+        values = {field: entry[lua_field] for lua_field, field in INGAME_FIELDS if entry.get(lua_field) is not None}
+        if entry.get("name"):
+            values["name"] = entry["name"]
+        entries[item_id] = values
+    return entries
+
+def apply_ingame_values(item, ingame_entry):
+    """Übernimmt die im Spiel maßgeblichen Felder (Decor-Kosten, Qualität); der Name nur, wenn er fehlt"""
+    for _, field in INGAME_FIELDS:
+        if field in ingame_entry:
+            item[field] = ingame_entry[field]
+    if not item.get("name") and ingame_entry.get("name"):
+        item["name"] = ingame_entry["name"]
+    return item
+
+def ingame_delta(ingame, known_items):
+    """IDs, die im Web-Stand fehlen oder deren Web-Werte vom Spiel abweichen (nur diese werden gescraped)"""
+    return {item_id for item_id, entry in ingame.items()
+            if item_id not in known_items
+            or any(field in entry and known_items[item_id].get(field) != entry[field] for field in INGAME_WEB_FIELDS)}
+
+def validate_items(items):
+    """Prüft Items auf offensichtliche Fehler und liefert eine Liste (id, Meldung)"""
+    problems = []
+    npc_names = {}
+    for item_id, item in iter_sorted_items(items):
+        def problem(message):
+            problems.append((item_id, message))
+        
+        if not item.get("name"):
+            problem("kein Name")
+        cost = item.get("budget_cost")
+        if cost is not None and (not isinstance(cost, int) or cost <= 0):
+            problem(f"ungültige Decor-Kosten {cost!r}")
+        quality = item.get("quality")
+        if quality is not None and (not isinstance(quality, int) or quality < 0):
+            problem(f"ungültige Qualität {quality!r}")
+        sources = item.get("sources") or []
+        if "Vendor" in sources and not item.get("vendors"):
+            problem("Quelle Vendor, aber keine Vendoren")
+        
+        for vendor in item.get("vendors") or []:
+            label = vendor.get("name") or "?"
+            if not vendor.get("name"):
+                problem("Vendor ohne Namen")
+            price = vendor.get("price")
+            if price is not None and (not isinstance(price, (int, float)) or price < 0):
+                problem(f"Vendor {label}: ungültiger Preis {price!r}")
+            for axis in ("coordX", "coordY"):
+                coord = vendor.get(axis)
+                if coord is not None and not 0 <= coord <= 100:
+                    problem(f"Vendor {label}: {axis} {coord!r} außerhalb 0-100")
+            npc_id = vendor.get("npcId")
+            if npc_id and vendor.get("name"):
+                known = npc_names.setdefault(npc_id, vendor["name"])
+                if known != vendor["name"]:
+                    problem(f"NPC {npc_id} heißt hier {vendor['name']!r}, sonst {known!r}")
+        
+        material_ids = set()
+        for material in item.get("materials") or []:
+            if not isinstance(material.get("id"), int):
+                problem(f"Material ohne gültige ID: {material!r}")
+            elif material["id"] in material_ids:
+                problem(f"Material {material['id']} doppelt")
+            material_ids.add(material.get("id"))
+            quantity = material.get("quantity")
+            if not isinstance(quantity, int) or quantity < 1:
+                problem(f"Material {material.get('id')}: ungültige Menge {quantity!r}")
+    return problems
+
+def print_validation(problems, limit=20):
+    """Gibt das Ergebnis von validate_items aus"""
+    if not problems:
+        print("Validierung: OK")
+        return
+    print(f"Validierung: {len(problems)} Auffälligkeiten")
+    for item_id, message in problems[:limit]:
+        print(f"  [{item_id}] {message}")
+    if len(problems) > limit:
+        print(f"  ... und {len(problems) - limit} weitere")
+
+def changed_fields(old, new, skip=()):
+    """{Feld: [alt, neu]} für alle abweichenden Felder zweier Dicts"""
+    return {key: [old.get(key), new.get(key)]
+            for key in sorted(old.keys() | new.keys())
+            if key not in skip and old.get(key) != new.get(key)}
+
+def vendor_label(vendor):
+    """Kurzbeschreibung eines Vendors für das Changelog"""
+    return {key: vendor.get(key) for key in ("npcId", "name", "location") if vendor.get(key) is not None}
+
+def match_vendors(old_vendors, new_vendors):
+    """Ordnet Vendoren zweier Stände zu: per npcId, sonst per (Name, Ort)
+    
+    Liefert (Paare, neue Vendoren, entfernte Vendoren).
+    """
+    by_npc = {}
+    by_name = {}
+    for index, vendor in enumerate(old_vendors):
+        if vendor.get("npcId"):
+            by_npc.setdefault(vendor["npcId"], index)
+        by_name.setdefault((vendor.get("name"), vendor.get("location")), index)
+    
+    pairs = []
+    added = []
+    used = set()
+    for vendor in new_vendors:
+        index = by_npc.get(vendor.get("npcId")) if vendor.get("npcId") else None
+        if index is None or index in used:
+            index = by_name.get((vendor.get("name"), vendor.get("location")))
+        if index is None or index in used:
+            added.append(vendor)
+            continue
+        used.add(index)
+        pairs.append((old_vendors[index], vendor))
+    removed = [vendor for index, vendor in enumerate(old_vendors) if index not in used]
+    return pairs, added, removed
+
+def diff_release_item(old, new):
+    """Unterschiede eines Items zwischen zwei Ständen (None wenn gleich), verglichen wird der Lua-Eintrag"""
+    old_entry, new_entry = lua_item_entry(old), lua_item_entry(new)
+    if old_entry == new_entry:
+        return None
+    change = {}
+    
+    fields = changed_fields(old_entry, new_entry, skip=("vendors", "materials"))
+    if fields:
+        change["fields"] = fields
+    
+    pairs, added, removed = match_vendors(old_entry.get("vendors", []), new_entry.get("vendors", []))
+    vendors = {}
+    if added:
+        vendors["added"] = [vendor_label(vendor) for vendor in added]
+    if removed:
+        vendors["removed"] = [vendor_label(vendor) for vendor in removed]
+    vendor_changes = [dict(vendor_label(new_vendor), fields=fields)
+                      for old_vendor, new_vendor in pairs
+                      for fields in [changed_fields(old_vendor, new_vendor)] if fields]
+    if vendor_changes:
+        vendors["changed"] = vendor_changes
+    if vendors:
+        change["vendors"] = vendors
+    
+    old_materials = {material["id"]: material for material in old_entry.get("materials", [])}
+    new_materials = {material["id"]: material for material in new_entry.get("materials", [])}
+    materials = {}
+    if new_materials.keys() - old_materials.keys():
+        materials["added"] = [new_materials[mat_id] for mat_id in sorted(new_materials.keys() - old_materials.keys())]
+    if old_materials.keys() - new_materials.keys():
+        materials["removed"] = [old_materials[mat_id] for mat_id in sorted(old_materials.keys() - new_materials.keys())]
+    material_changes = [dict(id=mat_id, fields=fields)
+                        for mat_id in sorted(old_materials.keys() & new_materials.keys())
+                        for fields in [changed_fields(old_materials[mat_id], new_materials[mat_id])] if fields]
+    if material_changes:
+        materials["changed"] = material_changes
+    if materials:
+        change["materials"] = materials
+    
+    # Ohne Einzeländerungen hat sich nur die Reihenfolge von Vendoren/Materialien geändert
+    return change or {"reordered": True}
+
+def diff_releases(old_items, new_items, old_version=None):
+    """Vergleicht zwei Stände ({id: Item}) und liefert Changelog und Delta
+    
+    Das Changelog listet neue/entfernte Items und pro geändertem Item die Feld-,
+    Vendor- (Zuordnung per npcId) und Material-Änderungen. Das Delta enthält nur
+    die Lua-Einträge der neuen und geänderten Items plus die entfernten IDs.
+    Die Version wird bei Änderungen gegenüber old_version hochgezählt.
+    """
+    old_ids, new_ids = old_items.keys(), new_items.keys()
+    added = sorted(new_ids - old_ids)
+    removed = sorted(old_ids - new_ids)
+    changed = {}
+    for item_id in sorted(old_ids & new_ids):
+        change = diff_release_item(old_items[item_id], new_items[item_id])
+        if change:
+            changed[item_id] = change
+    
+    has_changes = bool(added or removed or changed)
+    from_version = old_version or LUA_DB_VERSION
+    to_version = from_version + 1 if has_changes and old_version else from_version
+    
+    vendor_changes = [change.get("vendors", {}) for change in changed.values()]
+    changelog = {
+        "fromVersion": from_version,
+        "toVersion": to_version,
+        "summary": {
+            "items": len(new_items),
+            "added": len(added),
+            "removed": len(removed),
+            "changed": len(changed),
+            "vendorsAdded": sum(len(vendors.get("added", [])) for vendors in vendor_changes),
+            "vendorsRemoved": sum(len(vendors.get("removed", [])) for vendors in vendor_changes),
+            "priceChanges": sum(1 for vendors in vendor_changes for vendor in vendors.get("changed", [])
+                                if "price" in vendor["fields"] or "currency" in vendor["fields"]),
+            "materialChanges": sum(1 for change in changed.values() if "materials" in change),
+        },
+        "added": [{"id": item_id, "name": new_items[item_id].get("name")} for item_id in added],
+        "removed": [{"id": item_id, "name": old_items[item_id].get("name")} for item_id in removed],
+        "changed": [dict(id=item_id, name=new_items[item_id].get("name"), **change)
+                    for item_id, change in changed.items()],
+    }
+    delta = {
+        "fromVersion": from_version,
+        "toVersion": to_version,
+        "items": {str(item_id): lua_item_entry(new_items[item_id]) for item_id in sorted(added + list(changed))},
+        "removed": removed,
+    }
+    return changelog, delta
+
+def save_release_diff(changelog, delta, changelog_path=CHANGELOG_FILE, delta_path=DELTA_FILE):
+    """Schreibt Changelog und Delta als JSON"""
+    for data, path in ((changelog, changelog_path), (delta, delta_path)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def print_changelog(changelog, limit=20):
+    """Gibt eine lesbare Zusammenfassung des Changelogs aus"""
+    summary = changelog["summary"]
+    print(f"Version {changelog['fromVersion']} -> {changelog['toVersion']}: "
+          f"{summary['added']} neu, {summary['removed']} entfernt, {summary['changed']} geändert "
+          f"({summary['vendorsAdded']} Vendoren neu, {summary['vendorsRemoved']} entfernt, "
+          f"{summary['priceChanges']} Preisänderungen, {summary['materialChanges']} mit geänderten Materialien)")
+    for label, entries in (("+", changelog["added"]), ("-", changelog["removed"])):
+        for entry in entries[:limit]:
+            print(f"  {label} [{entry['id']}] {entry['name']}")
+    for change in changelog["changed"][:limit]:
+        print(f"  ~ [{change['id']}] {change['name']}")
+        for key, (old, new) in change.get("fields", {}).items():
+            print(f"      {key}: {old!r} -> {new!r}")
+        for kind, vendors in change.get("vendors", {}).items():
+            for vendor in vendors:
+                print(f"      Vendor {kind}: {vendor.get('name')} ({vendor.get('npcId') or vendor.get('location')})"
+                      + (f" {vendor['fields']}" if "fields" in vendor else ""))
+        for kind, materials in change.get("materials", {}).items():
+            print(f"      Materialien {kind}: {materials}")
+    if len(changelog["changed"]) > limit:
+        print(f"  ... und {len(changelog['changed']) - limit} weitere geänderte Items")
+
+def run_release_diff(old_path, new_path, changelog_path=CHANGELOG_FILE, delta_path=DELTA_FILE):
+    """Vergleicht zwei Scrape-Stände (JSON oder Lua-DB) und schreibt Changelog und Delta"""
+    start = time.perf_counter()
+    old_items, old_version = load_release_items(old_path)
+    new_items, _ = load_release_items(new_path)
+    loaded = time.perf_counter()
+    changelog, delta = diff_releases(old_items, new_items, old_version)
+    save_release_diff(changelog, delta, changelog_path, delta_path)
+    done = time.perf_counter()
+    
+    print(f"{old_path} ({len(old_items)} Items) -> {new_path} ({len(new_items)} Items)")
+    print_changelog(changelog)
+    print(f"Changelog: {changelog_path}, Delta: {delta_path} ({len(delta['items'])} Items)")
+    print(f"Dauer: {(loaded - start) * 1000:.0f} ms Laden, {(done - loaded) * 1000:.0f} ms Vergleich")
+    return changelog
+
+def peak_memory_mb():
+    """Bisheriger Spitzenwert des Prozess-Speichers (RSS) in MB, None wenn nicht messbar"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux liefert KB, macOS Bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def diff_items(expected, actual, max_fields=5):
+    """Vergleicht zwei Item-Dicts (wie housing_items_final.json) und liefert die Unterschiede"""
+    expected = {str(item_id): item for item_id, item in expected.items()}
+    actual = json.loads(json.dumps({str(item_id): item for item_id, item in actual.items()}))
+    changed = {}
+    for item_id in sorted(expected.keys() & actual.keys(), key=int):
+        old, new = expected[item_id], actual[item_id]
+        if old != new:
+            fields = sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+            changed[item_id] = {key: (old.get(key), new.get(key)) for key in fields[:max_fields]}
+    return {
+        "missing": sorted(expected.keys() - actual.keys(), key=int),
+        "added": sorted(actual.keys() - expected.keys(), key=int),
+        "changed": changed,
+    }
+
+def replay_corpus(corpus_dir, golden_path=None, update_golden=False, workers=1, max_pages=MAX_LISTING_PAGES,
+                  base_url=None):
+    """Lässt Listing, Detail-Parsing und Lua-Generierung offline gegen einen aufgezeichneten Korpus laufen
+    
+    Misst Items/s, Zeiten pro Stufe und den Speicher-Spitzenwert und vergleicht die
+    geparsten Items mit einer Golden-JSON. Basis-URL und Items kommen aus dem
+    Korpus-Manifest; nur wenn die Items über Listing-Seiten gefunden wurden, wird
+    das Listing mit abgespielt. Gibt True zurück, wenn es keine Abweichungen gibt.
+    """
+    manifest = load_corpus_manifest(corpus_dir)
+    previous_base_url = BASE_URL
+    set_base_url((manifest or {}).get("baseUrl") or base_url or BASE_URL)
+    try:
+        return _replay_corpus(corpus_dir, manifest, golden_path, update_golden, workers, max_pages)
+    finally:
+        set_base_url(previous_base_url)
+
+def _replay_corpus(corpus_dir, manifest, golden_path, update_golden, workers, max_pages):
+    corpus = PageCache(corpus_dir)
+    fetcher = CorpusFetcher(corpus)
+    timings = {}
+    memory = {}
+    
+    def stage(name, func):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        timings[name] = time.perf_counter() - start
+        memory[name] = peak_memory_mb()
+        return result
+    
+    listing_mismatch = False
+    if manifest is None or manifest.get("listingPages"):
+        item_urls = stage("listing", lambda: collect_item_urls(fetcher, max_pages=max_pages))
+        if manifest is not None and set(item_urls) != set(manifest["items"]):
+            # Nur die Items, die beim Aufzeichnen gescraped wurden (z.B. ein Shard), nicht das ganze Listing
+            listing_mismatch = not set(manifest["items"]) <= set(item_urls)
+            item_urls = {item_id: url for item_id, url in item_urls.items() if item_id in manifest["items"]}
+    else:
+        item_urls = stage("listing", lambda: dict(manifest["items"]))
+    items = stage("detail", lambda: scrape_items_parallel(item_urls, lambda idx: fetcher, workers=workers))
+    lua_db = stage("lua", lambda: generate_lua_database(items))
+    compact_out = io.StringIO()
+    stage("lua_compact", lambda: write_compact_lua_database(items, [compact_out]))
+    
+    parse_time = timings["listing"] + timings["detail"]
+    print(f"\n{'='*70}")
+    print(f"KORPUS-REPLAY: {corpus_dir}")
+    print(f"{'='*70}")
+    print(f"Items:                 {len(items)} ({len(fetcher.missing)} Detail-Seiten fehlen im Korpus)")
+    print(f"Durchsatz:             {len(items) / parse_time if parse_time else 0:.1f} Items/s (Listing + Detail)")
+    for name, seconds in timings.items():
+        peak = memory[name]
+        print(f"  {name:12s} {seconds * 1000:9.1f} ms   Speicher-Spitze: "
+              + (f"{peak:.1f} MB" if peak is not None else "n/a"))
+    print(f"Lua-DB:                {len(lua_db) / 1024:.0f} KB, kompakt {len(compact_out.getvalue()) / 1024:.0f} KB")
+    
+    ok = True
+    if manifest is None:
+        print("WARN: Korpus ohne Manifest - Items nur aus den aufgezeichneten Listing-Seiten")
+    else:
+        print(f"Manifest:              {manifest['source']}, {len(manifest['items'])} Items, {manifest['baseUrl']}")
+    if listing_mismatch:
+        ok = False
+        missing = sorted(set(manifest["items"]) - set(item_urls))
+        print(f"FEHLER: Listing-Replay findet {len(missing)} Items aus dem Manifest nicht: "
+              f"{', '.join(map(str, missing[:20]))}")
+    if not items:
+        # Ein leeres Ergebnis ist nie ein gültiger Stand und darf keine Golden-Datei erzeugen
+        print(f"FEHLER: Keine Items aus dem Korpus {corpus_dir} abgespielt"
+              + (" - Golden-Datei wird nicht geschrieben" if golden_path and update_golden else ""))
+        print(f"{'='*70}\n")
+        return False
+    if golden_path and update_golden:
+        with open(golden_path, 'w', encoding='utf-8') as f:
+            json.dump(items, f, indent=2, ensure_ascii=False)
+        print(f"Golden-Datei aktualisiert: {golden_path}")
+    elif golden_path:
+        with open(golden_path, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+        diff = diff_items(golden, items)
+        ok = not (diff["missing"] or diff["added"] or diff["changed"])
+        print(f"Golden-Vergleich ({golden_path}): {'OK' if ok else 'ABWEICHUNGEN'}")
+        if diff["missing"]:
+            print(f"  Fehlende Items: {', '.join(diff['missing'][:20])}")
+        if diff["added"]:
+            print(f"  Neue Items:     {', '.join(diff['added'][:20])}")
+        for item_id, fields in list(diff["changed"].items())[:20]:
+            print(f"  [{item_id}] geändert:")
+            for key, (old, new) in fields.items():
+                print(f"      {key}: {old!r} -> {new!r}")
+        if len(diff["changed"]) > 20:
+            print(f"  ... und {len(diff['changed']) - 20} weitere geänderte Items")
+    print(f"{'='*70}\n")
+    return ok
+
+def write_items_json(items_data, path):
+    """Schreibt die Items streamend als JSON (gleiches Format wie json.dump(..., indent=2))"""
+    with open(path, 'w', encoding='utf-8') as f:
+        separator = "{"
+        for item_id, item in iter_sorted_items(items_data):
+            f.write(f'{separator}\n  "{item_id}": ')
+            f.write(json.dumps(item, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+            separator = ","
+        f.write("\n}" if separator == "," else "{}")
+
+def release_version(items_data, db_path, changelog_path=CHANGELOG_FILE, delta_path=DELTA_FILE):
+    """Vergleicht die neuen Items mit der bisherigen Lua-DB, schreibt Changelog/Delta und liefert die neue Version"""
+    if not Path(db_path).exists():
+        return LUA_DB_VERSION
+    try:
+        old_items, old_version = load_lua_database(db_path)
+    except (ValueError, IndexError, KeyError) as e:
+        print(f"WARN: Bisherige Lua-DB nicht lesbar ({e}) - Version {LUA_DB_VERSION}, kein Changelog")
+        return LUA_DB_VERSION
+    
+    changelog, delta = diff_releases(old_items, dict(iter_sorted_items(items_data)), old_version)
+    print()
+    print_changelog(changelog, limit=10)
+    if changelog["toVersion"] != changelog["fromVersion"]:
+        save_release_diff(changelog, delta, changelog_path, delta_path)
+        print(f"Changelog: {changelog_path}, Delta: {delta_path}")
+    return changelog["toVersion"]
+
+def write_outputs(items_data, args, metrics):
+    """Schreibt JSON und Lua-DB (aus Dict oder Store) und gibt die Statistik aus"""
+    print("\n\nSpeichere Ergebnisse...")
+    
+    if args.shard:
+        # Ein Shard schreibt nur seinen Teil als JSON, die Lua-DB entsteht erst mit --merge-shards
+        with metrics.timer("json"):
+            write_items_json(items_data, shard_path(SHARD_OUTPUT_FILE, args.shard))
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: {shard_path(SHARD_OUTPUT_FILE, args.shard)}")
+        return
+    
+    with metrics.timer("json"):
+        write_items_json(items_data, OUTPUT_JSON_FILE)
+    write_lua_outputs(items_data, args, metrics)
+
+def write_lua_outputs(items_data, args, metrics):
+    """Release-Diff gegen die bisherige Lua-DB, neue Lua-DB, Validierung und Statistik"""
+    with metrics.timer("diff"):
+        version = release_version(items_data, LUA_DB_FILE, args.changelog, args.delta)
+    
+    with metrics.timer("lua"):
+        save_lua_database(items_data, LUA_DB_FILE, compact=args.compact, split=args.split, version=version)
+    
+    print_validation(validate_items(items_data), limit=10)
+    print_item_statistics(items_data)
+
+def print_item_statistics(items_data, title="FERTIG!"):
+    """Gesamtzahl, Items mit Vendors/Crafting/Achievement und eindeutige Materialien"""
+    total = items_with_vendors = items_with_crafting = items_with_achievement = 0
+    materials = set()
+    for _, item in iter_sorted_items(items_data):
+        total += 1
+        items_with_vendors += bool(item.get("vendors"))
+        items_with_crafting += "Crafting" in item.get("sources", [])
+        items_with_achievement += "Achievement" in item.get("sources", [])
+        materials.update(mat["id"] for mat in item.get("materials", []))
+    
+    print("\n" + "=" * 70)
+    print(title)
+    print("=" * 70)
+    print(f"Gesamt Items:          {total}")
+    print(f"Items mit Vendors:     {items_with_vendors}")
+    print(f"Items mit Crafting:    {items_with_crafting}")
+    print(f"Items mit Achievement: {items_with_achievement}")
+    print(f"Eindeutige Materials:  {len(materials)}")
+    print("=" * 70)
+
+def item_completeness(item):
+    """Grobe Vollständigkeit eines Items (Anzahl gefüllter Felder plus Vendoren/Materialien)"""
+    return sum(1 for value in item.values() if value not in (None, "", [])) \
+        + len(item.get("vendors") or []) + len(item.get("materials") or [])
+
+def merge_shard_outputs(paths):
+    """Führt die JSON-Ausgaben mehrerer Shards zusammen
+    
+    Kommt eine ID in mehreren Dateien vor (z.B. nach einem Neu-Aufteilen), gewinnt
+    das vollständigere Item, bei Gleichstand das aus der zuerst genannten Datei.
+    Das Ergebnis hängt damit nur vom Inhalt und der Reihenfolge der Dateien ab.
+    """
+    merged = {}
+    duplicates = conflicts = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            items = {int(item_id): item for item_id, item in json.load(f).items()}
+        print(f"  {path}: {len(items)} Items")
+        for item_id, item in items.items():
+            existing = merged.get(item_id)
+            if existing is None:
+                merged[item_id] = item
+                continue
+            duplicates += 1
+            if existing != item:
+                conflicts += 1
+                if item_completeness(item) > item_completeness(existing):
+                    merged[item_id] = item
+    print(f"Zusammengeführt: {len(merged)} Items ({duplicates} doppelt, davon {conflicts} mit abweichendem Inhalt)")
+    return {item_id: merged[item_id] for item_id in sorted(merged)}
+
+def add_fetch_options(parser):
+    """Optionen für das Laden der Seiten (Backend, Worker, Limits, Browser)"""
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Anzahl paralleler Browser-Sessions für die Detail-Seiten")
+    parser.add_argument('--rps', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="Globales Limit für Detail-Requests pro Sekunde (0 = kein Limit)")
+    parser.add_argument('--base-url', default=BASE_URL,
+                        help="Basis-URL der Seite (z.B. http://127.0.0.1:8765 für mock_wowdb_server.py)")
+    parser.add_argument('--backend', choices=FETCH_BACKENDS, default=DEFAULT_BACKEND,
+                        help="Fetch-Backend: selenium (Chrome), http (ohne Browser) oder auto "
+                             "(HTTP mit Selenium-Fallback für JavaScript-Seiten)")
+    parser.add_argument('--browser-recycle', type=int, default=BROWSER_RECYCLE_PAGES, metavar='N',
+                        help="Chrome nach N Seiten neu starten (0 = nie)")
+    parser.add_argument('--browser-max-rss', type=int, default=BROWSER_MAX_RSS_MB, metavar='MB',
+                        help="Chrome neu starten, sobald chromedriver + Chrome mehr als MB RSS belegen "
+                             "(0 = aus, braucht psutil)")
+    parser.add_argument('--no-block-resources', action='store_true',
+                        help="Bilder, Fonts, Medien und Werbe-/Tracking-Skripte im Browser nicht blockieren")
+    parser.add_argument('--driver-path', metavar='PATH',
+                        help="Pfad zum chromedriver (sonst CHROMEDRIVER, dann der gecachte Pfad, "
+                             "dann einmalig webdriver-manager)")
+    parser.add_argument('--retries', type=int, default=RETRY_ATTEMPTS,
+                        help="Versuche pro Seite/Karte (mit exponentiellem Backoff) bevor sie als fehlgeschlagen gilt")
+
+def add_discovery_options(parser):
+    """Optionen der Discovery-Stufe"""
+    parser.add_argument('--discovery', choices=DISCOVERY_MODES, default="auto",
+                        help="Item-Discovery: auto (Sitemap/Daten-Endpunkt, sonst Listing-Seiten), "
+                             "nur sitemap oder nur listing")
+    parser.add_argument('--discovery-url', action='append', metavar='URL',
+                        help="Zusätzlicher Sitemap- oder JSON/XHR-Endpunkt mit Decor-URLs (mehrfach möglich)")
+    parser.add_argument('--max-pages', type=int, default=MAX_LISTING_PAGES,
+                        help="Obergrenze für Listing-Seiten; die Paginierung stoppt vorher an der ersten leeren Seite")
+
+def add_map_options(parser):
+    """Optionen für Download und Konvertierung der Vendor-Karten"""
+    parser.add_argument('--map-workers', type=int, default=MAP_DOWNLOAD_WORKERS,
+                        help="Parallele Downloads für Vendor-Karten")
+    parser.add_argument('--convert-workers', type=int, default=None,
+                        help="Prozesse für die TGA-Konvertierung (Standard: Anzahl CPUs, 0 = im Download-Thread)")
+    parser.add_argument('--rle', action='store_true',
+                        help="Vendor-Karten als RLE-komprimierte TGA speichern")
+
+def add_output_options(parser):
+    """Optionen für Lua-DB, Changelog und Delta"""
+    parser.add_argument('--compact', action='store_true',
+                        help="Lua-DB im kompakten Format schreiben (String-/Vendor-Tabellen, Spalten-Arrays)")
+    parser.add_argument('--split', type=int, default=1, metavar='N',
+                        help="Kompakte Lua-DB auf N Dateien verteilen (werden in die .toc eingetragen)")
+    parser.add_argument('--changelog', default=str(CHANGELOG_FILE),
+                        help="Ziel für das Changelog (Items/Vendoren/Preise/Materialien) zwischen zwei DB-Versionen")
+    parser.add_argument('--delta', default=str(DELTA_FILE),
+                        help="Ziel für das Delta (nur neue und geänderte Items plus entfernte IDs)")
+
+def add_profile_option(parser):
+    parser.add_argument('--profile', metavar='PATH',
+                        help="Lauf mit cProfile aufzeichnen (nur Haupt-Thread, daher mit --workers 1; "
+                             "für mehrere Worker z.B. py-spy record --threads verwenden)")
+
+def add_scrape_options(parser):
+    """Alle Optionen eines kompletten Scrape-Laufs (Discovery, Details, Karten, Ausgabe)"""
+    add_fetch_options(parser)
+    add_discovery_options(parser)
+    add_map_options(parser)
+    add_output_options(parser)
+    parser.add_argument('--cache-dir', default=str(PAGE_CACHE_DIR),
+                        help="Verzeichnis des Seiten-Caches (HTML, ETag/Last-Modified, geparste Items)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Seiten-Cache deaktivieren und alles neu laden und parsen")
+    parser.add_argument('--only-new', action='store_true',
+                        help="Detail-Seiten nur für Items laden, die noch nicht im Cache sind")
+    parser.add_argument('--checkpoint', default=str(CHECKPOINT_FILE),
+                        help="Append-only Checkpoint-Log (JSON Lines) für abgebrochene Läufe")
+    parser.add_argument('--resume', action='store_true',
+                        help="Checkpoint-Log einlesen und den letzten Lauf fortsetzen")
+    parser.add_argument('--wait-report', metavar='PATH',
+                        help="Schreibt pro Seite die tatsächliche Wartezeit vs. alte feste Sleeps als JSON")
+    parser.add_argument('--benchmark-backends', type=int, metavar='N', default=0,
+                        help="Vergleicht http und selenium auf N Detail-Seiten und beendet danach")
+    parser.add_argument('--record-corpus', metavar='DIR',
+                        help="Speichert alle geladenen Listing- und Detail-Seiten als Offline-Korpus")
+    parser.add_argument('--pipeline', choices=PIPELINE_MODES, default="threads",
+                        help="threads: Stufen nacheinander; async: asyncio-Pipeline, in der Discovery, Details, "
+                             "Parsing und Karten über begrenzte Queues gleichzeitig laufen")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Mit --pipeline async: Prozesse für das HTML-Parsing (Standard: Anzahl CPUs)")
+    parser.add_argument('--store', default=str(STORE_FILE),
+                        help="SQLite-Zwischenablage (items, vendors, item_vendors, materials, sources)")
+    parser.add_argument('--seed-db', metavar='PATH',
+                        help="Bestehende Lua-DB (oder JSON) als Seed: ergänzt frische Items feldweise (z.B. npcId, "
+                             "questId) und liefert mit --only-new bekannte Items ohne erneutes Laden")
+    parser.add_argument('--ingame', metavar='PATH',
+                        help="Export von IngameDataCollector.lua (Chat-Ausgabe oder SavedVariables): IDs kommen aus "
+                             "dem Spiel, nur fehlende/abweichende Items werden gescraped, decorCost und quality aus "
+                             "dem Spiel gewinnen")
+    parser.add_argument('--shard', type=parse_shard, metavar='i/N',
+                        help="Nur den i-ten von N Teilen der Items scrapen (stabiler Hash der ID); schreibt "
+                             "housing_items_final_shardIofN.json, Store und Checkpoint ebenfalls pro Shard")
+    parser.add_argument('--id-list', metavar='PATH',
+                        help="Item-IDs/URLs aus einer Datei statt Discovery (z.B. von --save-ids, für alle Shards gleich)")
+    parser.add_argument('--save-ids', metavar='PATH',
+                        help="Gefundene Items als {id: url} JSON speichern (vor dem Aufteilen auf Shards)")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Schreibt Zeiten und Zähler pro Stufe am Ende als JSON (auch bei Abbruch)")
+    add_profile_option(parser)
+
+def build_command_parser():
+    """Parser mit Unterbefehlen; jeder Befehl importiert nur, was er braucht"""
+    parser = argparse.ArgumentParser(prog="scraper_final.py", description="WoWDB Housing Decor Scraper")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="BEFEHL")
+    
+    discover = commands.add_parser('discover', help="Nur Item-URLs sammeln und als ID-Liste speichern")
+    add_fetch_options(discover)
+    add_discovery_options(discover)
+    discover.add_argument('--save-ids', default=str(ID_LIST_FILE), metavar='PATH',
+                          help="Ziel der ID-Liste (danach: scrape --id-list PATH)")
+    discover.add_argument('--metrics', metavar='PATH', help="Zeiten und Zähler als JSON schreiben")
+    add_profile_option(discover)
+    
+    scrape = commands.add_parser('scrape', help="Kompletter Lauf: Discovery, Details, Karten, JSON und Lua-DB "
+                                                "(wie ohne Befehl)")
+    add_scrape_options(scrape)
+    
+    textures = commands.add_parser('textures', help="Vendor-Karten der Items im Store laden und konvertieren")
+    textures.add_argument('--store', default=str(STORE_FILE), help="SQLite-Store mit den gescrapten Items")
+    add_map_options(textures)
+    textures.add_argument('--retries', type=int, default=RETRY_ATTEMPTS, help="Versuche pro Karte")
+    textures.add_argument('--optimize', action='store_true',
+                          help="Danach alle Karten optimieren und Duplikate entfernen")
+    textures.add_argument('--dry-run', action='store_true', help="Mit --optimize: nur berichten, nichts schreiben")
+    add_profile_option(textures)
+    
+    generate = commands.add_parser('generate', help="Lua-DB ohne Scrapen neu erzeugen (nur Standardbibliothek)")
+    source = generate.add_mutually_exclusive_group()
+    source.add_argument('--input', default=str(OUTPUT_JSON_FILE), metavar='PATH',
+                        help="Items aus JSON oder einer Lua-DB (Standard: %(default)s)")
+    source.add_argument('--store', metavar='PATH',
+                        help="Items aus dem SQLite-Store; schreibt dann auch housing_items_final.json neu")
+    add_output_options(generate)
+    add_profile_option(generate)
+    generate.set_defaults(shard=None)
+    
+    diff = commands.add_parser('diff', help="Zwei Stände (JSON oder Lua-DB) vergleichen, Changelog und Delta schreiben")
+    diff.add_argument('old', metavar='OLD')
+    diff.add_argument('new', metavar='NEW')
+    diff.add_argument('--changelog', default=str(CHANGELOG_FILE), help="Ziel für das Changelog")
+    diff.add_argument('--delta', default=str(DELTA_FILE), help="Ziel für das Delta")
+    add_profile_option(diff)
+    
+    stats = commands.add_parser('stats', help="Statistik und Validierung einer Lua-DB oder JSON")
+    stats.add_argument('path', nargs='?', default=str(OUTPUT_JSON_FILE), metavar='PATH',
+                       help="Lua-DB oder JSON (Standard: %(default)s)")
+    add_profile_option(stats)
+    return parser
+
+def parse_args(argv=None):
+    """Liest die Kommandozeilen-Optionen
+    
+    Beginnt die Kommandozeile mit einem Befehl (COMMANDS), gilt der Parser mit
+    Unterbefehlen; sonst der bisherige Parser mit allen Optionen (command=None).
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in COMMANDS:
+        return build_command_parser().parse_args(argv)
+    
+    parser = argparse.ArgumentParser(
+        description="WoWDB Housing Decor Scraper",
+        epilog=f"Befehle: {', '.join(COMMANDS)} (z.B. 'scraper_final.py generate -h'). "
+               "Ohne Befehl läuft der komplette Scrape mit den Optionen oben.")
+    add_scrape_options(parser)
+    parser.add_argument('--optimize-textures', action='store_true',
+                        help="Vorhandene Vendor-Karten optimieren und Duplikate entfernen, dann beenden")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Mit --optimize-textures: nur berichten, nichts schreiben")
+    parser.add_argument('--benchmark-parser', type=int, metavar='N', nargs='?', const=200, default=0,
+                        help="Misst das Parsen von bis zu N Detail-Seiten aus dem Seiten-Cache und beendet danach")
+    parser.add_argument('--replay-corpus', metavar='DIR',
+                        help="Parst und generiert offline aus einem Korpus, misst Zeiten/Speicher und beendet danach")
+    parser.add_argument('--golden', metavar='PATH',
+                        help="Mit --replay-corpus: geparste Items mit dieser JSON vergleichen (Exit-Code 1 bei Abweichung)")
+    parser.add_argument('--update-golden', action='store_true',
+                        help="Mit --replay-corpus: Golden-JSON aus dem aktuellen Ergebnis neu schreiben")
+    parser.add_argument('--generate', action='store_true',
+                        help="Nur Lua-DB und JSON aus dem SQLite-Store neu erzeugen, ohne zu scrapen")
+    parser.add_argument('--validate', metavar='PATH',
+                        help="Prüft eine Lua-DB oder JSON auf offensichtliche Fehler und beendet (Exit-Code 1 bei Funden)")
+    parser.add_argument('--merge-shards', nargs='+', metavar='JSON',
+                        help="Shard-Ausgaben zusammenführen (Duplikate: vollständigeres Item gewinnt), "
+                             "dann JSON und Lua-DB schreiben und beenden")
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'),
+                        help="Vergleicht zwei Stände (JSON oder Lua-DB), schreibt Changelog und Delta und beendet")
+    args = parser.parse_args(argv)
+    args.command = None
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    handler = COMMAND_HANDLERS.get(args.command, run_scraper)
+    if not args.profile:
+        return handler(args)
+    
+    import cProfile
+    import pstats
+    
+    # cProfile sieht nur den Haupt-Thread; mit --workers 1 läuft dort die komplette Pipeline
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return handler(args)
+    finally:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"\nProfil gespeichert: {args.profile}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+
+def run_scraper(args):
+    """Führt den mit den bisherigen Optionen (ohne Befehl) gewählten Modus aus"""
+    if args.optimize_textures:
+        optimize_textures(rle=args.rle, dry_run=args.dry_run)
+        return
+    
+    if args.benchmark_parser:
+        benchmark_parser(args.cache_dir, limit=args.benchmark_parser)
+        return
+    
+    if args.generate:
+        # Lua-DB und JSON ohne Scrapen neu aus dem SQLite-Store erzeugen
+        store = ItemStore(args.store)
+        try:
+            if not len(store):
+                print(f"Store {args.store} ist leer - zuerst scrapen!")
+                return
+            write_outputs(store, args, PipelineMetrics())
+        finally:
+            store.close()
+        return
+    
+    if args.merge_shards:
+        print(f"Führe {len(args.merge_shards)} Shard-Ausgaben zusammen...")
+        write_outputs(merge_shard_outputs(args.merge_shards), args, PipelineMetrics())
+        return
+    
+    if args.validate:
+        start = time.perf_counter()
+        items, version = load_release_items(args.validate)
+        problems = validate_items(items)
+        print(f"{args.validate}: {len(items)} Items, Version {version or '-'}, "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        print_validation(problems)
+        if problems:
+            sys.exit(1)
+        return
+    
+    if args.diff:
+        run_release_diff(*args.diff, changelog_path=args.changelog, delta_path=args.delta)
+        return
+    
+    if args.replay_corpus:
+        if not replay_corpus(args.replay_corpus, golden_path=args.golden, update_golden=args.update_golden,
+                             workers=args.workers, base_url=args.base_url):
+            sys.exit(1)
+        return
+    
+    return run_scrape(args)
+
+def build_fetchers(args, session, guard, wait_stats=None, cache=None, corpus=None):
+    """Fetch-Backend für den Haupt-Thread plus fetcher_factory(worker_idx) für die weiteren Worker"""
+    browser_options = {"recycle_pages": args.browser_recycle, "max_rss_mb": args.browser_max_rss,
+                       "block_resources": not args.no_block_resources, "driver_path": args.driver_path,
+                       "metrics": guard.metrics}
+    
+    def new_fetcher():
+        base_fetcher = create_fetcher(args.backend, session=session, headless=True, wait_stats=wait_stats,
+                                      cache=cache, browser_options=browser_options)
+        if corpus:
+            base_fetcher = RecordingFetcher(base_fetcher, corpus)
+        return RetryingFetcher(base_fetcher, guard)
+    
+    fetcher = new_fetcher()
+    
+    def make_fetcher(worker_idx):
+        return fetcher if worker_idx == 0 else new_fetcher()
+    
+    return fetcher, make_fetcher
+
+def run_discover(args):
+    """Befehl discover: nur die Item-URLs sammeln und als ID-Liste für scrape --id-list speichern"""
+    set_base_url(args.base_url)
+    session = create_http_session(pool_size=args.workers)
+    metrics = PipelineMetrics()
+    fetcher, make_fetcher = build_fetchers(args, session, FetchGuard(attempts=args.retries, metrics=metrics))
+    try:
+        with metrics.timer("listing"):
+            item_urls = discover_item_urls(fetcher, session, mode=args.discovery, endpoints=args.discovery_url,
+                                           metrics=metrics, max_pages=args.max_pages,
+                                           rate_limiter=RateLimiter(args.rps), fetcher_factory=make_fetcher,
+                                           workers=args.workers)
+        if not item_urls:
+            print("Keine Items gefunden!")
+            sys.exit(1)
+        save_id_list(item_urls, args.save_ids)
+        print(f"ID-Liste gespeichert: {args.save_ids} ({len(item_urls)} Items) - "
+              f"weiter mit: scraper_final.py scrape --id-list {args.save_ids}")
+        metrics.print_summary()
+    finally:
+        fetcher.close()
+        session.close()
+        if args.metrics:
+            metrics.save(args.metrics, extra={"backend": args.backend, "workers": args.workers})
+
+def run_textures(args):
+    """Befehl textures: Vendor-Karten für die Items im Store laden, konvertieren und eintragen"""
+    metrics = PipelineMetrics()
+    if not Path(args.store).exists():
+        print(f"Store {args.store} existiert nicht - zuerst scrapen!")
+    else:
+        store = ItemStore(args.store)
+        map_pipeline = MapPipeline(download_workers=args.map_workers, convert_workers=args.convert_workers,
+                                   rle=args.rle, metrics=metrics,
+                                   guard=FetchGuard(attempts=args.retries, metrics=metrics))
+        try:
+            with metrics.timer("maps"):
+                store.update_map_textures(map_pipeline.process_items(store.items()))
+        finally:
+            map_pipeline.close()
+            store.close()
+        print(f"Lua-DB neu erzeugen mit: scraper_final.py generate --store {args.store}")
+    
+    if args.optimize:
+        with metrics.timer("optimize"):
+            optimize_textures(rle=args.rle, dry_run=args.dry_run)
+    metrics.print_summary()
+
+def run_generate(args):
+    """Befehl generate: Lua-DB aus JSON, Lua-DB oder SQLite-Store, ohne Netzwerk und Drittpakete"""
+    metrics = PipelineMetrics()
+    if args.store:
+        store = ItemStore(args.store)
+        try:
+            if not len(store):
+                print(f"Store {args.store} ist leer - zuerst scrapen!")
+                sys.exit(1)
+            write_outputs(store, args, metrics)
+        finally:
+            store.close()
+    else:
+        with metrics.timer("load"):
+            items, _ = load_release_items(args.input)
+        if not items:
+            print(f"{args.input} enthält keine Items!")
+            sys.exit(1)
+        print(f"{args.input}: {len(items)} Items")
+        write_lua_outputs(items, args, metrics)
+    metrics.print_summary()
+
+def run_diff(args):
+    """Befehl diff: Changelog und Delta zwischen zwei Ständen"""
+    run_release_diff(args.old, args.new, changelog_path=args.changelog, delta_path=args.delta)
+
+def run_stats(args):
+    """Befehl stats: Kennzahlen, Quellen und Validierung einer Lua-DB oder JSON"""
+    start = time.perf_counter()
+    items, version = load_release_items(args.path)
+    print(f"{args.path}: {len(items)} Items, Version {version or '-'}, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+    print_item_statistics(items, title=f"Statistik {args.path}")
+    sources = collections.Counter(source for item in items.values() for source in item.get("sources", []))
+    categories = collections.Counter(item.get("category") or "-" for item in items.values())
+    print("Quellen:  " + ", ".join(f"{name} {count}" for name, count in sources.most_common()))
+    print("Kategorien: " + ", ".join(f"{name} {count}" for name, count in categories.most_common()))
+    print_validation(validate_items(items))
+
+def run_scrape(args):
+    """Befehl scrape (und Standard ohne Befehl): Discovery, Details, Karten, JSON und Lua-DB"""
+    set_base_url(args.base_url)
+    if args.shard:
+        # Eigener Store und Checkpoint pro Shard, falls nicht explizit angegeben
+        if args.store == str(STORE_FILE):
+            args.store = str(shard_path(STORE_FILE, args.shard))
+        if args.checkpoint == str(CHECKPOINT_FILE):
+            args.checkpoint = str(shard_path(CHECKPOINT_FILE, args.shard))
+    
     print("=" * 70)
     print("WoWDB Housing Scraper - Final Version")
     print("=" * 70)
     print()
     print("Dieser Scraper wird ALLE Housing Items von WoWDB scrapen.")
     print("Geschätzte Dauer: 30-60 Minuten für ~2296 Items")
+    print(f"Backend: {args.backend}, Worker: {args.workers}, Limit: {args.rps or 'keins'} Requests/s")
     print("=" * 70)
     print()
     
-    driver = setup_driver(headless=True)
+    session = create_http_session(pool_size=args.workers)
+    wait_stats = WaitStats()
+    metrics = PipelineMetrics()
+    rate_limiter = RateLimiter(args.rps)
+    cache = None if args.no_cache else PageCache(args.cache_dir)
+    corpus = PageCache(args.record_corpus) if args.record_corpus else None
+    guard = FetchGuard(attempts=args.retries, metrics=metrics)
+    seed_items = {}
+    if args.seed_db:
+        seed_items, _ = load_release_items(args.seed_db)
+        print(f"Seed: {len(seed_items)} Items aus {args.seed_db}")
+    ingame = load_ingame_export(args.ingame) if args.ingame else {}
     
-    try:
-        # Schritt 1: Sammle alle Item-URLs von allen 96 Seiten
-        item_urls = collect_item_urls(driver, max_pages=96)
-        
-        if not item_urls:
-            print("Keine Items gefunden!")
-            return
-        
-        # Schritt 2: Scrape jedes Item
-        all_data = {}
-        total = len(item_urls)
+    fetcher, make_fetcher = build_fetchers(args, session, guard, wait_stats=wait_stats, cache=cache, corpus=corpus)
+    
+    checkpoint = CheckpointLog(args.checkpoint)
+    done_pages, done_items = checkpoint.replay() if args.resume else ({}, {})
+    if args.resume:
+        print(f"Fortsetzen: {len(done_pages)} Listing-Seiten und {len(done_items)} Items im Checkpoint")
+    checkpoint.open(resume=args.resume)
+    
+    map_pipeline = MapPipeline(session=session, download_workers=args.map_workers,
+                               convert_workers=args.convert_workers, rle=args.rle,
+                               metrics=metrics, guard=guard)
+    store = ItemStore(args.store)
+    vendor_cache = VendorCache()
+    
+    # In-Game-Export: nur fehlende oder vom Spiel abweichende Items werden im Web geladen
+    known_items = {**seed_items, **store.items()} if ingame else {}
+    scrape_ids = ingame_delta(ingame, known_items)
+    if ingame:
+        print(f"In-Game-Export: {len(ingame)} Items, davon {len(scrape_ids)} neu oder abweichend - "
+              f"nur diese werden gescraped")
+    
+    def complete_item(item_id, item_data):
+        seed_item = seed_items.get(int(item_id))
+        if seed_item:
+            merge_seed_item(item_data, seed_item)
+        if int(item_id) in ingame:
+            apply_ingame_values(item_data, ingame[int(item_id)])
+        return item_data
+    
+    def reuse_item(item_id, url):
+        """Bekanntes Item statt erneutem Laden (Cache/Seed mit --only-new, Web-Stand im In-Game-Modus)"""
+        if args.only_new:
+            parsed = cache.cached_item(url) if cache else None
+            parsed = parsed or copy.deepcopy(seed_items.get(item_id))
+            if parsed:
+                return parsed
+        if ingame and item_id not in scrape_ids:
+            return copy.deepcopy(known_items.get(item_id))
+        return None
+    
+    def save_progress(item_id, item_data, results):
+        complete_item(item_id, item_data)
+        checkpoint.write_item(item_id, item_data)
+        store.save_item(item_data)
+        if len(results) % 50 == 0:
+            print(f"\n>>> Fortschritt: {len(results)} Items")
+    
+    def discover(on_items=None):
+        report = on_items
+        if on_items and args.shard:
+            report = lambda items: on_items(select_shard(items, *args.shard))
         
-        for idx, (item_id, url) in enumerate(item_urls.items(), 1):
-            print(f"\n[{idx}/{total}] ", end='')
-            item_data = scrape_item_details(driver, item_id, url)
-            all_data[item_id] = item_data
+        if ingame or args.id_list:
+            # Die IDs kommen aus dem Spiel bzw. einer gespeicherten Liste, das Listing entfällt
+            if ingame:
+                item_urls = {item_id: f"{BASE_URL}/decor/{item_id}" for item_id in sorted(ingame)}
+            else:
+                item_urls = load_id_list(args.id_list)
+            if report:
+                report(item_urls)
+        else:
+            item_urls = discover_item_urls(fetcher, session, mode=args.discovery, endpoints=args.discovery_url,
+                                           checkpoint=checkpoint, done_pages=done_pages, metrics=metrics,
+                                           max_pages=args.max_pages, rate_limiter=rate_limiter,
+                                           fetcher_factory=make_fetcher, workers=args.workers, on_items=report)
+        if args.save_ids:
+            save_id_list(item_urls, args.save_ids)
+            print(f"ID-Liste gespeichert: {args.save_ids} ({len(item_urls)} Items)")
+        if args.shard:
+            shard_urls = select_shard(item_urls, *args.shard)
+            print(f"Shard {args.shard[0]}/{args.shard[1]}: {len(shard_urls)} von {len(item_urls)} Items")
+            item_urls = shard_urls
+        if corpus:
+            listing_pages = metrics.summary()["counters"].get("listing_pages", 0)
+            source = "ingame" if ingame else "id-list" if args.id_list else "listing" if listing_pages else "sitemap"
+            save_corpus_manifest(args.record_corpus, item_urls, source, listing_pages=listing_pages)
+        return item_urls
+    
+    try:
+        cached_items = {}
+        if args.pipeline == "async" and not args.benchmark_backends:
+            # Schritt 1-3 als asyncio-Pipeline: Discovery, Details, Parsing und Karten laufen gleichzeitig
+            def known_item(item_id, url):
+                if item_id in done_items:
+                    return done_items[item_id]
+                parsed = reuse_item(item_id, url)
+                if parsed:
+                    cached_items[item_id] = parsed
+                return parsed
             
-            time.sleep(0.4)  # Pause
+            pipeline = AsyncScrapePipeline(make_fetcher, map_pipeline, workers=args.workers,
+                                           parse_workers=args.parse_workers, rate_limiter=rate_limiter,
+                                           cache=cache, metrics=metrics, on_item=save_progress,
+                                           known_item=known_item)
+            with metrics.timer("pipeline"):
+                all_data = pipeline.run(discover)
+            discovered_ids = set(pipeline.urls)
             
-            # Speichere Fortschritt
-            if idx % 50 == 0:
-                with open('housing_final_progress.json', 'w', encoding='utf-8') as f:
-                    json.dump(all_data, f, indent=2, ensure_ascii=False)
-                print(f"\n>>> Fortschritt: {len(all_data)} Items")
-        
-        # Finale Speicherung
-        print("\n\nSpeichere Ergebnisse...")
-        
-        with open('housing_items_final.json', 'w', encoding='utf-8') as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
+            if pipeline.failed:
+                print(f"\nLetzter Versuch für {len(pipeline.failed)} fehlgeschlagene Items...")
+                with metrics.timer("details"):
+                    retried = scrape_items_parallel(pipeline.failed, make_fetcher, workers=args.workers,
+                                                    rate_limiter=rate_limiter, on_item=save_progress,
+                                                    cache=cache, metrics=metrics, retry_failed=False,
+                                                    vendor_cache=vendor_cache)
+                with metrics.timer("maps"):
+                    store.update_map_textures(map_pipeline.process_items(retried))
+                all_data.update(retried)
+                all_data = {item_id: all_data[item_id] for item_id in sorted(all_data)}
+            
+            if not all_data:
+                print("Keine Items gefunden!")
+                return
+        else:
+            # Schritt 1: Alle Item-URLs finden (Sitemap/Daten-Endpunkt oder Listing-Seiten)
+            with metrics.timer("listing"):
+                item_urls = discover()
+            discovered_ids = set(item_urls)
+            
+            if not item_urls:
+                print("Keine Items gefunden!")
+                return
+            
+            if args.benchmark_backends:
+                benchmark_backends(item_urls, sample_size=args.benchmark_backends)
+                return
+            
+            # Inkrementell: bekannte Items direkt aus Cache, Seed-DB oder Store übernehmen
+            if args.only_new or ingame:
+                for item_id, url in item_urls.items():
+                    parsed = reuse_item(item_id, url)
+                    if parsed:
+                        cached_items[item_id] = parsed
+                print(f"Inkrementell: {len(cached_items)} Items aus Cache/Seed-DB, "
+                      f"{len(item_urls) - len(cached_items)} neue Items werden gescraped")
+            resumed_items = {item_id: done_items[item_id] for item_id in item_urls if item_id in done_items}
+            urls_to_scrape = {item_id: url for item_id, url in item_urls.items()
+                              if item_id not in cached_items and item_id not in resumed_items}
+            
+            # Schritt 2: Scrape jedes Item (optional mit mehreren Workern)
+            with metrics.timer("details"):
+                scraped = scrape_items_parallel(
+                    urls_to_scrape,
+                    make_fetcher,
+                    workers=args.workers,
+                    rate_limiter=rate_limiter,
+                    on_item=save_progress,
+                    cache=cache,
+                    metrics=metrics,
+                    vendor_cache=vendor_cache,
+                )
+            all_data = {**cached_items, **resumed_items, **scraped}
+            all_data = {item_id: all_data[item_id] for item_id in sorted(all_data)}
+            store.save_items([complete_item(item_id, item_data)
+                              for item_id, item_data in [*cached_items.items(), *resumed_items.items()]])
+            
+            # Schritt 3: Vendor-Karten gesammelt laden und konvertieren
+            with metrics.timer("maps"):
+                store.update_map_textures(map_pipeline.process_items(all_data))
         
-        lua_content = generate_lua_database(all_data)
-        with open('HousingItemTrackerDB.lua', 'w', encoding='utf-8') as f:
-            f.write(lua_content)
+        # Items ohne aktuelle Web-Seite: letzter bekannter Stand (oder leer) mit den In-Game-Werten
+        game_only = [complete_item(item_id, copy.deepcopy(known_items.get(item_id)) or empty_item_data(item_id))
+                     for item_id in sorted(ingame) if item_id not in all_data]
+        if game_only:
+            store.save_items(game_only)
+            print(f"{len(game_only)} Items ohne aktuelle Web-Daten mit den In-Game-Werten übernommen")
         
-        # Statistiken
-        items_with_vendors = sum(1 for item in all_data.values() if item.get("vendors"))
-        items_with_crafting = sum(1 for item in all_data.values() if "Crafting" in item.get("sources", []))
-        items_with_achievement = sum(1 for item in all_data.values() if "Achievement" in item.get("sources", []))
-        materials_count = len(set(mat["id"] for item in all_data.values() for mat in item.get("materials", [])))
+        # Store mit dem aktuellen Katalog abgleichen; fehlgeschlagene Items behalten ihren letzten Stand
+        counters = metrics.summary()["counters"]
+        if counters.get("listing_failed") or counters.get("listing_failed_final"):
+            print("Listing-Seiten fehlgeschlagen - entfernte Items werden diesmal nicht aus dem Store gelöscht")
+        elif len(discovered_ids) < RETAIN_MIN_FRACTION * len(store):
+            print(f"WARNUNG: nur {len(discovered_ids)} Items gefunden, der Store hat {len(store)} - "
+                  f"Katalog vermutlich unvollständig, es wird nichts aus dem Store gelöscht")
+        elif ingame:
+            print("In-Game-Modus ohne Listing - Items werden nicht aus dem Store gelöscht")
+        else:
+            removed = store.retain(discovered_ids)
+            if removed:
+                print(f"{removed} Items sind nicht mehr im Katalog und wurden aus dem Store entfernt")
         
-        print("\n" + "=" * 70)
-        print("FERTIG!")
-        print("=" * 70)
-        print(f"Gesamt Items:          {len(all_data)}")
-        print(f"Items mit Vendors:     {items_with_vendors}")
-        print(f"Items mit Crafting:    {items_with_crafting}")
-        print(f"Items mit Achievement: {items_with_achievement}")
-        print(f"Eindeutige Materials:  {materials_count}")
+        # Finale Speicherung (streamend aus dem SQLite-Store)
+        write_outputs(store, args, metrics)
+        if cache:
+            print(f"Seiten-Cache: {cache.hits} unverändert, {cache.misses} neu geparst, "
+                  f"{len(cached_items)} übersprungen")
+        if vendor_cache.misses:
+            print(f"Vendor-Cache: {vendor_cache.misses} Vendoren aufgelöst, {vendor_cache.hits}x wiederverwendet")
+        wait_stats.print_summary()
+        metrics.print_summary()
         print("=" * 70)
         print("Dateien erstellt:")
-        print("  - housing_items_final.json")
-        print("  - HousingItemTrackerDB.lua")
+        if args.shard:
+            print(f"  - {shard_path(SHARD_OUTPUT_FILE, args.shard)} (mit --merge-shards zusammenführen)")
+        else:
+            print(f"  - {OUTPUT_JSON_FILE}")
+            print(f"  - {LUA_DB_FILE}")
+        print(f"  - {args.store}")
+        if args.wait_report:
+            wait_stats.save(args.wait_report)
+            print(f"  - {args.wait_report}")
+        if corpus:
+            print(f"  - {args.record_corpus}/ (Korpus für --replay-corpus)")
+        if args.metrics:
+            print(f"  - {args.metrics}")
         
     except KeyboardInterrupt:
         print("\n\nUnterbrochen!")
@@ -641,7 +4425,28 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
-        driver.quit()
+        map_pipeline.close()
+        store.close()
+        checkpoint.close()
+        fetcher.close()
+        session.close()
+        if args.metrics:
+            # Auch bei Abbruch schreiben, damit langsame Läufe auswertbar bleiben
+            metrics.save(args.metrics, extra={
+                "backend": args.backend,
+                "workers": args.workers,
+                "cache": {"hits": cache.hits, "misses": cache.misses} if cache else None,
+                "waits": wait_stats.summary(),
+            })
+
+COMMAND_HANDLERS = {
+    "discover": run_discover,
+    "scrape": run_scrape,
+    "textures": run_textures,
+    "generate": run_generate,
+    "diff": run_diff,
+    "stats": run_stats,
+}
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+
+@pytest.fixture(autouse=True)
+def restore_base_url():
+    """--base-url und Korpus-Replays setzen die globale Basis-URL, jeder Test startet mit der alten"""
+    import scraper_final as scraper
+
+    base_url = scraper.BASE_URL
+    yield
+    scraper.set_base_url(base_url)
+
+
+@pytest.fixture
+def mock_site():
+    """Startet mock_wowdb_server mit kleinem Katalog (und Sitemap) auf einem freien Port"""
+    import mock_wowdb_server as mock
+
+    catalog = mock.MockCatalog(size=12, page_size=5)
+    server, _, base_url = mock.start_server(catalog, mock.FaultInjector(), port=0, sitemap=True)
+    try:
+        yield base_url
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def scrape_args(base_url, *extra):
+    """Kommandozeile für einen schnellen Scrape gegen den Mock (HTTP, ohne Limits und Prozess-Pools)"""
+    return ["scrape", "--backend", "http", "--base-url", base_url, "--rps", "0", "--workers", "2",
+            "--convert-workers", "0", "--no-cache", *extra]
@@ -0,0 +1,38 @@
+
+HousingItemTrackerDB = {
+	["settings"] = {
+		["showTooltips"] = true,
+	},
+}
+HousingItemTrackerCollectedData = {
+	[857] = {
+		["quality"] = 1,
+		["vendors"] = {
+		},
+		["name"] = "Schmiedeamboss \"Dornogal\"",
+		["id"] = 857,
+		["decorCost"] = 3,
+		["sources"] = {
+		},
+	},
+	[100] = {
+		["quality"] = 3,
+		["vendors"] = {
+		},
+		["name"] = "Robuster Kupferteppich",
+		["id"] = 100,
+		["decorCost"] = 42,
+		["sources"] = {
+			"Vendor", -- [1]
+		},
+	},
+	[101] = {
+		["quality"] = 2,
+		["name"] = "Robuster Kupfer-Pflanzkübel",
+		["id"] = 101,
+		["sources"] = {
+		},
+		["vendors"] = {
+		},
+	},
+}
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from webdriver_manager import chrome as webdriver_manager_chrome
+
+import scraper_final as scraper
+
+
+@pytest.fixture
+def driver_env(tmp_path, monkeypatch):
+    """Gemerkter, veralteter chromedriver; ChromeDriverManager liefert einen neuen, Chrome nimmt nur den neuen"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CHROMEDRIVER", raising=False)
+    stale, fresh = tmp_path / "chromedriver-129", tmp_path / "chromedriver-131"
+    stale.touch()
+    fresh.touch()
+    scraper.DRIVER_CACHE_FILE.write_text(json.dumps({"path": str(stale)}), encoding="utf-8")
+
+    class FakeManager:
+        def install(self):
+            return str(fresh)
+
+    started = []
+
+    def fake_chrome(service, options):
+        started.append(service.path)
+        if service.path != str(fresh):
+            raise SessionNotCreatedException("This version of ChromeDriver only supports Chrome version 129")
+        return object()
+
+    monkeypatch.setattr(webdriver_manager_chrome, "ChromeDriverManager", FakeManager)
+    monkeypatch.setattr(webdriver, "Chrome", fake_chrome)
+    return stale, fresh, started
+
+
+def test_stale_cached_driver_is_resolved_again(driver_env):
+    stale, fresh, started = driver_env
+
+    scraper.setup_driver(block_resources=False)
+
+    assert started == [str(stale), str(fresh)]
+    assert json.loads(scraper.DRIVER_CACHE_FILE.read_text(encoding="utf-8"))["path"] == str(fresh)
+
+
+def test_explicit_driver_is_not_replaced(driver_env):
+    stale, _, started = driver_env
+
+    with pytest.raises(SessionNotCreatedException):
+        scraper.setup_driver(block_resources=False, driver_path=str(stale))
+    assert started == [str(stale)]
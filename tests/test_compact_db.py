@@ -0,0 +1,76 @@
+import io
+import re
+
+import pytest
+
+import scraper_final as scraper
+from conftest import REPO_ROOT
+
+lupa = pytest.importorskip("lupa")
+
+INDEXES = ("materials", "materialUsage", "vendorsByNpcId", "itemsByCategory", "achievements", "quests")
+
+
+def lua_to_python(value):
+    """Lua-Tabellen wie LuaTableReader: nur Positions-Einträge -> Liste, sonst Dict"""
+    if not lupa.lua_type(value) == "table":
+        return value
+    entries = {key: lua_to_python(entry) for key, entry in value.items()}
+    if list(entries) == list(range(1, len(entries) + 1)):
+        return list(entries.values())
+    return entries
+
+
+def expand_in_addon(compact_text):
+    """Führt die kompakte DB und ExpandCompactDB aus HousingItemTracker.lua aus, liefert DB.items"""
+    addon = (REPO_ROOT / "HousingItemTracker.lua").read_text(encoding="utf-8")
+    expand = re.search(r"^local function ExpandCompactDB\(db\)\n.*?^end\n", addon, re.M | re.S).group(0)
+    lua = lupa.LuaRuntime()
+    lua.execute(compact_text)
+    lua.execute(expand + "ExpandCompactDB(HousingItemTrackerDB)\n")
+    return lua_to_python(lua.globals().HousingItemTrackerDB["items"])
+
+
+def test_compact_db_has_the_same_indexes():
+    items, _ = scraper.load_lua_database(REPO_ROOT / "HousingItemTrackerDB.lua")
+    normal, compact = io.StringIO(), io.StringIO()
+    scraper.write_lua_database(items, normal)
+    scraper.write_compact_lua_database(items, [compact])
+
+    expected = scraper.LuaTableReader(normal.getvalue()).run()["HousingItemTrackerDB"]["items"]
+    expanded = expand_in_addon(compact.getvalue())
+
+    assert len(expanded["decorItems"]) == len(items)
+    for name in INDEXES:
+        assert expanded[name] == expected[name], name
+
+
+def zero_items():
+    poor = scraper.empty_item_data(101)
+    poor.update(name="Rostiger Eimer", budget_cost=0, quality=0, category="Accents")
+    common = scraper.empty_item_data(102)
+    common.update(name="Holzstuhl", budget_cost=4, quality=1, questId=80001, quest="Ein neues Zuhause",
+                  sources=["Quest"])
+    return {101: poor, 102: common}
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_zero_values_round_trip(tmp_path, compact):
+    path = tmp_path / "HousingItemTrackerDB.lua"
+    scraper.save_lua_database(zero_items(), path, compact=compact, toc_path=tmp_path / "missing.toc")
+
+    items, _ = scraper.load_lua_database(path)
+
+    assert (items[101]["budget_cost"], items[101]["quality"]) == (0, 0)
+    assert (items[102]["budget_cost"], items[102]["quality"], items[102]["questId"]) == (4, 1, 80001)
+    assert "questId" not in items[101]
+
+
+def test_zero_values_survive_expand_in_addon():
+    compact = io.StringIO()
+    scraper.write_compact_lua_database(zero_items(), [compact])
+
+    decor_items = expand_in_addon(compact.getvalue())["decorItems"]
+
+    assert (decor_items[101]["decorCost"], decor_items[101]["quality"]) == (0, 0)
+    assert "questId" not in decor_items[101] and decor_items[102]["questId"] == 80001
@@ -0,0 +1,57 @@
+"""Aufzeichnen (--record-corpus) und Offline-Replay (--replay-corpus) mit Golden-Datei"""
+
+import json
+
+import scraper_final as scraper
+from conftest import scrape_args
+
+DEFAULT_BASE_URL = scraper.BASE_URL
+
+
+def record(base_url, corpus_dir, *extra):
+    scraper.main(scrape_args(base_url, "--record-corpus", str(corpus_dir), *extra))
+    return json.loads((corpus_dir / scraper.CORPUS_MANIFEST_FILE).read_text(encoding='utf-8'))
+
+
+def test_listing_corpus_replays_with_recorded_base_url(mock_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    corpus_dir = tmp_path / "corpus"
+    manifest = record(mock_site, corpus_dir, "--discovery", "listing")
+    assert manifest["baseUrl"] == mock_site
+    assert manifest["source"] == "listing"
+    assert len(manifest["items"]) == 12
+
+    # Replay wie in einem neuen Prozess: Standard-Basis-URL, die Mock-URL steht nur im Manifest
+    scraper.set_base_url(DEFAULT_BASE_URL)
+    golden = tmp_path / "golden.json"
+    assert scraper.replay_corpus(corpus_dir, golden_path=golden, update_golden=True)
+    assert len(json.loads(golden.read_text(encoding='utf-8'))) == 12
+    assert scraper.replay_corpus(corpus_dir, golden_path=golden)
+    assert scraper.BASE_URL == DEFAULT_BASE_URL
+
+
+def test_empty_replay_fails_and_keeps_golden(tmp_path):
+    golden = tmp_path / "golden.json"
+    golden.write_text('{"1": {"id": 1}}', encoding='utf-8')
+    assert not scraper.replay_corpus(tmp_path / "empty", golden_path=golden, update_golden=True)
+    assert golden.read_text(encoding='utf-8') == '{"1": {"id": 1}}'
+
+    missing = tmp_path / "missing.json"
+    assert not scraper.replay_corpus(tmp_path / "empty", golden_path=missing, update_golden=True)
+    assert not missing.exists()
+
+
+def test_default_sitemap_discovery_corpus_replays(mock_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    corpus_dir = tmp_path / "corpus"
+    manifest = record(mock_site, corpus_dir)  # --discovery auto findet die Sitemap des Mocks
+    assert manifest["source"] == "sitemap"
+    assert manifest["listingPages"] == 0
+    assert len(manifest["items"]) == 12
+
+    scraper.set_base_url(DEFAULT_BASE_URL)
+    golden = tmp_path / "golden.json"
+    assert scraper.replay_corpus(corpus_dir, golden_path=golden, update_golden=True)
+    replayed = json.loads(golden.read_text(encoding='utf-8'))
+    assert sorted(map(int, replayed)) == sorted(map(int, manifest["items"]))
+    assert scraper.replay_corpus(corpus_dir, golden_path=golden)
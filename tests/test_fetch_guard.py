@@ -0,0 +1,104 @@
+import pytest
+import requests
+
+import scraper_final as scraper
+
+
+class ListingFetcher:
+    """Liefert zwei Listing-Seiten mit Items, dahinter leere Seiten (EmptyPage oder 404)"""
+    name = "fake"
+
+    def __init__(self, past_end):
+        self.past_end = past_end
+        self.calls = []
+
+    def fetch_listing_page(self, url):
+        self.calls.append(url)
+        page = int(url.split("page=")[1].split("#")[0])
+        if page <= 2:
+            return "".join(f'<a href="/decor/{page * 10 + n}/item">x</a>' for n in range(3))
+        self.past_end(url)
+
+    def close(self):
+        pass
+
+
+def raise_empty(url):
+    raise scraper.EmptyPage(url)
+
+
+def raise_not_found(url):
+    response = requests.Response()
+    response.status_code = 404
+    raise requests.HTTPError("404", response=response)
+
+
+def guarded(past_end):
+    metrics = scraper.PipelineMetrics()
+    guard = scraper.FetchGuard(metrics=metrics)
+    fetcher = ListingFetcher(past_end)
+    return fetcher, scraper.RetryingFetcher(fetcher, guard), guard, metrics
+
+
+@pytest.mark.parametrize("past_end", [raise_empty, raise_not_found])
+def test_empty_listing_pages_are_not_failures(past_end):
+    fetcher, retrying, guard, metrics = guarded(past_end)
+
+    items = scraper.collect_item_urls(retrying, max_pages=10, metrics=metrics)
+
+    assert sorted(items) == [10, 11, 12, 20, 21, 22]
+    counters = metrics.summary()["counters"]
+    assert counters.get("listing_empty") == scraper.EMPTY_PAGES_TO_STOP
+    assert not counters.get("listing_failed") and not counters.get("retries")
+    # jede leere Seite genau einmal geladen, kein Fehler im Breaker-Fenster
+    assert len(fetcher.calls) == 2 + scraper.EMPTY_PAGES_TO_STOP
+    assert False not in guard.breaker.outcomes
+
+
+def test_missing_page_is_still_a_failure(monkeypatch):
+    monkeypatch.setattr(scraper.time, "sleep", lambda seconds: None)
+    guard = scraper.FetchGuard(attempts=3)
+
+    assert guard.call(lambda url: None, "http://example.invalid/decor/1") is None
+    assert list(guard.breaker.outcomes) == [False, False, False]
+
+
+class FlakyListingFetcher:
+    """Fünf Listing-Seiten mit Items; die Seiten in failing schlagen failures-mal fehl"""
+    name = "flaky"
+
+    def __init__(self, failing, failures=1, pages=5):
+        self.failing = {page: failures for page in failing}
+        self.pages = pages
+
+    def fetch_listing_page(self, url):
+        page = int(url.split("page=")[1].split("#")[0])
+        if self.failing.get(page):
+            self.failing[page] -= 1
+            raise TimeoutError(f"Seite {page}")
+        if page > self.pages:
+            raise scraper.EmptyPage(url)
+        return "".join(f'<a href="/decor/{page * 10 + n}/item">x</a>' for n in range(3))
+
+    def close(self):
+        pass
+
+
+def test_failed_listing_pages_do_not_end_pagination():
+    metrics = scraper.PipelineMetrics()
+
+    items = scraper.collect_item_urls(FlakyListingFetcher([3, 4]), max_pages=20, metrics=metrics)
+
+    assert sorted(items) == [page * 10 + n for page in range(1, 6) for n in range(3)]
+    counters = metrics.summary()["counters"]
+    assert counters.get("listing_failed") == 2 and not counters.get("listing_failed_final")
+
+
+def test_failed_pages_between_trailing_empty_pages_are_retried_and_reported():
+    metrics = scraper.PipelineMetrics()
+
+    # Seite 7 liegt zwischen den leeren Seiten 6 und 8 und schlägt immer fehl
+    items = scraper.collect_item_urls(FlakyListingFetcher([7], failures=10), max_pages=20, metrics=metrics)
+
+    assert len(items) == 15
+    assert metrics.summary()["counters"].get("listing_failed_final") == 1
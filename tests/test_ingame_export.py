@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+import scraper_final as scraper
+from conftest import REPO_ROOT, scrape_args
+
+SAVED_VARIABLES = Path(__file__).parent / "fixtures" / "HousingItemTracker_SavedVariables.lua"
+
+
+def test_toc_loads_collector():
+    toc = (REPO_ROOT / "HousingItemTracker.toc").read_text(encoding="utf-8")
+    files = [line.strip() for line in toc.splitlines() if line.strip() and not line.startswith("#")]
+    assert "IngameDataCollector.lua" in files
+    saved = next(line for line in toc.splitlines() if line.startswith("## SavedVariables:"))
+    assert scraper.INGAME_EXPORT_VARIABLE in saved
+
+
+def test_load_saved_variables_file():
+    ingame = scraper.load_ingame_export(SAVED_VARIABLES)
+
+    assert sorted(ingame) == [100, 101, 857]
+    assert ingame[100] == {"budget_cost": 42, "quality": 3, "name": "Robuster Kupferteppich"}
+    assert ingame[857]["name"] == 'Schmiedeamboss "Dornogal"'
+    assert "budget_cost" not in ingame[101]
+
+
+def test_scrape_with_ingame_saved_variables(mock_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    scraper.main(scrape_args(mock_site, "--ingame", str(SAVED_VARIABLES)))
+
+    items = json.loads((tmp_path / "housing_items_final.json").read_text(encoding="utf-8"))
+    assert sorted(items, key=int) == ["100", "101", "857"]
+    # Decor-Kosten und Qualität aus dem Spiel gewinnen, fehlende Kosten kommen aus dem Web
+    assert (items["100"]["budget_cost"], items["100"]["quality"]) == (42, 3)
+    assert items["101"]["quality"] == 2 and items["101"]["budget_cost"]
+    assert items["100"]["name"].startswith("Sturdy Copper Rug")
+    # 857 gibt es nur im Spiel
+    assert items["857"]["name"] == 'Schmiedeamboss "Dornogal"'
+    assert items["857"]["budget_cost"] == 3
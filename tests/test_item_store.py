@@ -0,0 +1,56 @@
+"""Round-Trip der Items durch den SQLite-Store (ItemStore)"""
+
+import scraper_final as scraper
+from conftest import REPO_ROOT, scrape_args
+
+SHIPPED_DB = REPO_ROOT / "HousingItemTrackerDB.lua"
+
+
+def test_shipped_db_round_trips_through_store(tmp_path):
+    items, _ = scraper.load_lua_database(SHIPPED_DB)
+    store = scraper.ItemStore(tmp_path / "items.sqlite")
+    try:
+        store.save_items(items.values())
+        exported = store.items()
+    finally:
+        store.close()
+
+    assert sorted(exported) == sorted(items)
+    changed = [item_id for item_id, item in items.items()
+               if scraper.lua_item_entry(item) != scraper.lua_item_entry(exported[item_id])]
+    assert changed == []
+    # Marie Allen steht je nach Item an verschiedenen Orten
+    assert exported[857]["vendors"][0]["location"] == items[857]["vendors"][0]["location"]
+
+
+def scrape_listing(base_url, *extra):
+    scraper.main(scrape_args(base_url, "--discovery", "listing", *extra))
+    store = scraper.ItemStore(scraper.STORE_FILE)
+    try:
+        return len(store)
+    finally:
+        store.close()
+
+
+def test_failed_listing_page_keeps_store_items(mock_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert scrape_listing(mock_site) == 12
+
+    fetch_listing_page = scraper.HttpFetcher.fetch_listing_page
+
+    def broken_page_two(self, url):
+        if "page=2" in url:
+            raise ConnectionError("Seite 2 nicht erreichbar")
+        return fetch_listing_page(self, url)
+
+    monkeypatch.setattr(scraper, "LISTING_RETRY_ATTEMPTS", 1)
+    monkeypatch.setattr(scraper.HttpFetcher, "fetch_listing_page", broken_page_two)
+    assert scrape_listing(mock_site) == 12
+
+
+def test_much_smaller_catalog_keeps_store_items(mock_site, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert scrape_listing(mock_site) == 12
+
+    # Nur die erste Listing-Seite (5 von 12 Items), ohne dass ein Fehler gezählt wird
+    assert scrape_listing(mock_site, "--max-pages", "1") == 12
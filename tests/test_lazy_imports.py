@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import scraper_final as scraper
+from conftest import REPO_ROOT
+
+THIRD_PARTY = ("requests", "bs4", "selenium", "webdriver_manager", "PIL", "lxml", "psutil")
+
+
+def test_import_needs_no_third_party_packages():
+    code = ("import sys, scraper_final; "
+            f"print(','.join(sorted(m for m in sys.modules if m.split('.')[0] in {THIRD_PARTY!r})))")
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True,
+                            check=True).stdout.strip()
+    assert loaded == ""
+
+
+def test_browser_rss_mb_imports_psutil_on_demand():
+    if not scraper.HAVE_PSUTIL:
+        pytest.skip("psutil nicht installiert")
+    driver = SimpleNamespace(service=SimpleNamespace(process=SimpleNamespace(pid=os.getpid())))
+    assert scraper.browser_rss_mb(driver) > 0
@@ -0,0 +1,43 @@
+import scraper_final as scraper
+
+SEED = {
+    "id": 857, "name": "Schmiedeamboss", "budget_cost": 3, "category": "Furnishings", "subcategory": "Tables",
+    "sources": ["Vendor", "Achievement", "Quest"],
+    "vendors": [{"name": "Marie Allen", "location": "Dornogal", "npcId": 216888, "price": 100, "currency": "Gold"}],
+    "materials": [],
+    "achievement": "Heimwerker", "achievementId": 40001,
+    "quest": "Ein neues Zuhause", "questId": 80001,
+    "profession": None,
+}
+
+
+def parsed_item(**fields):
+    item = scraper.empty_item_data(857)
+    item.update(name="Schmiedeamboss", category="Furnishings", subcategory="Tables", **fields)
+    return item
+
+
+def test_parsed_empty_lists_and_dropped_sources_win():
+    item = scraper.merge_seed_item(parsed_item(sources=["Quest"], quest="Ein neues Zuhause"), SEED)
+
+    assert item["vendors"] == [] and item["sources"] == ["Quest"]
+    assert item["achievement"] is None and "achievementId" not in item
+    # Nicht geparste bzw. nur im Seed vorhandene Felder kommen aus dem Seed
+    assert item["budget_cost"] == 3
+    assert item["questId"] == 80001
+
+
+def test_matched_vendors_are_completed_from_seed():
+    vendor = {"name": "Marie Allen", "location": "Dornogal", "npcId": None, "price": 100, "currency": "Gold"}
+    item = scraper.merge_seed_item(parsed_item(sources=["Vendor"], vendors=[vendor], budget_cost=5), SEED)
+
+    assert item["vendors"][0]["npcId"] == 216888
+    assert item["budget_cost"] == 5
+
+
+def test_unparsed_item_is_filled_from_seed():
+    item = scraper.merge_seed_item(scraper.empty_item_data(857), SEED)
+
+    assert item["name"] == "Schmiedeamboss"
+    assert item["vendors"] == SEED["vendors"] and item["vendors"] is not SEED["vendors"]
+    assert item["achievementId"] == 40001
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+import scraper_final as scraper
+
+DB_TEXT = ('HousingItemTrackerDB = {\n'
+           '    [1] = { mapTexture = "Interface\\\\AddOns\\\\HousingItemTracker\\\\textures\\\\map_1_b" },\n'
+           '}\n')
+
+
+def test_rewrite_texture_references(tmp_path):
+    db_path = tmp_path / "HousingItemTrackerDB.lua"
+    db_path.write_text(DB_TEXT, encoding="utf-8")
+
+    scraper.rewrite_texture_references({"map_1_b": "map_1_a"}, [db_path])
+
+    assert db_path.read_text(encoding="utf-8") == DB_TEXT.replace("map_1_b", "map_1_a")
+    assert [path.name for path in tmp_path.iterdir()] == [db_path.name]
+
+
+def test_rewrite_texture_references_is_atomic(tmp_path, monkeypatch):
+    db_path = tmp_path / "HousingItemTrackerDB.lua"
+    db_path.write_text(DB_TEXT, encoding="utf-8")
+
+    def failing_replace(src, dst):
+        raise OSError("Platte voll")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        scraper.rewrite_texture_references({"map_1_b": "map_1_a"}, [db_path])
+
+    assert db_path.read_text(encoding="utf-8") == DB_TEXT
+    assert [path.name for path in tmp_path.iterdir()] == [db_path.name]
@@ -0,0 +1,70 @@
+"""Ein NPC an zwei Orten: Vendor-Cache und Store dürfen die Orte nicht zusammenlegen"""
+
+import json
+
+import mock_wowdb_server as mock
+import scraper_final as scraper
+from conftest import scrape_args
+
+DETAIL_PAGE = '''<html><body><div class="container"><h1>Item {item_id}</h1>
+<div class="mb-3">Category: <a href="/c/1">Accents</a></div>
+<div class="mb-3">Vendor: <div><a href="/npcs/216888">Marie Allen</a> ({location}) <strong>{price}</strong>
+<img alt="Gold" src="/g.png"><img src="/maps/{map_name}.jpg"><div class="map-pin" data-x="{x}" data-y="{y}"></div>
+/way {x} {y}</div></div>
+</div></body></html>'''
+
+LOCATIONS = {
+    857: ("Stormglen Village, Gilneas", "217_gilneas", 60.2, 92.4),
+    858: ("Ruins of Gilneas", "218_ruins_of_gilneas", 55.0, 41.7),
+}
+
+
+def parse_items():
+    items = {}
+    vendor_cache = scraper.VendorCache()
+    for item_id, (location, map_name, x, y) in LOCATIONS.items():
+        html = DETAIL_PAGE.format(item_id=item_id, location=location, price=100 + item_id,
+                                  map_name=map_name, x=x, y=y)
+        items[item_id] = scraper.parse_item_html(html, item_id, vendor_cache=vendor_cache)
+    return items
+
+
+def test_parser_keeps_both_locations():
+    items = parse_items()
+    for item_id, (location, _, x, y) in LOCATIONS.items():
+        vendor, = items[item_id]["vendors"]
+        assert vendor["npcId"] == 216888
+        assert (vendor["location"], vendor["coordX"], vendor["coordY"]) == (location, x, y)
+
+
+def test_store_keeps_both_locations(tmp_path):
+    items = parse_items()
+    store = scraper.ItemStore(tmp_path / "items.sqlite")
+    try:
+        store.save_items(items.values())
+        exported = store.items()
+    finally:
+        store.close()
+
+    for item_id, (location, _, x, y) in LOCATIONS.items():
+        vendor, = exported[item_id]["vendors"]
+        assert (vendor["npcId"], vendor["location"], vendor["coordX"], vendor["coordY"]) == (216888, location, x, y)
+        assert scraper.lua_item_entry(exported[item_id]) == scraper.lua_item_entry(items[item_id])
+
+
+def test_runs_do_not_share_vendor_entities(mock_site, tmp_path, monkeypatch):
+    """Zwei Läufe in einem Prozess: die Karten-URLs gehören zum Server des jeweiligen Laufs"""
+    monkeypatch.chdir(tmp_path)
+    scraper.main(scrape_args(mock_site))
+
+    catalog = mock.MockCatalog(size=12, page_size=5)
+    server, _, other_url = mock.start_server(catalog, mock.FaultInjector(), port=0, sitemap=True)
+    try:
+        scraper.main(scrape_args(other_url))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    items = json.loads((tmp_path / "housing_items_final.json").read_text(encoding="utf-8"))
+    map_urls = {vendor["mapUrl"] for item in items.values() for vendor in item["vendors"] if vendor.get("mapUrl")}
+    assert map_urls and all(url.startswith(other_url) for url in map_urls)
@@ -22,43 +22,42 @@ if errorlevel 1 (
     exit /b 1
 )
 
-REM Waehle Scraper-Version
+REM Waehle Modus
 echo.
-echo Waehle Scraper-Version:
+echo Waehle Modus:
 echo.
-echo 1. Enhanced Scraper (mit Source-Info, Vendors, etc.) [EMPFOHLEN]
+echo 1. Kompletter Scrape (mit Source-Info, Vendors, etc.) [EMPFOHLEN]
 echo    - Dauert: 30-60 Minuten
 echo    - Sammelt: ALLE Informationen (Sources, Vendors, Preis, etc.)
 echo.
-echo 2. Simple Scraper (nur Materialien)
-echo    - Dauert: 5-10 Minuten
-echo    - Sammelt: Nur Crafting-Materialien
+echo 2. Nur Lua-DB neu erzeugen (aus housing_items_final.json)
+echo    - Dauert: wenige Sekunden, ohne Internet
 echo.
 choice /C 12 /M "Gib deine Wahl ein"
 
-if errorlevel 2 goto simple
+if errorlevel 2 goto generate
 if errorlevel 1 goto enhanced
 
 :enhanced
 echo.
-echo Starte Enhanced Scraper (dies kann eine Weile dauern)...
+echo Starte Scraper (dies kann eine Weile dauern)...
 echo Bitte warten...
-python scraper_final.py
+python scraper_final.py scrape
 
 if errorlevel 1 (
-    echo FEHLER: Enhanced Scraper ist fehlgeschlagen!
+    echo FEHLER: Scraper ist fehlgeschlagen!
     pause
     exit /b 1
 )
 goto done
 
-:simple
+:generate
 echo.
-echo Starte Simple Scraper...
-python scraper.py
+echo Erzeuge Lua-DB neu...
+python scraper_final.py generate
 
 if errorlevel 1 (
-    echo FEHLER: Simple Scraper ist fehlgeschlagen!
+    echo FEHLER: Lua-DB konnte nicht erzeugt werden!
     pause
     exit /b 1
 )
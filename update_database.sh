@@ -20,10 +20,10 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
-# Führe Scraper aus
+# Führe Scraper aus (weitere Optionen werden durchgereicht, z.B. --backend http --workers 4)
 echo ""
 echo "Starte Scraper..."
-python3 scraper.py
+python3 scraper_final.py scrape "$@"
 
 if [ $? -ne 0 ]; then
     echo "FEHLER: Scraper ist fehlgeschlagen!"